@@ -3,7 +3,9 @@ AES Package
 Export AES core and modes
 """
 
-from .aes_core import AESCore
-from .aes_modes import AESModes
+from .aes_core import AESCore, AESKeySchedule
+from .aes_ttable import AESTTableCore
+from .aes_numpy import AESNumpyCore, HAS_NUMPY
+from .aes_modes import AESModes, Encryptor, Decryptor
 
-__all__ = ['AESCore', 'AESModes']
\ No newline at end of file
+__all__ = ['AESCore', 'AESKeySchedule', 'AESTTableCore', 'AESNumpyCore', 'HAS_NUMPY', 'AESModes', 'Encryptor', 'Decryptor']
\ No newline at end of file
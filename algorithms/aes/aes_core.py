@@ -10,6 +10,28 @@ from .aes_tables import (
 )
 
 
+class AESKeySchedule:
+    """
+    Expanded AES-128 key, prepared once and reused for every block
+    encrypt_round_keys: 176 bytes, K[0] .. K[10] laid out flat
+    decrypt_round_keys: 176 bytes, K[10] .. K[0] laid out flat
+    """
+    
+    __slots__ = ('key', 'words', 'encrypt_round_keys', 'decrypt_round_keys')
+    
+    def __init__(self, key, words):
+        self.key = bytes(key)
+        self.words = tuple(tuple(w) for w in words)
+        
+        flat = [b for w in words for b in w]
+        self.encrypt_round_keys = tuple(flat)
+        
+        rounds = len(flat) // 16
+        self.decrypt_round_keys = tuple(
+            b for r in range(rounds - 1, -1, -1) for b in flat[16*r:16*r + 16]
+        )
+
+
 class AESCore:
     """
     AES-128 Core Implementation
@@ -64,19 +86,13 @@ class AESCore:
         
         return w
     
-    def _get_round_key(self, expanded_key, round_num):
+    def prepare(self, key):
         """
-        Get round key for specific round
-        Returns: 4x4 state matrix
+        Expand key once for reuse across many blocks
+        key: 16 bytes
+        Returns: AESKeySchedule
         """
-        start_word = round_num * 4
-        round_key = []
-        
-        for col in range(4):
-            word = expanded_key[start_word + col]
-            round_key.append(word[:])
-        
-        return round_key
+        return AESKeySchedule(key, self.key_expansion(key))
     
     # ==================== STATE OPERATIONS ====================
     
@@ -141,11 +157,14 @@ class AESCore:
         
         return state
     
-    def _add_round_key(self, state, round_key):
-        """XOR state with round key"""
+    def _add_round_key(self, state, round_keys, offset=0):
+        """
+        XOR state with round key
+        round_keys: flat round key bytes, round key starts at offset
+        """
         for r in range(4):
             for c in range(4):
-                state[r][c] ^= round_key[c][r]
+                state[r][c] ^= round_keys[offset + r + 4*c]
         return state
     
     # ==================== DECRYPTION OPERATIONS ====================
@@ -181,39 +200,42 @@ class AESCore:
     
     # ==================== MAIN ENCRYPTION/DECRYPTION ====================
     
+    def _schedule(self, key):
+        """Accept raw key bytes or an already prepared AESKeySchedule"""
+        if isinstance(key, AESKeySchedule):
+            return key
+        return self.prepare(key)
+    
     def encrypt_block(self, plaintext_block, key):
         """
         Encrypt one 16-byte block
         plaintext_block: 16 bytes
-        key: 16 bytes
+        key: 16 bytes or AESKeySchedule from prepare()
         Returns: 16 bytes
         """
         if len(plaintext_block) != 16:
             raise ValueError("Block must be 16 bytes")
         
-        # Key expansion
-        expanded_key = self.key_expansion(key)
+        # Key expansion (skipped for prepared keys)
+        round_keys = self._schedule(key).encrypt_round_keys
         
         # Initialize state
         state = self._bytes_to_state(plaintext_block)
         
         # Initial round key addition
-        round_key = self._get_round_key(expanded_key, 0)
-        state = self._add_round_key(state, round_key)
+        state = self._add_round_key(state, round_keys, 0)
         
         # Main rounds (1-9)
         for round_num in range(1, self.Nr):
             state = self._sub_bytes(state)
             state = self._shift_rows(state)
             state = self._mix_columns(state)
-            round_key = self._get_round_key(expanded_key, round_num)
-            state = self._add_round_key(state, round_key)
+            state = self._add_round_key(state, round_keys, 16 * round_num)
         
         # Final round (no MixColumns)
         state = self._sub_bytes(state)
         state = self._shift_rows(state)
-        round_key = self._get_round_key(expanded_key, self.Nr)
-        state = self._add_round_key(state, round_key)
+        state = self._add_round_key(state, round_keys, 16 * self.Nr)
         
         return self._state_to_bytes(state)
     
@@ -221,49 +243,77 @@ class AESCore:
         """
         Decrypt one 16-byte block
         ciphertext_block: 16 bytes
-        key: 16 bytes
+        key: 16 bytes or AESKeySchedule from prepare()
         Returns: 16 bytes
         """
         if len(ciphertext_block) != 16:
             raise ValueError("Block must be 16 bytes")
         
-        # Key expansion
-        expanded_key = self.key_expansion(key)
+        # Key expansion (skipped for prepared keys)
+        # decrypt_round_keys holds K[10], K[9], ..., K[0]
+        round_keys = self._schedule(key).decrypt_round_keys
         
         # Initialize state
         state = self._bytes_to_state(ciphertext_block)
         
         # Initial round key addition (with last round key)
-        round_key = self._get_round_key(expanded_key, self.Nr)
-        state = self._add_round_key(state, round_key)
+        state = self._add_round_key(state, round_keys, 0)
         
         # Main rounds in reverse (9-1)
-        for round_num in range(self.Nr - 1, 0, -1):
+        for i in range(1, self.Nr):
             state = self._inv_shift_rows(state)
             state = self._inv_sub_bytes(state)
-            round_key = self._get_round_key(expanded_key, round_num)
-            state = self._add_round_key(state, round_key)
+            state = self._add_round_key(state, round_keys, 16 * i)
             state = self._inv_mix_columns(state)
         
         # Final round (no InvMixColumns)
         state = self._inv_shift_rows(state)
         state = self._inv_sub_bytes(state)
-        round_key = self._get_round_key(expanded_key, 0)
-        state = self._add_round_key(state, round_key)
+        state = self._add_round_key(state, round_keys, 16 * self.Nr)
         
         return self._state_to_bytes(state)
+    
+    # ==================== MULTI-BLOCK (ECB) ====================
+    
+    def encrypt_blocks(self, data, key):
+        """
+        Encrypt a buffer of whole 16-byte blocks independently
+        data: bytes, length multiple of 16
+        key: 16 bytes or prepared schedule
+        Returns: bytes
+        """
+        if len(data) % 16 != 0:
+            raise ValueError("Data length must be multiple of block size")
+        
+        schedule = self._schedule(key)
+        result = bytearray()
+        for i in range(0, len(data), 16):
+            result.extend(self.encrypt_block(data[i:i + 16], schedule))
+        return bytes(result)
+    
+    def decrypt_blocks(self, data, key):
+        """Decrypt a buffer of whole 16-byte blocks independently"""
+        if len(data) % 16 != 0:
+            raise ValueError("Data length must be multiple of block size")
+        
+        schedule = self._schedule(key)
+        result = bytearray()
+        for i in range(0, len(data), 16):
+            result.extend(self.decrypt_block(data[i:i + 16], schedule))
+        return bytes(result)
 
 
-def test_aes_core():
-    """Test AES core with standard test vectors"""
-    aes = AESCore()
+def test_aes_core(aes=None):
+    """Test AES core (or another engine) with standard test vectors"""
+    if aes is None:
+        aes = AESCore()
     
     # FIPS 197 test vector
     key = bytes.fromhex('000102030405060708090a0b0c0d0e0f')
     plaintext = bytes.fromhex('00112233445566778899aabbccddeeff')
     expected_ciphertext = bytes.fromhex('69c4e0d86a7b0430d8cdb78070b4c55a')
     
-    print("Testing AES-128 Core...")
+    print(f"Testing AES-128 Core ({type(aes).__name__})...")
     print(f"Key:       {key.hex()}")
     print(f"Plaintext: {plaintext.hex()}")
     
@@ -292,4 +342,7 @@ def test_aes_core():
 
 
 if __name__ == "__main__":
-    test_aes_core()
\ No newline at end of file
+    from .aes_ttable import AESTTableCore
+    
+    test_aes_core()
+    test_aes_core(AESTTableCore())
\ No newline at end of file
@@ -2,44 +2,89 @@
 AES Modes of Operation
 - ECB (Electronic Codebook)
 - CBC (Cipher Block Chaining)
+- CTR (Counter) - no padding, random-access decryption
 """
 
 import os
 from .aes_core import AESCore
+from .aes_ttable import AESTTableCore
+from .aes_numpy import AESNumpyCore, HAS_NUMPY
+from ..key_cache import KeyScheduleCache
+from ..metrics import METRICS
+from ..parallel import split_cbc_chunks, map_chunks
+
+
+# Block engines selectable through AESModes(engine=...)
+ENGINES = {
+    'reference': AESCore,     # 4x4 state, one step per transformation (readable)
+    'ttable': AESTTableCore,  # 32-bit words + T-table lookups (fast)
+    # All blocks vectorized per round; pure-Python T-table engine without numpy
+    'numpy': AESNumpyCore if HAS_NUMPY else AESTTableCore,
+}
+
+
+def xor_bytes(a, b):
+    """XOR two equal-length byte strings in one big-integer operation"""
+    n = len(a)
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(n, 'big')
+
+
+def create_engine(engine):
+    """
+    Resolve engine name (or an engine instance) to an engine object
+    Engine objects provide prepare(), encrypt_block() and decrypt_block()
+    """
+    if not isinstance(engine, str):
+        return engine
+    
+    name = engine.lower()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown AES engine: {engine} "
+                         f"(available: {', '.join(ENGINES)})")
+    return ENGINES[name]()
 
 
 class AESModes:
-    """AES with ECB and CBC modes"""
+    """AES with ECB, CBC and CTR modes"""
     
-    def __init__(self):
-        self.aes_core = AESCore()
+    algorithm = 'AES'  # Algorithm name recorded in the binary container header
+    
+    def __init__(self, engine='reference', key_cache_size=32):
+        self.engine = engine
+        self.aes_core = create_engine(engine)
         self.block_size = 16  # AES block size = 128 bits = 16 bytes
+        self.parallel_min_chunk = 64 * 1024  # Smallest chunk worth shipping to a worker
+        
+        # Expanded keys are reused across blocks and messages
+        self.key_cache = KeyScheduleCache(self.aes_core.prepare, key_cache_size)
     
     def _pkcs7_pad(self, data):
         """
         PKCS#7 Padding
         Pad data to multiple of block_size
         """
-        pad_len = self.block_size - (len(data) % self.block_size)
-        padding = bytes([pad_len] * pad_len)
-        return data + padding
+        with METRICS.timer('padding', len(data)):
+            pad_len = self.block_size - (len(data) % self.block_size)
+            padding = bytes([pad_len] * pad_len)
+            return data + padding
     
     def _pkcs7_unpad(self, data):
         """Remove PKCS#7 padding"""
         if not data:
             return data
         
-        pad_len = data[-1]
-        
-        # Validate padding
-        if pad_len > self.block_size or pad_len == 0:
-            raise ValueError("Invalid padding")
-        
-        # Check if all padding bytes are correct
-        if data[-pad_len:] != bytes([pad_len] * pad_len):
-            raise ValueError("Invalid padding")
-        
-        return data[:-pad_len]
+        with METRICS.timer('padding', len(data)):
+            pad_len = data[-1]
+            
+            # Validate padding
+            if pad_len > self.block_size or pad_len == 0:
+                raise ValueError("Invalid padding")
+            
+            # Check if all padding bytes are correct
+            if data[-pad_len:] != bytes([pad_len] * pad_len):
+                raise ValueError("Invalid padding")
+            
+            return data[:-pad_len]
     
     def _validate_key(self, key):
         """Validate AES key length"""
@@ -47,12 +92,26 @@ class AESModes:
             raise ValueError(f"AES-128 key must be 16 bytes, got {len(key)}")
         return key
     
+    def _prepare_key(self, key):
+        """Validate key and fetch its expanded schedule from the cache"""
+        key = self._validate_key(key)
+        with METRICS.timer('key_schedule'):
+            return self.key_cache.get(key)
+    
     def _validate_iv(self, iv):
         """Validate IV length"""
         if iv is not None and len(iv) != 16:
             raise ValueError(f"AES IV must be 16 bytes, got {len(iv)}")
         return iv
     
+    def _validate_nonce(self, nonce):
+        """Validate CTR initial counter block (16 bytes)"""
+        if nonce is None:
+            raise ValueError("Nonce is required for CTR mode")
+        if len(nonce) != 16:
+            raise ValueError(f"AES CTR nonce must be 16 bytes, got {len(nonce)}")
+        return bytes(nonce)
+    
     # ==================== ECB MODE ====================
     
     def encrypt_ecb(self, plaintext, key):
@@ -62,20 +121,23 @@ class AESModes:
         key: 16 bytes
         Returns: bytes (ciphertext)
         """
-        key = self._validate_key(key)
+        schedule = self._prepare_key(key)
         
         # Padding
         padded = self._pkcs7_pad(plaintext)
         
-        ciphertext = bytearray()
-        
-        # Encrypt each block
-        for i in range(0, len(padded), self.block_size):
-            block = padded[i:i + self.block_size]
-            encrypted_block = self.aes_core.encrypt_block(block, key)
-            ciphertext.extend(encrypted_block)
-        
-        return bytes(ciphertext)
+        return self._encrypt_ecb_raw(padded, schedule)
+    
+    def _encrypt_ecb_raw(self, padded, schedule):
+        """ECB-encrypt whole blocks (already padded)"""
+        # Blocks are independent - the engine may process them in one batch
+        with METRICS.timer('block_cipher', len(padded)):
+            return self.aes_core.encrypt_blocks(padded, schedule)
+    
+    def _decrypt_ecb_raw(self, ciphertext, schedule):
+        """ECB-decrypt whole blocks without removing padding"""
+        with METRICS.timer('block_cipher', len(ciphertext)):
+            return self.aes_core.decrypt_blocks(ciphertext, schedule)
     
     def decrypt_ecb(self, ciphertext, key):
         """
@@ -84,21 +146,15 @@ class AESModes:
         key: 16 bytes
         Returns: bytes (plaintext)
         """
-        key = self._validate_key(key)
+        schedule = self._prepare_key(key)
         
         if len(ciphertext) % self.block_size != 0:
             raise ValueError("Ciphertext length must be multiple of block size")
         
-        plaintext = bytearray()
-        
-        # Decrypt each block
-        for i in range(0, len(ciphertext), self.block_size):
-            block = ciphertext[i:i + self.block_size]
-            decrypted_block = self.aes_core.decrypt_block(block, key)
-            plaintext.extend(decrypted_block)
+        plaintext = self._decrypt_ecb_raw(ciphertext, schedule)
         
         # Remove padding
-        return self._pkcs7_unpad(bytes(plaintext))
+        return self._pkcs7_unpad(plaintext)
     
     # ==================== CBC MODE ====================
     
@@ -110,7 +166,7 @@ class AESModes:
         iv: 16 bytes (if None, generate random)
         Returns: (ciphertext, iv) tuple
         """
-        key = self._validate_key(key)
+        schedule = self._prepare_key(key)
         
         # Generate IV if not provided
         if iv is None:
@@ -121,65 +177,162 @@ class AESModes:
         # Padding
         padded = self._pkcs7_pad(plaintext)
         
+        return self._encrypt_cbc_raw(padded, schedule, iv), iv
+    
+    def _encrypt_cbc_raw(self, padded, schedule, previous_block):
+        """
+        CBC-encrypt whole blocks (already padded)
+        previous_block: IV, or the last ciphertext block of the previous chunk
+        """
         ciphertext = bytearray()
-        previous_block = iv
         
-        # Encrypt each block
-        for i in range(0, len(padded), self.block_size):
-            block = padded[i:i + self.block_size]
-            
-            # XOR with previous block (or IV)
-            xored = bytes(a ^ b for a, b in zip(block, previous_block))
-            
-            # Encrypt
-            encrypted_block = self.aes_core.encrypt_block(xored, key)
-            ciphertext.extend(encrypted_block)
-            
-            # Update previous block
-            previous_block = encrypted_block
+        with METRICS.timer('block_cipher', len(padded)):
+            # Encrypt each block
+            for i in range(0, len(padded), self.block_size):
+                block = padded[i:i + self.block_size]
+                
+                # XOR with previous block (or IV)
+                xored = xor_bytes(block, previous_block)
+                
+                # Encrypt
+                encrypted_block = self.aes_core.encrypt_block(xored, schedule)
+                ciphertext.extend(encrypted_block)
+                
+                # Update previous block
+                previous_block = encrypted_block
+        
+        return bytes(ciphertext)
+    
+    def _decrypt_cbc_raw(self, ciphertext, schedule, previous_block):
+        """
+        CBC-decrypt whole blocks without removing padding
+        previous_block: IV, or the ciphertext block preceding this chunk
+        """
+        if not ciphertext:
+            return b''
         
-        return bytes(ciphertext), iv
+        # P_i = D(C_i) XOR C_{i-1}: every D(C_i) is independent, so decrypt
+        # all blocks in one batch and XOR with the ciphertext shifted by one block
+        with METRICS.timer('block_cipher', len(ciphertext)):
+            decrypted = self.aes_core.decrypt_blocks(ciphertext, schedule)
+        previous_blocks = previous_block + ciphertext[:-self.block_size]
+        return xor_bytes(decrypted, previous_blocks)
     
-    def decrypt_cbc(self, ciphertext, key, iv):
+    def decrypt_cbc(self, ciphertext, key, iv, workers=None):
         """
         AES-CBC Decryption
         ciphertext: bytes
         key: 16 bytes
         iv: 16 bytes
+        workers: number of processes (None or 1 = decrypt in this process)
         Returns: bytes (plaintext)
         """
-        key = self._validate_key(key)
+        schedule = self._prepare_key(key)
         iv = self._validate_iv(iv)
         
         if len(ciphertext) % self.block_size != 0:
             raise ValueError("Ciphertext length must be multiple of block size")
         
-        plaintext = bytearray()
-        previous_block = iv
-        
-        # Decrypt each block
-        for i in range(0, len(ciphertext), self.block_size):
-            block = ciphertext[i:i + self.block_size]
-            
-            # Decrypt
-            decrypted_block = self.aes_core.decrypt_block(block, key)
-            
-            # XOR with previous block
-            xored = bytes(a ^ b for a, b in zip(decrypted_block, previous_block))
-            plaintext.extend(xored)
-            
-            # Update previous block
-            previous_block = block
+        if workers and workers > 1:
+            # Contiguous chunks, each with its chaining block, across a process pool
+            chunks = split_cbc_chunks(ciphertext, iv, self.block_size, workers,
+                                      self.parallel_min_chunk)
+            chunk_args = [(self.engine, key, chunk, previous_block)
+                          for chunk, previous_block in chunks]
+            plaintext = b''.join(map_chunks(_decrypt_cbc_chunk, chunk_args, workers))
+        else:
+            plaintext = self._decrypt_cbc_raw(ciphertext, schedule, iv)
         
         # Remove padding
-        return self._pkcs7_unpad(bytes(plaintext))
+        return self._pkcs7_unpad(plaintext)
+    
+    # ==================== CTR MODE ====================
+    
+    def _ctr_keystream(self, schedule, nonce, first_block, block_count):
+        """
+        Keystream for blocks [first_block, first_block + block_count)
+        Counter block i = (nonce + i) mod 2^128, big-endian
+        """
+        counter = int.from_bytes(nonce, 'big') + first_block
+        counter_blocks = b''.join(
+            ((counter + i) & ((1 << 128) - 1)).to_bytes(16, 'big')
+            for i in range(block_count)
+        )
+        # Counter blocks are independent - the engine may encrypt them in one batch
+        with METRICS.timer('block_cipher', len(counter_blocks)):
+            return self.aes_core.encrypt_blocks(counter_blocks, schedule)
+    
+    def _ctr_xor(self, data, key, nonce, offset):
+        """XOR data with the keystream starting at byte offset"""
+        schedule = self._prepare_key(key)
+        nonce = self._validate_nonce(nonce)
+        return self._ctr_xor_raw(data, schedule, nonce, offset)
+    
+    def _ctr_xor_raw(self, data, schedule, nonce, offset):
+        """XOR data with the keystream of a prepared key, starting at byte offset"""
+        if not data:
+            return b''
+        
+        first_block = offset // self.block_size
+        last_block = (offset + len(data) - 1) // self.block_size
+        keystream = self._ctr_keystream(schedule, nonce, first_block,
+                                        last_block - first_block + 1)
+        
+        skip = offset % self.block_size
+        return xor_bytes(data, keystream[skip:skip + len(data)])
+    
+    def encrypt_ctr(self, plaintext, key, nonce=None):
+        """
+        AES-CTR Encryption (no padding, ciphertext length = plaintext length)
+        plaintext: bytes
+        key: 16 bytes
+        nonce: 16-byte initial counter block (if None, generate random)
+        Returns: (ciphertext, nonce) tuple
+        """
+        if nonce is None:
+            nonce = os.urandom(16)
+        
+        return self._ctr_xor(plaintext, key, nonce, 0), nonce
+    
+    def decrypt_ctr(self, ciphertext, key, nonce):
+        """
+        AES-CTR Decryption
+        ciphertext: bytes
+        key: 16 bytes
+        nonce: 16 bytes (same as used for encryption)
+        Returns: bytes (plaintext)
+        """
+        return self._ctr_xor(ciphertext, key, nonce, 0)
+    
+    def decrypt_range(self, ciphertext, key, nonce, offset, length):
+        """
+        Decrypt only bytes [offset, offset + length) of a CTR ciphertext
+        Generates just the keystream blocks covering that range
+        ciphertext: full CTR ciphertext (bytes, bytearray or memoryview)
+        Returns: bytes (plaintext of the range, shorter if it runs past the end)
+        """
+        if offset < 0 or length < 0:
+            raise ValueError("Offset and length must be non-negative")
+        
+        chunk = bytes(ciphertext[offset:offset + length])
+        return self._ctr_xor(chunk, key, nonce, offset)
+    
+    # ==================== STREAMING ====================
+    
+    def encryptor(self, key, mode='ECB', iv=None):
+        """Incremental encryption object: update(chunk) ... finalize()"""
+        return Encryptor(self, key, mode, iv)
+    
+    def decryptor(self, key, mode='ECB', iv=None):
+        """Incremental decryption object: update(chunk) ... finalize()"""
+        return Decryptor(self, key, mode, iv)
     
     # ==================== GENERAL INTERFACE ====================
     
     def encrypt(self, plaintext, key, mode='ECB', iv=None):
         """
         General encryption interface
-        mode: 'ECB' or 'CBC'
+        mode: 'ECB', 'CBC' or 'CTR' (iv is the CTR nonce)
         Returns: (ciphertext, iv_used) - iv_used is None for ECB
         """
         mode = mode.upper()
@@ -192,14 +345,19 @@ class AESModes:
             ciphertext, iv_used = self.encrypt_cbc(plaintext, key, iv)
             return ciphertext, iv_used
         
+        elif mode == 'CTR':
+            ciphertext, nonce_used = self.encrypt_ctr(plaintext, key, iv)
+            return ciphertext, nonce_used
+        
         else:
             raise ValueError(f"Unsupported mode: {mode}")
     
-    def decrypt(self, ciphertext, key, mode='ECB', iv=None):
+    def decrypt(self, ciphertext, key, mode='ECB', iv=None, workers=None):
         """
         General decryption interface
-        mode: 'ECB' or 'CBC'
-        iv: Required for CBC, ignored for ECB
+        mode: 'ECB', 'CBC' or 'CTR'
+        iv: Required for CBC and CTR (nonce), ignored for ECB
+        workers: process count for parallel CBC decryption
         Returns: plaintext
         """
         mode = mode.upper()
@@ -210,12 +368,159 @@ class AESModes:
         elif mode == 'CBC':
             if iv is None:
                 raise ValueError("IV is required for CBC mode")
-            return self.decrypt_cbc(ciphertext, key, iv)
+            return self.decrypt_cbc(ciphertext, key, iv, workers=workers)
+        
+        elif mode == 'CTR':
+            if iv is None:
+                raise ValueError("Nonce is required for CTR mode")
+            return self.decrypt_ctr(ciphertext, key, iv)
         
         else:
             raise ValueError(f"Unsupported mode: {mode}")
 
 
+class Encryptor:
+    """
+    Incremental AES encryption with constant memory
+    update(chunk) returns the ciphertext of every complete block so far
+    finalize() applies PKCS#7 padding (ECB/CBC) and returns the last block(s)
+    iv: IV (CBC) or nonce (CTR) actually used - random if not given
+    """
+    
+    def __init__(self, modes, key, mode='ECB', iv=None):
+        self.modes = modes
+        self.mode = mode.upper()
+        self.schedule = modes._prepare_key(key)
+        self.block_size = modes.block_size
+        self._buffer = b''
+        self._offset = 0
+        self._finalized = False
+        
+        if self.mode == 'ECB':
+            self.iv = None
+        elif self.mode == 'CBC':
+            self.iv = os.urandom(16) if iv is None else modes._validate_iv(iv)
+            self._previous_block = self.iv
+        elif self.mode == 'CTR':
+            self.iv = modes._validate_nonce(os.urandom(16) if iv is None else iv)
+        else:
+            raise ValueError(f"Unsupported mode: {mode}")
+    
+    def _encrypt(self, blocks):
+        """Encrypt whole blocks, carrying the CBC chaining value across calls"""
+        if self.mode == 'ECB':
+            return self.modes._encrypt_ecb_raw(blocks, self.schedule)
+        
+        ciphertext = self.modes._encrypt_cbc_raw(blocks, self.schedule, self._previous_block)
+        if ciphertext:
+            self._previous_block = ciphertext[-self.block_size:]
+        return ciphertext
+    
+    def update(self, data):
+        """Feed plaintext, get back ciphertext for all complete blocks"""
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        
+        if self.mode == 'CTR':
+            ciphertext = self.modes._ctr_xor_raw(data, self.schedule, self.iv, self._offset)
+            self._offset += len(data)
+            return ciphertext
+        
+        self._buffer += data
+        ready = len(self._buffer) - len(self._buffer) % self.block_size
+        blocks, self._buffer = self._buffer[:ready], self._buffer[ready:]
+        return self._encrypt(blocks)
+    
+    def finalize(self):
+        """Pad and encrypt the remaining bytes"""
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        self._finalized = True
+        
+        if self.mode == 'CTR':
+            return b''
+        
+        padded = self.modes._pkcs7_pad(self._buffer)
+        self._buffer = b''
+        return self._encrypt(padded)
+
+
+class Decryptor:
+    """
+    Incremental AES decryption with constant memory
+    The last block is held back until finalize() so padding can be removed
+    """
+    
+    def __init__(self, modes, key, mode='ECB', iv=None):
+        self.modes = modes
+        self.mode = mode.upper()
+        self.schedule = modes._prepare_key(key)
+        self.block_size = modes.block_size
+        self._buffer = b''
+        self._offset = 0
+        self._finalized = False
+        
+        if self.mode == 'ECB':
+            self.iv = None
+        elif self.mode == 'CBC':
+            if iv is None:
+                raise ValueError("IV is required for CBC mode")
+            self.iv = modes._validate_iv(iv)
+            self._previous_block = self.iv
+        elif self.mode == 'CTR':
+            self.iv = modes._validate_nonce(iv)
+        else:
+            raise ValueError(f"Unsupported mode: {mode}")
+    
+    def _decrypt(self, blocks):
+        """Decrypt whole blocks, carrying the CBC chaining value across calls"""
+        if self.mode == 'ECB':
+            return self.modes._decrypt_ecb_raw(blocks, self.schedule)
+        
+        plaintext = self.modes._decrypt_cbc_raw(blocks, self.schedule, self._previous_block)
+        if blocks:
+            self._previous_block = blocks[-self.block_size:]
+        return plaintext
+    
+    def update(self, data):
+        """Feed ciphertext, get back plaintext for all blocks except the last"""
+        if self._finalized:
+            raise ValueError("Decryptor already finalized")
+        
+        if self.mode == 'CTR':
+            plaintext = self.modes._ctr_xor_raw(data, self.schedule, self.iv, self._offset)
+            self._offset += len(data)
+            return plaintext
+        
+        self._buffer += data
+        # Keep at least one full block back for unpadding in finalize()
+        ready = max(0, (len(self._buffer) - 1) // self.block_size * self.block_size)
+        blocks, self._buffer = self._buffer[:ready], self._buffer[ready:]
+        return self._decrypt(blocks)
+    
+    def finalize(self):
+        """Decrypt the held-back block and remove padding"""
+        if self._finalized:
+            raise ValueError("Decryptor already finalized")
+        self._finalized = True
+        
+        if self.mode == 'CTR' or not self._buffer:
+            return b''
+        
+        if len(self._buffer) != self.block_size:
+            raise ValueError("Ciphertext length must be multiple of block size")
+        
+        last_block = self._decrypt(self._buffer)
+        self._buffer = b''
+        return self.modes._pkcs7_unpad(last_block)
+
+
+def _decrypt_cbc_chunk(engine, key, chunk, previous_block):
+    """Process pool worker: CBC-decrypt one chunk (padding stays on the last chunk)"""
+    aes = AESModes(engine=engine)
+    return aes._decrypt_cbc_raw(chunk, aes._prepare_key(key), previous_block)
+
+
 def test_aes_modes():
     """Test AES modes"""
     aes = AESModes()
@@ -0,0 +1,181 @@
+"""
+AES NumPy Engine
+Vectorized AES-128 for independent blocks (ECB, CBC decryption, CTR keystream)
+All N blocks go through each round together as an (N, 16) uint8 array
+Single blocks (CBC encryption, streaming) go to the T-table engine - a one-row
+batch costs more in NumPy call overhead than the whole scalar block
+Optional: requires numpy (AESModes falls back to the pure-Python engines without it)
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+from .aes_core import AESCore, AESKeySchedule
+from .aes_ttable import AESTTableCore
+from .aes_tables import (
+    SBOX, INV_SBOX,
+    GMUL_2, GMUL_3, GMUL_9, GMUL_11, GMUL_13, GMUL_14
+)
+
+HAS_NUMPY = np is not None
+
+
+class AESNumpyKeySchedule:
+    """
+    Expanded AES-128 key as uint8 arrays
+    encrypt_round_keys: (11, 16), K[0] .. K[10]
+    decrypt_round_keys: (11, 16), K[10] .. K[0]
+    scalar: AESTTableKeySchedule for single-block calls
+    """
+
+    __slots__ = ('key', 'encrypt_round_keys', 'decrypt_round_keys', 'scalar')
+
+    def __init__(self, schedule, scalar):
+        self.key = schedule.key
+        self.encrypt_round_keys = np.array(schedule.encrypt_round_keys, dtype=np.uint8).reshape(-1, 16)
+        self.decrypt_round_keys = np.array(schedule.decrypt_round_keys, dtype=np.uint8).reshape(-1, 16)
+        self.scalar = scalar
+
+
+class AESNumpyCore(AESCore):
+    """
+    AES-128 NumPy Implementation
+    Same interface as AESCore plus batch encrypt_blocks()/decrypt_blocks()
+    """
+
+    # Blocks per vectorized batch - bounds temporary memory on huge inputs
+    batch_blocks = 65536
+
+    def __init__(self):
+        if not HAS_NUMPY:
+            raise ImportError("AESNumpyCore requires numpy")
+
+        super().__init__()
+
+        # Scalar engine for encrypt_block()/decrypt_block()
+        self._scalar = AESTTableCore()
+
+        self._sbox = np.array(SBOX, dtype=np.uint8)
+        self._inv_sbox = np.array(INV_SBOX, dtype=np.uint8)
+        self._gmul = {
+            n: np.array(table, dtype=np.uint8)
+            for n, table in [(2, GMUL_2), (3, GMUL_3), (9, GMUL_9),
+                             (11, GMUL_11), (13, GMUL_13), (14, GMUL_14)]
+        }
+
+        # ShiftRows as a fixed column permutation of the 16 state bytes
+        # byte index = row + 4*col (column-major, same as _bytes_to_state)
+        self._shift = np.array([r + 4 * ((c + r) % 4) for c in range(4) for r in range(4)])
+        self._inv_shift = np.array([r + 4 * ((c - r) % 4) for c in range(4) for r in range(4)])
+
+    # ==================== KEY EXPANSION ====================
+
+    def prepare(self, key):
+        """
+        Expand key once into uint8 round key arrays
+        Returns: AESNumpyKeySchedule
+        """
+        return AESNumpyKeySchedule(super().prepare(key), self._scalar.prepare(key))
+
+    def _schedule(self, key):
+        """Accept raw key bytes or an already prepared schedule"""
+        if isinstance(key, AESNumpyKeySchedule):
+            return key
+        if isinstance(key, AESKeySchedule):
+            return AESNumpyKeySchedule(key, self._scalar.prepare(key.key))
+        return self.prepare(key)
+
+    # ==================== VECTORIZED ROUNDS ====================
+
+    def _mix_columns_batch(self, state):
+        """MixColumns on all blocks: state (N, 16) viewed as (N, col, row)"""
+        cols = state.reshape(-1, 4, 4)
+        s0, s1, s2, s3 = cols[:, :, 0], cols[:, :, 1], cols[:, :, 2], cols[:, :, 3]
+        g2, g3 = self._gmul[2], self._gmul[3]
+
+        out = np.empty_like(cols)
+        out[:, :, 0] = g2[s0] ^ g3[s1] ^ s2 ^ s3
+        out[:, :, 1] = s0 ^ g2[s1] ^ g3[s2] ^ s3
+        out[:, :, 2] = s0 ^ s1 ^ g2[s2] ^ g3[s3]
+        out[:, :, 3] = g3[s0] ^ s1 ^ s2 ^ g2[s3]
+        return out.reshape(-1, 16)
+
+    def _inv_mix_columns_batch(self, state):
+        """InvMixColumns on all blocks"""
+        cols = state.reshape(-1, 4, 4)
+        s0, s1, s2, s3 = cols[:, :, 0], cols[:, :, 1], cols[:, :, 2], cols[:, :, 3]
+        g9, g11, g13, g14 = self._gmul[9], self._gmul[11], self._gmul[13], self._gmul[14]
+
+        out = np.empty_like(cols)
+        out[:, :, 0] = g14[s0] ^ g11[s1] ^ g13[s2] ^ g9[s3]
+        out[:, :, 1] = g9[s0] ^ g14[s1] ^ g11[s2] ^ g13[s3]
+        out[:, :, 2] = g13[s0] ^ g9[s1] ^ g14[s2] ^ g11[s3]
+        out[:, :, 3] = g11[s0] ^ g13[s1] ^ g9[s2] ^ g14[s3]
+        return out.reshape(-1, 16)
+
+    def _encrypt_batch(self, state, rk):
+        """Encrypt an (N, 16) uint8 array in place of the per-block loop"""
+        state = state ^ rk[0]
+
+        for round_num in range(1, self.Nr):
+            state = self._sbox[state][:, self._shift]
+            state = self._mix_columns_batch(state)
+            state ^= rk[round_num]
+
+        state = self._sbox[state][:, self._shift]
+        state ^= rk[self.Nr]
+        return state
+
+    def _decrypt_batch(self, state, dk):
+        """Decrypt an (N, 16) uint8 array; dk holds round keys in reverse order"""
+        state = state ^ dk[0]
+
+        for i in range(1, self.Nr):
+            state = self._inv_sbox[state[:, self._inv_shift]]
+            state ^= dk[i]
+            state = self._inv_mix_columns_batch(state)
+
+        state = self._inv_sbox[state[:, self._inv_shift]]
+        state ^= dk[self.Nr]
+        return state
+
+    def _run_batches(self, data, batch_fn, round_keys):
+        """Split data into bounded batches of whole blocks and run batch_fn on each"""
+        if len(data) % 16 != 0:
+            raise ValueError("Data length must be multiple of block size")
+
+        blocks = np.frombuffer(bytes(data), dtype=np.uint8).reshape(-1, 16)
+        out = np.empty_like(blocks)
+
+        for start in range(0, len(blocks), self.batch_blocks):
+            end = start + self.batch_blocks
+            out[start:end] = batch_fn(blocks[start:end], round_keys)
+
+        return out.tobytes()
+
+    # ==================== MAIN ENCRYPTION/DECRYPTION ====================
+
+    def encrypt_blocks(self, data, key):
+        """
+        Encrypt a buffer of whole 16-byte blocks independently (ECB)
+        data: bytes, length multiple of 16
+        key: 16 bytes or prepared schedule
+        Returns: bytes
+        """
+        rk = self._schedule(key).encrypt_round_keys
+        return self._run_batches(data, self._encrypt_batch, rk)
+
+    def decrypt_blocks(self, data, key):
+        """Decrypt a buffer of whole 16-byte blocks independently (ECB)"""
+        dk = self._schedule(key).decrypt_round_keys
+        return self._run_batches(data, self._decrypt_batch, dk)
+
+    def encrypt_block(self, plaintext_block, key):
+        """Encrypt one 16-byte block (T-table path)"""
+        return self._scalar.encrypt_block(plaintext_block, self._schedule(key).scalar)
+
+    def decrypt_block(self, ciphertext_block, key):
+        """Decrypt one 16-byte block (T-table path)"""
+        return self._scalar.decrypt_block(ciphertext_block, self._schedule(key).scalar)
@@ -76,6 +76,27 @@ GMUL_13 = [gmul(i, 13) for i in range(256)]
 GMUL_14 = [gmul(i, 14) for i in range(256)]
 
 
+# T-tables (32-bit words) - used by the T-table engine
+# Each entry merges SubBytes + MixColumns for one byte of a column:
+# Te0[x] = (2*S[x], S[x], S[x], 3*S[x]), Te1..Te3 are byte rotations of Te0
+# Td0[x] = (14*Si[x], 9*Si[x], 13*Si[x], 11*Si[x]), Td1..Td3 likewise
+def _ror8(word):
+    """Rotate 32-bit word right by 8 bits"""
+    return ((word >> 8) | (word << 24)) & 0xFFFFFFFF
+
+
+TE0 = [(GMUL_2[s] << 24) | (s << 16) | (s << 8) | GMUL_3[s] for s in SBOX]
+TE1 = [_ror8(w) for w in TE0]
+TE2 = [_ror8(w) for w in TE1]
+TE3 = [_ror8(w) for w in TE2]
+
+TD0 = [(GMUL_14[s] << 24) | (GMUL_9[s] << 16) | (GMUL_13[s] << 8) | GMUL_11[s]
+       for s in INV_SBOX]
+TD1 = [_ror8(w) for w in TD0]
+TD2 = [_ror8(w) for w in TD1]
+TD3 = [_ror8(w) for w in TD2]
+
+
 def test_tables():
     """Test the tables"""
     print("Testing AES Tables...")
@@ -91,6 +112,14 @@ def test_tables():
     assert gmul(0x57, 0x13) == 0xFE
     
     print("✓ GF multiplication test passed!")
+    
+    # Test T-tables against the byte-wise definitions
+    for i in range(256):
+        s = SBOX[i]
+        assert TE0[i] == (gmul(s, 2) << 24) | (s << 16) | (s << 8) | gmul(s, 3)
+        assert TE3[i] == (s << 24) | (s << 16) | (gmul(s, 3) << 8) | gmul(s, 2)
+    
+    print("✓ T-table test passed!")
     print("✓ All table tests passed!")
 
 
@@ -0,0 +1,149 @@
+"""
+AES T-table Engine
+AES-128 with the state held as four 32-bit column words
+SubBytes + ShiftRows + MixColumns merged into table lookups (TE0..TE3 / TD0..TD3)
+"""
+
+from .aes_core import AESCore, AESKeySchedule
+from .aes_tables import (
+    SBOX, INV_SBOX,
+    TE0, TE1, TE2, TE3,
+    TD0, TD1, TD2, TD3
+)
+
+
+class AESTTableKeySchedule:
+    """
+    Expanded AES-128 key for the T-table engine
+    encrypt_words: 44 round key words, K[0] .. K[10]
+    decrypt_words: 44 round key words, K[10] .. K[0],
+                   InvMixColumns applied to K[9] .. K[1] (equivalent inverse cipher)
+    """
+
+    __slots__ = ('key', 'encrypt_words', 'decrypt_words')
+
+    def __init__(self, key, encrypt_words, decrypt_words):
+        self.key = bytes(key)
+        self.encrypt_words = tuple(encrypt_words)
+        self.decrypt_words = tuple(decrypt_words)
+
+
+class AESTTableCore(AESCore):
+    """
+    AES-128 T-table Implementation
+    Same interface as AESCore, several times faster per block
+    """
+
+    # ==================== KEY EXPANSION ====================
+
+    def _inv_mix_column_word(self, word):
+        """InvMixColumns on one column word (TD tables include InvSubBytes, so undo it with SBOX)"""
+        return (TD0[SBOX[word >> 24]] ^
+                TD1[SBOX[(word >> 16) & 0xFF]] ^
+                TD2[SBOX[(word >> 8) & 0xFF]] ^
+                TD3[SBOX[word & 0xFF]])
+
+    def prepare(self, key):
+        """
+        Expand key once into encryption and decryption round key words
+        key: 16 bytes
+        Returns: AESTTableKeySchedule
+        """
+        words = [int.from_bytes(bytes(w), 'big') for w in self.key_expansion(key)]
+
+        decrypt_words = []
+        for round_num in range(self.Nr, -1, -1):
+            round_words = words[4*round_num:4*round_num + 4]
+            if 0 < round_num < self.Nr:
+                round_words = [self._inv_mix_column_word(w) for w in round_words]
+            decrypt_words.extend(round_words)
+
+        return AESTTableKeySchedule(key, words, decrypt_words)
+
+    def _schedule(self, key):
+        """Accept raw key bytes or an already prepared schedule"""
+        if isinstance(key, AESTTableKeySchedule):
+            return key
+        if isinstance(key, AESKeySchedule):
+            key = key.key
+        return self.prepare(key)
+
+    # ==================== MAIN ENCRYPTION/DECRYPTION ====================
+
+    def encrypt_block(self, plaintext_block, key):
+        """
+        Encrypt one 16-byte block
+        plaintext_block: 16 bytes
+        key: 16 bytes or AESTTableKeySchedule from prepare()
+        Returns: 16 bytes
+        """
+        if len(plaintext_block) != 16:
+            raise ValueError("Block must be 16 bytes")
+
+        rk = self._schedule(key).encrypt_words
+
+        # Initial round key addition
+        s0 = int.from_bytes(plaintext_block[0:4], 'big') ^ rk[0]
+        s1 = int.from_bytes(plaintext_block[4:8], 'big') ^ rk[1]
+        s2 = int.from_bytes(plaintext_block[8:12], 'big') ^ rk[2]
+        s3 = int.from_bytes(plaintext_block[12:16], 'big') ^ rk[3]
+
+        # Main rounds (1-9): one lookup per byte, ShiftRows folded into the indexing
+        for i in range(4, 4 * self.Nr, 4):
+            t0 = TE0[s0 >> 24] ^ TE1[(s1 >> 16) & 0xFF] ^ TE2[(s2 >> 8) & 0xFF] ^ TE3[s3 & 0xFF] ^ rk[i]
+            t1 = TE0[s1 >> 24] ^ TE1[(s2 >> 16) & 0xFF] ^ TE2[(s3 >> 8) & 0xFF] ^ TE3[s0 & 0xFF] ^ rk[i + 1]
+            t2 = TE0[s2 >> 24] ^ TE1[(s3 >> 16) & 0xFF] ^ TE2[(s0 >> 8) & 0xFF] ^ TE3[s1 & 0xFF] ^ rk[i + 2]
+            t3 = TE0[s3 >> 24] ^ TE1[(s0 >> 16) & 0xFF] ^ TE2[(s1 >> 8) & 0xFF] ^ TE3[s2 & 0xFF] ^ rk[i + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+
+        # Final round (no MixColumns): plain S-box lookups
+        i = 4 * self.Nr
+        t0 = ((SBOX[s0 >> 24] << 24) | (SBOX[(s1 >> 16) & 0xFF] << 16) |
+              (SBOX[(s2 >> 8) & 0xFF] << 8) | SBOX[s3 & 0xFF]) ^ rk[i]
+        t1 = ((SBOX[s1 >> 24] << 24) | (SBOX[(s2 >> 16) & 0xFF] << 16) |
+              (SBOX[(s3 >> 8) & 0xFF] << 8) | SBOX[s0 & 0xFF]) ^ rk[i + 1]
+        t2 = ((SBOX[s2 >> 24] << 24) | (SBOX[(s3 >> 16) & 0xFF] << 16) |
+              (SBOX[(s0 >> 8) & 0xFF] << 8) | SBOX[s1 & 0xFF]) ^ rk[i + 2]
+        t3 = ((SBOX[s3 >> 24] << 24) | (SBOX[(s0 >> 16) & 0xFF] << 16) |
+              (SBOX[(s1 >> 8) & 0xFF] << 8) | SBOX[s2 & 0xFF]) ^ rk[i + 3]
+
+        return ((t0 << 96) | (t1 << 64) | (t2 << 32) | t3).to_bytes(16, 'big')
+
+    def decrypt_block(self, ciphertext_block, key):
+        """
+        Decrypt one 16-byte block
+        ciphertext_block: 16 bytes
+        key: 16 bytes or AESTTableKeySchedule from prepare()
+        Returns: 16 bytes
+        """
+        if len(ciphertext_block) != 16:
+            raise ValueError("Block must be 16 bytes")
+
+        dk = self._schedule(key).decrypt_words
+
+        # Initial round key addition (with last round key)
+        s0 = int.from_bytes(ciphertext_block[0:4], 'big') ^ dk[0]
+        s1 = int.from_bytes(ciphertext_block[4:8], 'big') ^ dk[1]
+        s2 = int.from_bytes(ciphertext_block[8:12], 'big') ^ dk[2]
+        s3 = int.from_bytes(ciphertext_block[12:16], 'big') ^ dk[3]
+
+        # Main rounds in reverse (9-1): InvShiftRows shifts the other way
+        for i in range(4, 4 * self.Nr, 4):
+            t0 = TD0[s0 >> 24] ^ TD1[(s3 >> 16) & 0xFF] ^ TD2[(s2 >> 8) & 0xFF] ^ TD3[s1 & 0xFF] ^ dk[i]
+            t1 = TD0[s1 >> 24] ^ TD1[(s0 >> 16) & 0xFF] ^ TD2[(s3 >> 8) & 0xFF] ^ TD3[s2 & 0xFF] ^ dk[i + 1]
+            t2 = TD0[s2 >> 24] ^ TD1[(s1 >> 16) & 0xFF] ^ TD2[(s0 >> 8) & 0xFF] ^ TD3[s3 & 0xFF] ^ dk[i + 2]
+            t3 = TD0[s3 >> 24] ^ TD1[(s2 >> 16) & 0xFF] ^ TD2[(s1 >> 8) & 0xFF] ^ TD3[s0 & 0xFF] ^ dk[i + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+
+        # Final round (no InvMixColumns)
+        i = 4 * self.Nr
+        t0 = ((INV_SBOX[s0 >> 24] << 24) | (INV_SBOX[(s3 >> 16) & 0xFF] << 16) |
+              (INV_SBOX[(s2 >> 8) & 0xFF] << 8) | INV_SBOX[s1 & 0xFF]) ^ dk[i]
+        t1 = ((INV_SBOX[s1 >> 24] << 24) | (INV_SBOX[(s0 >> 16) & 0xFF] << 16) |
+              (INV_SBOX[(s3 >> 8) & 0xFF] << 8) | INV_SBOX[s2 & 0xFF]) ^ dk[i + 1]
+        t2 = ((INV_SBOX[s2 >> 24] << 24) | (INV_SBOX[(s1 >> 16) & 0xFF] << 16) |
+              (INV_SBOX[(s0 >> 8) & 0xFF] << 8) | INV_SBOX[s3 & 0xFF]) ^ dk[i + 2]
+        t3 = ((INV_SBOX[s3 >> 24] << 24) | (INV_SBOX[(s2 >> 16) & 0xFF] << 16) |
+              (INV_SBOX[(s1 >> 8) & 0xFF] << 8) | INV_SBOX[s0 & 0xFF]) ^ dk[i + 3]
+
+        return ((t0 << 96) | (t1 << 64) | (t2 << 32) | t3).to_bytes(16, 'big')
@@ -3,6 +3,10 @@ Caesar Cipher - Brute Force Attack
 Thuật toán: Thử tất cả 26 khóa có thể và chọn kết quả hợp lý nhất
 """
 
+from ..ngram_tables import (dense_table, letter_counts, chi_squared_counts, shift_chi_squared,
+                            shift_table)
+from ..cancellation import check_cancelled
+
 class CaesarCipher:
     def __init__(self):
         # Tần suất chữ cái tiếng Anh (%)
@@ -13,6 +17,8 @@ class CaesarCipher:
             'f': 2.23, 'g': 2.02, 'y': 1.97, 'p': 1.93, 'b': 1.29,
             'v': 0.98, 'k': 0.77, 'j': 0.15, 'x': 0.15, 'q': 0.10, 'z': 0.07
         }
+        # Bảng dense 26 phần tử (index = mã chữ cái) cho chi-squared
+        self.english_freq_table = dense_table(self.english_freq, 1)
         
         # Từ phổ biến để kiểm tra
         self.common_words = {
@@ -23,47 +29,35 @@ class CaesarCipher:
         }
     
     def decrypt_with_key(self, ciphertext, key):
-        """Giải mã với một khóa cụ thể"""
-        plaintext = []
-        
-        for char in ciphertext:
-            if char.isupper():
-                # Chữ hoa A-Z
-                shifted = (ord(char) - ord('A') - key) % 26
-                plaintext.append(chr(shifted + ord('A')))
-            elif char.islower():
-                # Chữ thường a-z
-                shifted = (ord(char) - ord('a') - key) % 26
-                plaintext.append(chr(shifted + ord('a')))
-            else:
-                # Giữ nguyên ký tự khác (dấu câu, số, khoảng trắng)
-                plaintext.append(char)
-        
-        return ''.join(plaintext)
+        """
+        Giải mã với một khóa cụ thể
+        1 lần str.translate với bảng dựng sẵn cho khóa (key % 26)
+        Chữ A-Z / a-z được dịch, giữ nguyên ký tự khác (dấu câu, số, khoảng trắng, chữ có dấu)
+        """
+        return ciphertext.translate(shift_table(key))
     
     def calculate_frequency_score(self, text):
         """Tính điểm dựa trên tần suất chữ cái"""
-        text_lower = text.lower()
-        letter_count = {}
-        total_letters = 0
-        
-        # Đếm tần suất
-        for char in text_lower:
-            if char.isalpha():
-                letter_count[char] = letter_count.get(char, 0) + 1
-                total_letters += 1
+        # Đếm tần suất (a..z + các chữ cái khác)
+        counts = letter_counts(text)
+        total_letters = sum(counts)
         
         if total_letters == 0:
             return 0
         
-        # Tính chi-squared statistic
-        score = 0
-        for letter in 'abcdefghijklmnopqrstuvwxyz':
-            observed = letter_count.get(letter, 0) / total_letters * 100
-            expected = self.english_freq[letter]
-            score += ((observed - expected) ** 2) / expected
-        
-        return score
+        # Tính chi-squared statistic (bảng tần suất tính theo %)
+        return chi_squared_counts(counts, total_letters, self.english_freq_table, scale=100)
+    
+    def shift_frequency_scores(self, ciphertext):
+        """
+        Điểm tần suất (chi-squared) của cả 26 khóa từ 1 histogram của ciphertext
+        Giống calculate_frequency_score(decrypt_with_key(ciphertext, k)) nhưng không
+        tạo lại plaintext
+        Returns: list 26 điểm, index = khóa
+        """
+        scores = shift_chi_squared(letter_counts(ciphertext), self.english_freq_table, scale=100)
+        # Không có chữ cái nào: giữ nguyên quy ước của calculate_frequency_score
+        return [0 if score == float('inf') else score for score in scores]
     
     def calculate_word_score(self, text):
         """Tính điểm dựa trên số từ hợp lệ"""
@@ -79,31 +73,52 @@ class CaesarCipher:
         """Loại bỏ dấu câu khỏi từ"""
         return ''.join(char for char in word if char.isalpha())
     
-    def brute_force(self, ciphertext):
+    def brute_force(self, ciphertext, top_candidates=5, prefix_length=2000,
+                    progress=None, cancel=None):
         """
         Thử tất cả 26 khóa và trả về kết quả tốt nhất
-        Returns: (key, plaintext, score)
+        - Điểm tần suất của 26 khóa: xoay 1 histogram (không giải mã 26 lần)
+        - Điểm từ: chỉ cho top_candidates khóa tốt nhất, trên prefix_length ký tự đầu
+          (text ngắn hơn prefix: chấm cả 26 khóa - rẻ, và chi-squared kém tin cậy)
+        - Chỉ plaintext của khóa thắng được tạo ra
+        progress: callback(keys_done, 26, best_combined_score) sau mỗi khóa
+        cancel: CancellationToken - kiểm tra trước mỗi khóa
+        Returns: (key, plaintext, results) - results có 'preview' thay cho plaintext đầy đủ
         """
+        freq_scores = self.shift_frequency_scores(ciphertext)
+        
+        # Prefix cắt ở khoảng trắng để không tạo từ bị cắt dở
+        if len(ciphertext) > prefix_length:
+            prefix = ciphertext[:prefix_length]
+            cut = max(prefix.rfind(' '), prefix.rfind('\n'))
+            if cut > 0:
+                prefix = prefix[:cut]
+            candidates = sorted(range(26), key=lambda k: freq_scores[k])[:top_candidates]
+        else:
+            prefix = ciphertext
+            candidates = range(26)
+        
         best_key = 0
-        best_plaintext = ""
         best_score = float('inf')
         
         results = []
         
         for key in range(26):
-            plaintext = self.decrypt_with_key(ciphertext, key)
-            
-            # Tính điểm tổng hợp
-            freq_score = self.calculate_frequency_score(plaintext)
-            word_score = self.calculate_word_score(plaintext)
+            check_cancelled(cancel)
+            freq_score = freq_scores[key]
             
-            # Điểm càng thấp càng tốt (chi-squared)
-            # Điểm từ càng cao càng tốt
-            combined_score = freq_score - (word_score * 5)  # Ưu tiên word score
+            # Điểm từ chỉ cho các ứng viên (None = không chấm)
+            word_score = None
+            combined_score = freq_score
+            if key in candidates:
+                word_score = self.calculate_word_score(self.decrypt_with_key(prefix, key))
+                # Điểm càng thấp càng tốt (chi-squared)
+                # Điểm từ càng cao càng tốt
+                combined_score = freq_score - (word_score * 5)  # Ưu tiên word score
             
             results.append({
                 'key': key,
-                'plaintext': plaintext,
+                'preview': self.decrypt_with_key(ciphertext[:200], key),
                 'freq_score': freq_score,
                 'word_score': word_score,
                 'combined_score': combined_score
@@ -112,16 +127,24 @@ class CaesarCipher:
             if combined_score < best_score:
                 best_score = combined_score
                 best_key = key
-                best_plaintext = plaintext
+            
+            if progress is not None:
+                progress(key + 1, 26, best_score)
         
+        best_plaintext = self.decrypt_with_key(ciphertext, best_key)
         return best_key, best_plaintext, results
     
-    def crack(self, ciphertext):
+    def crack(self, ciphertext, progress=None, cancel=None, verbose=True):
         """
         Hàm chính để crack Caesar cipher
+        progress, cancel: xem brute_force
+        verbose: in top 3 candidates (False = không in gì)
         Returns: (key, plaintext)
         """
-        key, plaintext, all_results = self.brute_force(ciphertext)
+        key, plaintext, all_results = self.brute_force(ciphertext, progress=progress,
+                                                       cancel=cancel)
+        if not verbose:
+            return key, plaintext
         
         # In ra top 3 kết quả tốt nhất để kiểm tra
         print("\n=== Top 3 Candidates ===")
@@ -129,33 +152,38 @@ class CaesarCipher:
         
         for i, result in enumerate(sorted_results[:3], 1):
             print(f"\n#{i} - Key: {result['key']}")
-            print(f"Word Score: {result['word_score']:.2f}%")
+            if result['word_score'] is not None:
+                print(f"Word Score: {result['word_score']:.2f}%")
             print(f"Frequency Score: {result['freq_score']:.2f}")
-            preview = result['plaintext'][:200].replace('\n', ' ')
+            preview = result['preview'].replace('\n', ' ')
             print(f"Preview: {preview}...")
         
         return key, plaintext
 
 
-def crack_from_file(input_file, output_file):
+def crack_from_file(input_file, output_file, progress=None, cancel=None, verbose=True):
     """
     Crack Caesar cipher từ file và ghi kết quả
     Theo đúng format yêu cầu của Lab06
+    progress, cancel: xem CaesarCipher.brute_force (bị hủy thì không ghi file)
+    verbose: in tiến trình và top 3 candidates ra stdout
     
     Output format:
     - Dòng 1: khóa k
     - Dòng 2+: plaintext
     """
     # Đọc ciphertext
-    print(f"Reading ciphertext from: {input_file}")
+    if verbose:
+        print(f"Reading ciphertext from: {input_file}")
     with open(input_file, 'r', encoding='utf-8') as f:
         ciphertext = f.read()
     
-    print(f"Ciphertext length: {len(ciphertext)} characters")
+    if verbose:
+        print(f"Ciphertext length: {len(ciphertext)} characters")
     
     # Crack
     cipher = CaesarCipher()
-    key, plaintext = cipher.crack(ciphertext)
+    key, plaintext = cipher.crack(ciphertext, progress, cancel, verbose)
     
     # Ghi kết quả theo format yêu cầu
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -164,7 +192,8 @@ def crack_from_file(input_file, output_file):
         # Dòng 2+: plaintext
         f.write(plaintext)
     
-    print(f"\n✓ Results saved to: {output_file}")
-    print(f"Found key: {key}")
+    if verbose:
+        print(f"\n✓ Results saved to: {output_file}")
+        print(f"Found key: {key}")
     
     return key, plaintext
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Cooperative Cancellation
+A token the caller sets and long-running loops poll at cheap checkpoints
+Shared by the crackers, the block-mode file loops and the UI / CLI front ends
+
+Loops check the token every N iterations / blocks and raise OperationCancelled,
+so a cancelled job stops within milliseconds instead of running to the end.
+"""
+
+import multiprocessing
+
+
+class OperationCancelled(Exception):
+    """Raised by a loop that noticed its cancellation token was set"""
+
+
+class CancellationToken:
+    """
+    cancel() from any thread (or process); cancelled / check() from the worker
+    event: object with set() / is_set()
+           default: multiprocessing.Event - can be handed to process pool workers
+           at pool creation (initargs); use a Manager().Event() to pass the token
+           to an already running pool with submit()
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else multiprocessing.Event()
+
+    def cancel(self):
+        """Request cancellation (idempotent)"""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise OperationCancelled if cancellation was requested"""
+        if self._event.is_set():
+            raise OperationCancelled("Operation cancelled")
+
+    def __reduce__(self):
+        return (CancellationToken, (self._event,))
+
+
+def check_cancelled(cancel):
+    """cancel.check() for an optional token (None = never cancelled)"""
+    if cancel is not None:
+        cancel.check()
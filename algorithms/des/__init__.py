@@ -3,7 +3,9 @@ DES Package
 Export DES core and modes
 """
 
-from .des_core import DESCore
-from .des_modes import DESModes
+from .des_core import DESCore, DESKeySchedule
+from .des_modes import DESModes, Encryptor, Decryptor
+from .triple_des import TripleDESCore, TripleDESKeySchedule, TripleDESModes
 
-__all__ = ['DESCore', 'DESModes']
\ No newline at end of file
+__all__ = ['DESCore', 'DESKeySchedule', 'DESModes', 'Encryptor', 'Decryptor',
+           'TripleDESCore', 'TripleDESKeySchedule', 'TripleDESModes']
\ No newline at end of file
@@ -132,180 +132,235 @@ PC2 = [
 SHIFTS = [1, 1, 2, 2, 2, 2, 2, 2, 1, 2, 2, 2, 2, 2, 2, 1]
 
 
-class DESCore:
-    """DES Core Algorithm - mã hóa/giải mã 1 block 64-bit"""
+# ==================== LOOKUP TABLES ====================
+# Block/half/key được giữ dưới dạng int (bit 1 của DES = MSB)
+# Các bảng dưới đây được tính một lần khi import từ các bảng chuẩn ở trên
+
+
+def _build_byte_tables(table, in_bits):
+    """
+    Tách permutation table thành các bảng tra theo từng byte input
+    tables[p][v] = các bit output do byte thứ p (tính từ MSB) có giá trị v đóng góp
+    Permutation = OR của in_bits/8 lần tra bảng
+    """
+    out_bits = len(table)
+    tables = []
+    for p in range(in_bits // 8):
+        byte_table = []
+        for v in range(256):
+            out = 0
+            for j, src in enumerate(table):
+                if (src - 1) // 8 == p and (v >> (7 - (src - 1) % 8)) & 1:
+                    out |= 1 << (out_bits - 1 - j)
+            byte_table.append(out)
+        tables.append(byte_table)
+    return tables
+
+
+def _build_sp_tables():
+    """
+    Gộp S-box và P: SP[i][x] = P(S_i(x) đặt ở vị trí nhóm i)
+    x: 6 bits input của S-box i -> 32 bits output sau P
+    """
+    p_tables = _build_byte_tables(P, 32)
+    sp_tables = []
+    for i in range(8):
+        sp = []
+        for x in range(64):
+            row = ((x >> 4) & 2) | (x & 1)
+            col = (x >> 1) & 0xF
+            s_out = S_BOXES[i][row][col] << (28 - 4 * i)
+            sp.append(_permute_int(s_out, p_tables))
+        sp_tables.append(sp)
+    return sp_tables
+
+
+def _permute_int(value, tables):
+    """Áp dụng permutation bằng bảng tra theo byte (value có len(tables)*8 bits)"""
+    out = 0
+    shift = 8 * (len(tables) - 1)
+    for byte_table in tables:
+        out |= byte_table[(value >> shift) & 0xFF]
+        shift -= 8
+    return out
+
+
+IP_TABLES = _build_byte_tables(IP, 64)        # 64 -> 64 bits
+IP_INV_TABLES = _build_byte_tables(IP_INV, 64)  # 64 -> 64 bits
+PC1_TABLES = _build_byte_tables(PC1, 64)      # 64 -> 56 bits
+PC2_TABLES = _build_byte_tables(PC2, 56)      # 56 -> 48 bits
+SP_TABLES = _build_sp_tables()                # 8 x 64 entries, S-box + P
+
+
+class DESKeySchedule:
+    """
+    DES key đã chuẩn bị sẵn - tạo 1 lần, dùng lại cho mọi block
+    encrypt_round_keys: 16 subkeys K1 .. K16 (128 nhóm 6 bits nối liền)
+    decrypt_round_keys: 16 subkeys K16 .. K1
+    Immutable: có thể dùng chung giữa các thread / cache
+    """
     
-    def __init__(self):
-        pass
+    __slots__ = ('key', 'encrypt_round_keys', 'decrypt_round_keys')
     
-    def _permute(self, block, table):
-        """Áp dụng permutation table lên block"""
-        return [block[i - 1] for i in table]
+    def __init__(self, key, subkeys):
+        object.__setattr__(self, 'key', bytes(key))
+        object.__setattr__(self, 'encrypt_round_keys',
+                           tuple(k for subkey in subkeys for k in subkey))
+        object.__setattr__(self, 'decrypt_round_keys',
+                           tuple(k for subkey in reversed(subkeys) for k in subkey))
     
-    def _xor(self, bits1, bits2):
-        """XOR hai chuỗi bit"""
-        return [b1 ^ b2 for b1, b2 in zip(bits1, bits2)]
+    def __setattr__(self, name, value):
+        raise AttributeError("DESKeySchedule is immutable")
     
-    def _left_shift(self, bits, n):
-        """Dịch trái vòng n bits"""
-        return bits[n:] + bits[:n]
+    @property
+    def subkeys(self):
+        """16 subkeys theo thứ tự mã hóa, mỗi subkey = tuple 8 nhóm 6 bits"""
+        rk = self.encrypt_round_keys
+        return tuple(rk[i:i + 8] for i in range(0, 128, 8))
+
+
+class DESCore:
+    """
+    DES Core Algorithm - mã hóa/giải mã 1 block 64-bit
+    Nửa trái/phải là int 32-bit, mỗi round = 8 lần tra SP table + XOR
+    """
     
-    def _bytes_to_bits(self, data):
-        """Chuyển bytes thành list of bits"""
-        bits = []
-        for byte in data:
-            for i in range(7, -1, -1):
-                bits.append((byte >> i) & 1)
-        return bits
+    def __init__(self):
+        pass
     
-    def _bits_to_bytes(self, bits):
-        """Chuyển list of bits thành bytes"""
-        result = bytearray()
-        for i in range(0, len(bits), 8):
-            byte = 0
-            for j in range(8):
-                if i + j < len(bits):
-                    byte = (byte << 1) | bits[i + j]
-            result.append(byte)
-        return bytes(result)
+    def _initial_permutation(self, block):
+        """IP: 8 bytes -> (left, right) 32-bit"""
+        x = int.from_bytes(block, 'big')
+        t = IP_TABLES
+        x = (t[0][x >> 56] | t[1][(x >> 48) & 0xFF] | t[2][(x >> 40) & 0xFF] |
+             t[3][(x >> 32) & 0xFF] | t[4][(x >> 24) & 0xFF] | t[5][(x >> 16) & 0xFF] |
+             t[6][(x >> 8) & 0xFF] | t[7][x & 0xFF])
+        return x >> 32, x & 0xFFFFFFFF
     
-    def _generate_subkeys(self, key_bits):
-        """Tạo 16 subkeys từ key 64-bit"""
-        # PC-1: 64 bits -> 56 bits
-        key_56 = self._permute(key_bits, PC1)
-        
-        # Chia thành 2 nửa
-        C = key_56[:28]
-        D = key_56[28:]
+    def _final_permutation(self, left, right):
+        """IP^-1: (left, right) 32-bit -> 8 bytes"""
+        x = (left << 32) | right
+        t = IP_INV_TABLES
+        x = (t[0][x >> 56] | t[1][(x >> 48) & 0xFF] | t[2][(x >> 40) & 0xFF] |
+             t[3][(x >> 32) & 0xFF] | t[4][(x >> 24) & 0xFF] | t[5][(x >> 16) & 0xFF] |
+             t[6][(x >> 8) & 0xFF] | t[7][x & 0xFF])
+        return x.to_bytes(8, 'big')
+    
+    def _generate_subkeys(self, key):
+        """
+        Tạo 16 subkeys từ key 64-bit
+        Returns: list 16 subkeys, mỗi subkey = tuple 8 nhóm 6 bits (input của S1..S8)
+        """
+        # PC-1: 64 bits -> 56 bits, chia thành 2 nửa 28 bits
+        cd = _permute_int(int.from_bytes(key, 'big'), PC1_TABLES)
+        C = cd >> 28
+        D = cd & 0x0FFFFFFF
         
         subkeys = []
         
-        for i in range(16):
-            # Left shift
-            C = self._left_shift(C, SHIFTS[i])
-            D = self._left_shift(D, SHIFTS[i])
+        for shift in SHIFTS:
+            # Left shift vòng trên 28 bits
+            C = ((C << shift) | (C >> (28 - shift))) & 0x0FFFFFFF
+            D = ((D << shift) | (D >> (28 - shift))) & 0x0FFFFFFF
             
-            # Combine và PC-2: 56 bits -> 48 bits
-            CD = C + D
-            subkey = self._permute(CD, PC2)
-            subkeys.append(subkey)
+            # PC-2: 56 bits -> 48 bits, tách thành 8 nhóm 6 bits
+            k = _permute_int((C << 28) | D, PC2_TABLES)
+            subkeys.append(tuple((k >> (42 - 6 * i)) & 0x3F for i in range(8)))
         
         return subkeys
     
-    def _s_box_substitution(self, expanded_bits):
-        """Áp dụng 8 S-boxes"""
-        output = []
+    def _rounds(self, left, right, round_keys):
+        """
+        16 rounds Feistel trên 2 nửa 32-bit (sau IP)
+        round_keys: 128 nhóm 6 bits (16 subkeys nối liền, theo thứ tự dùng)
+        Returns: (right, left) - đã swap cuối cùng, sẵn sàng cho IP^-1
+        """
+        sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = SP_TABLES
         
-        for i in range(8):
-            # Lấy 6 bits
-            chunk = expanded_bits[i * 6:(i + 1) * 6]
-            
-            # Row: bit đầu và cuối
-            row = (chunk[0] << 1) | chunk[5]
-            
-            # Column: 4 bits giữa
-            col = (chunk[1] << 3) | (chunk[2] << 2) | (chunk[3] << 1) | chunk[4]
+        for i in range(0, 128, 8):
+            # Expansion E: 8 cửa sổ 6 bits liên tiếp (có wrap-around) của right
+            x = ((right & 1) << 33) | (right << 1) | (right >> 31)
             
-            # Lấy giá trị từ S-box
-            val = S_BOXES[i][row][col]
+            # XOR subkey + S-boxes + P gộp trong SP tables
+            f = (sp0[((x >> 28) & 0x3F) ^ round_keys[i]] ^
+                 sp1[((x >> 24) & 0x3F) ^ round_keys[i + 1]] ^
+                 sp2[((x >> 20) & 0x3F) ^ round_keys[i + 2]] ^
+                 sp3[((x >> 16) & 0x3F) ^ round_keys[i + 3]] ^
+                 sp4[((x >> 12) & 0x3F) ^ round_keys[i + 4]] ^
+                 sp5[((x >> 8) & 0x3F) ^ round_keys[i + 5]] ^
+                 sp6[((x >> 4) & 0x3F) ^ round_keys[i + 6]] ^
+                 sp7[(x & 0x3F) ^ round_keys[i + 7]])
             
-            # Chuyển thành 4 bits
-            for j in range(3, -1, -1):
-                output.append((val >> j) & 1)
+            left, right = right, left ^ f
         
-        return output
+        return right, left
     
-    def _f_function(self, right_half, subkey):
-        """Hàm F của DES"""
-        # Expansion: 32 bits -> 48 bits
-        expanded = self._permute(right_half, E)
-        
-        # XOR với subkey
-        xored = self._xor(expanded, subkey)
-        
-        # S-box substitution: 48 bits -> 32 bits
-        substituted = self._s_box_substitution(xored)
-        
-        # Permutation P
-        result = self._permute(substituted, P)
-        
-        return result
+    def _crypt_block(self, block, round_keys):
+        """IP -> 16 rounds -> IP^-1"""
+        left, right = self._initial_permutation(block)
+        left, right = self._rounds(left, right, round_keys)
+        return self._final_permutation(left, right)
     
-    def _des_round(self, left, right, subkey):
-        """Một round của DES"""
-        # New right = left XOR f(right, subkey)
-        new_right = self._xor(left, self._f_function(right, subkey))
-        
-        # New left = old right
-        new_left = right
-        
-        return new_left, new_right
+    # ==================== KEY SCHEDULE ====================
+    
+    def prepare(self, key):
+        """
+        Tạo key schedule 1 lần để dùng lại cho nhiều block
+        key: 8 bytes
+        Returns: DESKeySchedule
+        """
+        if len(key) != 8:
+            raise ValueError(f"DES key must be 8 bytes, got {len(key)}")
+        return DESKeySchedule(key, self._generate_subkeys(key))
+    
+    def _schedule(self, key):
+        """Nhận key dạng bytes hoặc DESKeySchedule đã prepare"""
+        if isinstance(key, DESKeySchedule):
+            return key
+        return self.prepare(key)
+    
+    # ==================== ENCRYPTION/DECRYPTION ====================
     
     def encrypt_block(self, plaintext_block, key):
         """
         Mã hóa 1 block 64-bit
         plaintext_block: 8 bytes
-        key: 8 bytes
+        key: 8 bytes hoặc DESKeySchedule từ prepare()
         Returns: 8 bytes
         """
-        # Chuyển thành bits
-        plain_bits = self._bytes_to_bits(plaintext_block)
-        key_bits = self._bytes_to_bits(key)
-        
-        # Initial permutation
-        permuted = self._permute(plain_bits, IP)
-        
-        # Chia thành 2 nửa
-        left = permuted[:32]
-        right = permuted[32:]
-        
-        # Generate subkeys
-        subkeys = self._generate_subkeys(key_bits)
-        
-        # 16 rounds
-        for i in range(16):
-            left, right = self._des_round(left, right, subkeys[i])
-        
-        # Swap cuối cùng
-        combined = right + left
-        
-        # Final permutation
-        ciphertext_bits = self._permute(combined, IP_INV)
-        
-        # Chuyển về bytes
-        return self._bits_to_bytes(ciphertext_bits)
+        if len(plaintext_block) != 8:
+            raise ValueError("Block must be 8 bytes")
+        return self._crypt_block(plaintext_block, self._schedule(key).encrypt_round_keys)
     
     def decrypt_block(self, ciphertext_block, key):
         """
         Giải mã 1 block 64-bit
         Giống encrypt nhưng dùng subkeys theo thứ tự ngược lại
         """
-        # Chuyển thành bits
-        cipher_bits = self._bytes_to_bits(ciphertext_block)
-        key_bits = self._bytes_to_bits(key)
-        
-        # Initial permutation
-        permuted = self._permute(cipher_bits, IP)
-        
-        # Chia thành 2 nửa
-        left = permuted[:32]
-        right = permuted[32:]
-        
-        # Generate subkeys
-        subkeys = self._generate_subkeys(key_bits)
-        
-        # 16 rounds với subkeys ngược
-        for i in range(15, -1, -1):
-            left, right = self._des_round(left, right, subkeys[i])
-        
-        # Swap cuối cùng
-        combined = right + left
-        
-        # Final permutation
-        plaintext_bits = self._permute(combined, IP_INV)
+        if len(ciphertext_block) != 8:
+            raise ValueError("Block must be 8 bytes")
+        return self._crypt_block(ciphertext_block, self._schedule(key).decrypt_round_keys)
+    
+    def _crypt_blocks(self, data, round_keys):
+        """Chạy _crypt_block trên từng block 8 bytes của data"""
+        if len(data) % 8 != 0:
+            raise ValueError("Data length must be multiple of block size")
         
-        # Chuyển về bytes
-        return self._bits_to_bytes(plaintext_bits)
+        crypt_block = self._crypt_block
+        return b''.join(crypt_block(data[i:i + 8], round_keys)
+                        for i in range(0, len(data), 8))
+    
+    def encrypt_blocks(self, data, key):
+        """
+        Mã hóa nhiều block độc lập (ECB)
+        data: bytes, độ dài chia hết cho 8
+        key: 8 bytes hoặc DESKeySchedule
+        """
+        return self._crypt_blocks(data, self._schedule(key).encrypt_round_keys)
+    
+    def decrypt_blocks(self, data, key):
+        """Giải mã nhiều block độc lập (ECB)"""
+        return self._crypt_blocks(data, self._schedule(key).decrypt_round_keys)
 
 
 def test_des_core():
@@ -6,37 +6,55 @@ DES Modes of Operation
 
 import os
 from .des_core import DESCore
+from ..key_cache import KeyScheduleCache
+from ..metrics import METRICS
+from ..parallel import split_cbc_chunks, map_chunks
+
+
+def xor_bytes(a, b):
+    """XOR 2 chuỗi bytes cùng độ dài bằng 1 phép XOR số nguyên lớn"""
+    n = len(a)
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(n, 'big')
 
 
 class DESModes:
     """DES với các modes of operation"""
     
-    def __init__(self):
-        self.des_core = DESCore()
+    algorithm = 'DES'  # Tên thuật toán ghi vào header của binary container
+    core_class = DESCore  # Block engine (TripleDESModes thay bằng TripleDESCore)
+    
+    def __init__(self, key_cache_size=32):
+        self.des_core = self.core_class()
         self.block_size = 8  # DES block size = 64 bits = 8 bytes
+        self.parallel_min_chunk = 64 * 1024  # Chunk nhỏ nhất đáng gửi sang worker
+        
+        # 16 subkeys được tạo 1 lần cho mỗi key, dùng lại cho mọi block/message
+        self.key_cache = KeyScheduleCache(self.des_core.prepare, key_cache_size)
     
     def _pkcs7_pad(self, data):
         """Padding PKCS#7"""
-        pad_len = self.block_size - (len(data) % self.block_size)
-        padding = bytes([pad_len] * pad_len)
-        return data + padding
+        with METRICS.timer('padding', len(data)):
+            pad_len = self.block_size - (len(data) % self.block_size)
+            padding = bytes([pad_len] * pad_len)
+            return data + padding
     
     def _pkcs7_unpad(self, data):
         """Remove PKCS#7 padding"""
         if not data:
             return data
         
-        pad_len = data[-1]
-        
-        # Validate padding
-        if pad_len > self.block_size or pad_len == 0:
-            raise ValueError("Invalid padding")
-        
-        # Check if all padding bytes are correct
-        if data[-pad_len:] != bytes([pad_len] * pad_len):
-            raise ValueError("Invalid padding")
-        
-        return data[:-pad_len]
+        with METRICS.timer('padding', len(data)):
+            pad_len = data[-1]
+            
+            # Validate padding
+            if pad_len > self.block_size or pad_len == 0:
+                raise ValueError("Invalid padding")
+            
+            # Check if all padding bytes are correct
+            if data[-pad_len:] != bytes([pad_len] * pad_len):
+                raise ValueError("Invalid padding")
+            
+            return data[:-pad_len]
     
     def _validate_key(self, key):
         """Validate key length (8 bytes)"""
@@ -44,6 +62,12 @@ class DESModes:
             raise ValueError(f"DES key must be 8 bytes, got {len(key)}")
         return key
     
+    def _prepare_key(self, key):
+        """Validate key và lấy key schedule từ cache"""
+        key = self._validate_key(key)
+        with METRICS.timer('key_schedule'):
+            return self.key_cache.get(key)
+    
     def _validate_iv(self, iv):
         """Validate IV length (8 bytes)"""
         if iv is not None and len(iv) != 8:
@@ -59,20 +83,22 @@ class DESModes:
         key: 8 bytes
         Returns: bytes (ciphertext)
         """
-        key = self._validate_key(key)
+        schedule = self._prepare_key(key)
         
         # Padding
         padded = self._pkcs7_pad(plaintext)
         
-        ciphertext = bytearray()
-        
-        # Mã hóa từng block
-        for i in range(0, len(padded), self.block_size):
-            block = padded[i:i + self.block_size]
-            encrypted_block = self.des_core.encrypt_block(block, key)
-            ciphertext.extend(encrypted_block)
-        
-        return bytes(ciphertext)
+        return self._encrypt_ecb_raw(padded, schedule)
+    
+    def _encrypt_ecb_raw(self, padded, schedule):
+        """Mã hóa ECB các block (đã padding)"""
+        with METRICS.timer('block_cipher', len(padded)):
+            return self.des_core.encrypt_blocks(padded, schedule)
+    
+    def _decrypt_ecb_raw(self, ciphertext, schedule):
+        """Giải mã ECB các block, chưa bỏ padding"""
+        with METRICS.timer('block_cipher', len(ciphertext)):
+            return self.des_core.decrypt_blocks(ciphertext, schedule)
     
     def decrypt_ecb(self, ciphertext, key):
         """
@@ -81,21 +107,15 @@ class DESModes:
         key: 8 bytes
         Returns: bytes (plaintext)
         """
-        key = self._validate_key(key)
+        schedule = self._prepare_key(key)
         
         if len(ciphertext) % self.block_size != 0:
             raise ValueError("Ciphertext length must be multiple of block size")
         
-        plaintext = bytearray()
-        
-        # Giải mã từng block
-        for i in range(0, len(ciphertext), self.block_size):
-            block = ciphertext[i:i + self.block_size]
-            decrypted_block = self.des_core.decrypt_block(block, key)
-            plaintext.extend(decrypted_block)
+        plaintext = self._decrypt_ecb_raw(ciphertext, schedule)
         
         # Remove padding
-        return self._pkcs7_unpad(bytes(plaintext))
+        return self._pkcs7_unpad(plaintext)
     
     # ============= CBC MODE =============
     
@@ -107,7 +127,7 @@ class DESModes:
         iv: 8 bytes (nếu None thì generate random)
         Returns: (ciphertext, iv) tuple
         """
-        key = self._validate_key(key)
+        schedule = self._prepare_key(key)
         
         # Generate IV nếu không có
         if iv is None:
@@ -118,31 +138,52 @@ class DESModes:
         # Padding
         padded = self._pkcs7_pad(plaintext)
         
+        return self._encrypt_cbc_raw(padded, schedule, iv), iv
+    
+    def _encrypt_cbc_raw(self, padded, schedule, previous_block):
+        """
+        Mã hóa CBC các block (đã padding)
+        previous_block: IV, hoặc block ciphertext cuối của chunk trước
+        """
         ciphertext = bytearray()
-        previous_block = iv
         
-        # Mã hóa từng block
-        for i in range(0, len(padded), self.block_size):
-            block = padded[i:i + self.block_size]
-            
-            # XOR với block trước (hoặc IV)
-            xored = bytes(a ^ b for a, b in zip(block, previous_block))
-            
-            # Encrypt
-            encrypted_block = self.des_core.encrypt_block(xored, key)
-            ciphertext.extend(encrypted_block)
-            
-            # Update previous block
-            previous_block = encrypted_block
+        with METRICS.timer('block_cipher', len(padded)):
+            # Mã hóa từng block
+            for i in range(0, len(padded), self.block_size):
+                block = padded[i:i + self.block_size]
+                
+                # XOR với block trước (hoặc IV)
+                xored = xor_bytes(block, previous_block)
+                
+                # Encrypt
+                encrypted_block = self.des_core.encrypt_block(xored, schedule)
+                ciphertext.extend(encrypted_block)
+                
+                # Update previous block
+                previous_block = encrypted_block
         
-        return bytes(ciphertext), iv
+        return bytes(ciphertext)
     
-    def decrypt_cbc(self, ciphertext, key, iv):
+    def _decrypt_cbc_raw(self, ciphertext, schedule, previous_block):
+        """
+        Giải mã CBC các block, chưa bỏ padding
+        previous_block: IV, hoặc block ciphertext ngay trước chunk này
+        """
+        if not ciphertext:
+            return b''
+        
+        # P_i = D(C_i) XOR C_{i-1}: giải mã mọi block độc lập rồi XOR 1 lần
+        with METRICS.timer('block_cipher', len(ciphertext)):
+            decrypted = self.des_core.decrypt_blocks(ciphertext, schedule)
+        return xor_bytes(decrypted, previous_block + ciphertext[:-self.block_size])
+    
+    def decrypt_cbc(self, ciphertext, key, iv, workers=None):
         """
         Giải mã DES-CBC
         ciphertext: bytes
         key: 8 bytes
         iv: 8 bytes
+        workers: số process (None hoặc 1 = giải mã trong process hiện tại)
         Returns: bytes (plaintext)
         """
         key = self._validate_key(key)
@@ -151,25 +192,28 @@ class DESModes:
         if len(ciphertext) % self.block_size != 0:
             raise ValueError("Ciphertext length must be multiple of block size")
         
-        plaintext = bytearray()
-        previous_block = iv
-        
-        # Giải mã từng block
-        for i in range(0, len(ciphertext), self.block_size):
-            block = ciphertext[i:i + self.block_size]
-            
-            # Decrypt
-            decrypted_block = self.des_core.decrypt_block(block, key)
-            
-            # XOR với block trước
-            xored = bytes(a ^ b for a, b in zip(decrypted_block, previous_block))
-            plaintext.extend(xored)
-            
-            # Update previous block
-            previous_block = block
+        if workers and workers > 1:
+            # Mỗi block P_i = D(C_i) XOR C_{i-1} độc lập -> chia chunk cho process pool
+            chunks = split_cbc_chunks(ciphertext, iv, self.block_size, workers,
+                                      self.parallel_min_chunk)
+            chunk_args = [(type(self), key, chunk, previous_block)
+                          for chunk, previous_block in chunks]
+            plaintext = b''.join(map_chunks(_decrypt_cbc_chunk, chunk_args, workers))
+        else:
+            plaintext = self._decrypt_cbc_raw(ciphertext, self._prepare_key(key), iv)
         
         # Remove padding
-        return self._pkcs7_unpad(bytes(plaintext))
+        return self._pkcs7_unpad(plaintext)
+    
+    # ============= STREAMING =============
+    
+    def encryptor(self, key, mode='ECB', iv=None):
+        """Object mã hóa từng phần: update(chunk) ... finalize()"""
+        return Encryptor(self, key, mode, iv)
+    
+    def decryptor(self, key, mode='ECB', iv=None):
+        """Object giải mã từng phần: update(chunk) ... finalize()"""
+        return Decryptor(self, key, mode, iv)
     
     # ============= GENERAL INTERFACE =============
     
@@ -192,11 +236,12 @@ class DESModes:
         else:
             raise ValueError(f"Unsupported mode: {mode}")
     
-    def decrypt(self, ciphertext, key, mode='ECB', iv=None):
+    def decrypt(self, ciphertext, key, mode='ECB', iv=None, workers=None):
         """
         Giải mã tổng quát
         mode: 'ECB' hoặc 'CBC'
         iv: Required for CBC, ignored for ECB
+        workers: số process cho giải mã CBC song song
         Returns: plaintext
         """
         mode = mode.upper()
@@ -207,10 +252,133 @@ class DESModes:
         elif mode == 'CBC':
             if iv is None:
                 raise ValueError("IV is required for CBC mode")
-            return self.decrypt_cbc(ciphertext, key, iv)
+            return self.decrypt_cbc(ciphertext, key, iv, workers=workers)
+        
+        else:
+            raise ValueError(f"Unsupported mode: {mode}")
+
+
+class Encryptor:
+    """
+    Mã hóa DES từng phần với bộ nhớ cố định
+    update(chunk) trả về ciphertext của các block đã đủ
+    finalize() thêm PKCS#7 padding và trả về block cuối
+    iv: IV thực sự dùng cho CBC (random nếu không truyền vào)
+    """
+    
+    def __init__(self, modes, key, mode='ECB', iv=None):
+        self.modes = modes
+        self.mode = mode.upper()
+        self.schedule = modes._prepare_key(key)
+        self.block_size = modes.block_size
+        self._buffer = b''
+        self._finalized = False
+        
+        if self.mode == 'ECB':
+            self.iv = None
+        elif self.mode == 'CBC':
+            self.iv = os.urandom(modes.block_size) if iv is None else modes._validate_iv(iv)
+            self._previous_block = self.iv
+        else:
+            raise ValueError(f"Unsupported mode: {mode}")
+    
+    def _encrypt(self, blocks):
+        """Mã hóa các block, giữ chaining value của CBC giữa các lần gọi"""
+        if self.mode == 'ECB':
+            return self.modes._encrypt_ecb_raw(blocks, self.schedule)
+        
+        ciphertext = self.modes._encrypt_cbc_raw(blocks, self.schedule, self._previous_block)
+        if ciphertext:
+            self._previous_block = ciphertext[-self.block_size:]
+        return ciphertext
+    
+    def update(self, data):
+        """Nhận plaintext, trả về ciphertext của các block đã đủ"""
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        
+        self._buffer += data
+        ready = len(self._buffer) - len(self._buffer) % self.block_size
+        blocks, self._buffer = self._buffer[:ready], self._buffer[ready:]
+        return self._encrypt(blocks)
+    
+    def finalize(self):
+        """Padding và mã hóa phần còn lại"""
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        self._finalized = True
+        
+        padded = self.modes._pkcs7_pad(self._buffer)
+        self._buffer = b''
+        return self._encrypt(padded)
+
+
+class Decryptor:
+    """
+    Giải mã DES từng phần với bộ nhớ cố định
+    Block cuối được giữ lại tới finalize() để bỏ padding
+    """
+    
+    def __init__(self, modes, key, mode='ECB', iv=None):
+        self.modes = modes
+        self.mode = mode.upper()
+        self.schedule = modes._prepare_key(key)
+        self.block_size = modes.block_size
+        self._buffer = b''
+        self._finalized = False
         
+        if self.mode == 'ECB':
+            self.iv = None
+        elif self.mode == 'CBC':
+            if iv is None:
+                raise ValueError("IV is required for CBC mode")
+            self.iv = modes._validate_iv(iv)
+            self._previous_block = self.iv
         else:
             raise ValueError(f"Unsupported mode: {mode}")
+    
+    def _decrypt(self, blocks):
+        """Giải mã các block, giữ chaining value của CBC giữa các lần gọi"""
+        if self.mode == 'ECB':
+            return self.modes._decrypt_ecb_raw(blocks, self.schedule)
+        
+        plaintext = self.modes._decrypt_cbc_raw(blocks, self.schedule, self._previous_block)
+        if blocks:
+            self._previous_block = blocks[-self.block_size:]
+        return plaintext
+    
+    def update(self, data):
+        """Nhận ciphertext, trả về plaintext của mọi block trừ block cuối"""
+        if self._finalized:
+            raise ValueError("Decryptor already finalized")
+        
+        self._buffer += data
+        # Giữ lại ít nhất 1 block để bỏ padding trong finalize()
+        ready = max(0, (len(self._buffer) - 1) // self.block_size * self.block_size)
+        blocks, self._buffer = self._buffer[:ready], self._buffer[ready:]
+        return self._decrypt(blocks)
+    
+    def finalize(self):
+        """Giải mã block cuối và bỏ padding"""
+        if self._finalized:
+            raise ValueError("Decryptor already finalized")
+        self._finalized = True
+        
+        if not self._buffer:
+            return b''
+        
+        if len(self._buffer) != self.block_size:
+            raise ValueError("Ciphertext length must be multiple of block size")
+        
+        last_block = self._decrypt(self._buffer)
+        self._buffer = b''
+        return self.modes._pkcs7_unpad(last_block)
+
+
+def _decrypt_cbc_chunk(modes_class, key, chunk, previous_block):
+    """Process pool worker: giải mã CBC một chunk (padding vẫn nằm ở chunk cuối)"""
+    modes = modes_class()
+    return modes._decrypt_cbc_raw(chunk, modes._prepare_key(key), previous_block)
 
 
 def test_des_modes():
@@ -0,0 +1,139 @@
+"""
+Triple DES (3DES / TDEA)
+- EDE3: key 24 bytes = K1 | K2 | K3
+- EDE2: key 16 bytes = K1 | K2 (K3 = K1)
+Encrypt: C = E_K3(D_K2(E_K1(P)))
+Decrypt: P = D_K1(E_K2(D_K3(C)))
+Modes: ECB, CBC (same interface as DESModes)
+"""
+
+from .des_core import DESCore, DESKeySchedule
+from .des_modes import DESModes
+
+
+class TripleDESKeySchedule:
+    """
+    3 DES key schedule đã chuẩn bị sẵn cho 3 stage
+    encrypt_round_keys: (K1 enc, K2 dec, K3 enc) - mỗi phần 128 nhóm 6 bits
+    decrypt_round_keys: (K3 dec, K2 enc, K1 dec)
+    Immutable giống DESKeySchedule
+    """
+    
+    __slots__ = ('key', 'schedules', 'encrypt_round_keys', 'decrypt_round_keys')
+    
+    def __init__(self, key, schedules):
+        k1, k2, k3 = schedules
+        object.__setattr__(self, 'key', bytes(key))
+        object.__setattr__(self, 'schedules', tuple(schedules))
+        object.__setattr__(self, 'encrypt_round_keys', (
+            k1.encrypt_round_keys, k2.decrypt_round_keys, k3.encrypt_round_keys
+        ))
+        object.__setattr__(self, 'decrypt_round_keys', (
+            k3.decrypt_round_keys, k2.encrypt_round_keys, k1.decrypt_round_keys
+        ))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("TripleDESKeySchedule is immutable")
+
+
+class TripleDESCore(DESCore):
+    """
+    3DES Core - mã hóa/giải mã 1 block 64-bit với 3 stage DES
+    IP^-1 của stage trước và IP của stage sau triệt tiêu nhau,
+    nên chỉ chạy IP 1 lần ở đầu và IP^-1 1 lần ở cuối
+    """
+    
+    def _split_key(self, key):
+        """Tách key 16/24 bytes thành (K1, K2, K3)"""
+        if len(key) == 16:
+            return key[:8], key[8:], key[:8]
+        if len(key) == 24:
+            return key[:8], key[8:16], key[16:]
+        raise ValueError(f"Triple DES key must be 16 or 24 bytes, got {len(key)}")
+    
+    def prepare(self, key):
+        """
+        Tạo 3 key schedule 1 lần để dùng lại cho nhiều block
+        key: 16 bytes (EDE2) hoặc 24 bytes (EDE3)
+        Returns: TripleDESKeySchedule
+        """
+        k1, k2, k3 = self._split_key(bytes(key))
+        
+        # K1 == K2 hoặc K2 == K3 thì E và D triệt tiêu -> chỉ còn single DES
+        if k1 == k2 or k2 == k3:
+            raise ValueError("Triple DES key degenerates to single DES")
+        
+        schedules = [DESCore.prepare(self, k) for k in (k1, k2, k3)]
+        return TripleDESKeySchedule(key, schedules)
+    
+    def _schedule(self, key):
+        """Nhận key dạng bytes hoặc TripleDESKeySchedule đã prepare"""
+        if isinstance(key, TripleDESKeySchedule):
+            return key
+        if isinstance(key, DESKeySchedule):
+            raise ValueError("Triple DES needs a TripleDESKeySchedule, got a single DES schedule")
+        return self.prepare(key)
+    
+    def _crypt_block(self, block, round_keys):
+        """IP -> 3 x 16 rounds -> IP^-1 (bỏ IP^-1/IP ở giữa các stage)"""
+        stage1, stage2, stage3 = round_keys
+        left, right = self._initial_permutation(block)
+        
+        # _rounds trả về (R16, L16) - đúng bằng (L0, R0) của stage sau
+        # vì IP(IP^-1(x)) = x
+        left, right = self._rounds(left, right, stage1)
+        left, right = self._rounds(left, right, stage2)
+        left, right = self._rounds(left, right, stage3)
+        
+        return self._final_permutation(left, right)
+
+
+class TripleDESModes(DESModes):
+    """
+    3DES với các modes of operation ECB, CBC
+    Cùng interface với DESModes: encrypt()/decrypt(), encryptor()/decryptor()
+    3 key schedule được tạo 1 lần cho mỗi key và giữ trong key_cache
+    """
+    
+    algorithm = '3DES'  # Tên thuật toán ghi vào header của binary container
+    core_class = TripleDESCore
+    
+    def _validate_key(self, key):
+        """Validate key length (16 bytes EDE2 hoặc 24 bytes EDE3)"""
+        if len(key) not in (16, 24):
+            raise ValueError(f"Triple DES key must be 16 or 24 bytes, got {len(key)}")
+        return key
+
+
+def test_triple_des():
+    """Test 3DES"""
+    tdes = TripleDESModes()
+    
+    # NIST SP 800-67 Appendix B: TDEA ECB, 3 keys độc lập
+    key = bytes.fromhex('0123456789ABCDEF23456789ABCDEF01456789ABCDEF0123')
+    plaintext = b'The qufck brown fox jump'
+    expected = bytes.fromhex('A826FD8CE53B855FCCE21C8112256FE668D5C05DD9B6B900')
+    
+    print("="*60)
+    print("Testing Triple DES")
+    print("="*60)
+    
+    ciphertext = tdes.des_core.encrypt_blocks(plaintext, key)
+    print(f"Ciphertext: {ciphertext.hex()}")
+    print(f"Expected:   {expected.hex()}")
+    
+    if ciphertext == expected:
+        print("✓ Test passed!")
+    else:
+        print("✗ Test failed!")
+    
+    # CBC round trip với key EDE2
+    message = b'Triple DES with a two-key bundle'
+    ciphertext, iv = tdes.encrypt(message, key[:16], mode='CBC')
+    decrypted = tdes.decrypt(ciphertext, key[:16], mode='CBC', iv=iv)
+    print(f"\nCBC (EDE2) decrypted: {decrypted}")
+    print("✓ Match!" if decrypted == message else "✗ Mismatch!")
+
+
+if __name__ == "__main__":
+    test_triple_des()
@@ -0,0 +1,73 @@
+"""
+Key Schedule Cache
+Bounded LRU cache for expanded block cipher keys
+Shared by the AES and DES mode layers (and the substitution cipher's translate tables)
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class KeyScheduleCache:
+    """
+    LRU cache: key bytes -> prepared key schedule
+    prepare: function(key) -> prepared key object
+    maxsize: maximum number of schedules kept
+    """
+
+    def __init__(self, prepare, maxsize=32):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be >= 1, got {maxsize}")
+
+        self.prepare = prepare
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the prepared schedule for key
+        Expands the key only on a cache miss
+        """
+        key = bytes(key)
+
+        with self._lock:
+            schedule = self._entries.get(key)
+            if schedule is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return schedule
+            self.misses += 1
+
+        # Expand outside the lock - prepare() is pure
+        schedule = self.prepare(key)
+
+        with self._lock:
+            self._entries[key] = schedule
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return schedule
+
+    def clear(self):
+        """Drop all schedules and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters as a dict"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,145 @@
+"""
+Metrics
+Optional counters and per-stage timings for the hot paths
+Shared by the AES/DES mode layers, utils.file_handler and the substitution cracker
+
+Disabled by default: every instrumented call site is a single flag check
+(no clock reads, no locking). Enable with METRICS.enable() or CRYPTO_METRICS=1.
+
+Stages: key_schedule, block_cipher, padding, hex_encode, hex_decode, file_read, file_write
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+
+# Returned by timer() while disabled - reusable, does nothing
+_NULL_TIMER = nullcontext()
+
+
+class _StageTimer:
+    """Context manager adding elapsed time (and bytes) to one stage"""
+
+    __slots__ = ('metrics', 'stage', 'nbytes', 'start')
+
+    def __init__(self, metrics, stage, nbytes):
+        self.metrics = metrics
+        self.stage = stage
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.stage, time.perf_counter() - self.start, self.nbytes)
+        return False
+
+
+class Metrics:
+    """
+    Registry of counters and stage timings
+    counters: name -> int
+    stages: name -> [calls, seconds, bytes]
+    Worker processes keep their own registry - only work done in this process is counted
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._counters = {}
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Drop all recorded values (the enabled flag is kept)"""
+        with self._lock:
+            self._counters.clear()
+            self._stages.clear()
+
+    # ==================== RECORDING ====================
+
+    def incr(self, name, n=1):
+        """Add n to a counter (no-op while disabled)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def add_time(self, stage, seconds, nbytes=0):
+        """Record one call of a stage (no-op while disabled)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += nbytes
+
+    def timer(self, stage, nbytes=0):
+        """
+        with METRICS.timer('padding', len(data)): ...
+        While disabled this returns a shared no-op context (no clock reads)
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage, nbytes)
+
+    # ==================== EXPORT ====================
+
+    def snapshot(self):
+        """
+        Current values as a dict:
+        {'enabled', 'counters': {name: n},
+         'stages': {stage: {'calls', 'seconds', 'bytes'}}}
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'counters': dict(sorted(self._counters.items())),
+                'stages': {stage: {'calls': calls, 'seconds': seconds, 'bytes': nbytes}
+                           for stage, (calls, seconds, nbytes) in sorted(self._stages.items())}
+            }
+
+    def to_json(self, indent=2):
+        """Snapshot as a JSON string"""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix='crypto'):
+        """
+        Snapshot in the Prometheus text exposition format
+        Stages -> <prefix>_stage_{calls,seconds,bytes}_total{stage="..."}
+        Counters -> <prefix>_<name>_total
+        """
+        snap = self.snapshot()
+        lines = []
+
+        for field, help_text in (('calls', 'Calls per stage'),
+                                 ('seconds', 'Cumulative seconds per stage'),
+                                 ('bytes', 'Bytes processed per stage')):
+            metric = f"{prefix}_stage_{field}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for stage, values in snap['stages'].items():
+                lines.append(f'{metric}{{stage="{stage}"}} {values[field]}')
+
+        for name, value in snap['counters'].items():
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry used by all instrumented modules
+METRICS = Metrics(enabled=os.environ.get('CRYPTO_METRICS') == '1')
@@ -3,6 +3,8 @@ Optimized Frequency Data for English Text Analysis
 FIXED: No duplicate keys, normalized scoring support
 """
 
+from ..ngram_tables import NgramTables
+
 # ==================== BIGRAM FREQUENCIES ====================
 # Top 75 English bigrams - NO DUPLICATES
 BIGRAM_FREQUENCIES = {
@@ -99,78 +101,49 @@ def clean_word(word):
     return ''.join(c for c in word if c.isalpha())
 
 
+_NGRAM_TABLES = None
+
+
+def get_ngram_tables():
+    """
+    Dense bigram/trigram tables compiled from the data above
+    Compiled once per process and shared by every NgramScorer
+    """
+    global _NGRAM_TABLES
+    if _NGRAM_TABLES is None:
+        _NGRAM_TABLES = NgramTables(BIGRAM_FREQUENCIES, TRIGRAM_FREQUENCIES,
+                                    get_bigram_floor(), get_trigram_floor())
+    return _NGRAM_TABLES
+
+
 class NgramScorer:
     """
     Production-grade N-gram scorer
     FIXED: Normalized scoring, no duplicates
     """
     
-    def __init__(self):
+    def __init__(self, quadgrams=None):
+        """quadgrams: optional NgramTable or path - replaces bigram + trigram scoring"""
         self.bigrams = load_bigrams()
         self.trigrams = load_trigrams()
         self.bigram_floor = get_bigram_floor()
         self.trigram_floor = get_trigram_floor()
+        if quadgrams is not None:
+            self.tables = NgramTables.from_quadgrams(quadgrams)
+        else:
+            self.tables = get_ngram_tables()
     
     def score(self, text):
         """
         Score text using weighted bigram + trigram
         CRITICAL: Normalized by n-gram count
+        Weighted combination (Trigram 70%, Bigram 30%)
         """
-        text = text.lower()
-        
-        # Bigram scoring
-        bigram_score = 0.0
-        bigram_count = 0
-        for i in range(len(text) - 1):
-            bg = text[i:i+2]
-            if bg.isalpha():
-                bigram_score += self.bigrams.get(bg, self.bigram_floor)
-                bigram_count += 1
-        
-        # Trigram scoring
-        trigram_score = 0.0
-        trigram_count = 0
-        for i in range(len(text) - 2):
-            tg = text[i:i+3]
-            if tg.isalpha():
-                trigram_score += self.trigrams.get(tg, self.trigram_floor)
-                trigram_count += 1
-        
-        # Normalize by count (CRITICAL FIX)
-        if bigram_count > 0:
-            bigram_score /= bigram_count
-        if trigram_count > 0:
-            trigram_score /= trigram_count
-        
-        # Weighted combination (Trigram 70%, Bigram 30%)
-        score = (0.3 * bigram_score) + (0.7 * trigram_score)
-        
-        return score
+        return self.tables.score(text)
     
     def score_ngram(self, text, n=3):
         """Score with specific n-gram size"""
-        text = text.lower()
-        score = 0.0
-        count = 0
-        
-        if n == 2:
-            for i in range(len(text) - 1):
-                ng = text[i:i+2]
-                if ng.isalpha():
-                    score += self.bigrams.get(ng, self.bigram_floor)
-                    count += 1
-        elif n == 3:
-            for i in range(len(text) - 2):
-                ng = text[i:i+3]
-                if ng.isalpha():
-                    score += self.trigrams.get(ng, self.trigram_floor)
-                    count += 1
-        
-        # Normalize
-        if count > 0:
-            score /= count
-        
-        return score
+        return self.tables.score_ngram(text, n)
 
 
 # ==================== VALIDATION ====================
@@ -2,17 +2,33 @@
 Optimized Monoalphabetic Substitution Cipher Cracker
 Production-grade implementation with all critical fixes
 - Bigram + Trigram scoring (stable for 1k-10k char texts)
+- Optional quadgram scoring from a memory-mapped table (large corpora)
 - Normalized scoring (prevents length bias)
 - Hill Climbing with lateral moves (escapes local maxima)
 - Smart frequency-based initialization
 - No word scoring during optimization
+- Incremental swap scoring (only n-grams touched by a swap are re-scored)
+- Restarts run in a process pool with per-restart seeds (reproducible)
+- Optional simulated annealing search (accepts worse swaps while hot)
 """
 
+import math
 import random
+import time
 from collections import Counter
+from .swap_scorer import SwapScorer
+from ..ngram_tables import ALPHABET, NgramTables
+from ..key_cache import KeyScheduleCache
+from ..metrics import METRICS
+from ..cancellation import check_cancelled
+from ..parallel import iter_completed
 
 class MonoalphabeticCipher:
-    def __init__(self):
+    def __init__(self, quadgrams=None):
+        """
+        quadgrams: optional NgramTable or path (corpus / counts / binary table)
+                   - when given, quadgrams replace the built-in bigram + trigram scoring
+        """
         # English letter frequencies (for initialization)
         self.letter_freq = {
             'e': 12.70, 't': 9.06, 'a': 8.17, 'o': 7.51, 'i': 6.97,
@@ -29,6 +45,41 @@ class MonoalphabeticCipher:
         # Floor scores for unseen n-grams
         self.bigram_floor = -10.0
         self.trigram_floor = -12.0
+        
+        # Dense tables indexed by letter codes (floors baked in)
+        if quadgrams is not None:
+            self.tables = NgramTables.from_quadgrams(quadgrams)
+        else:
+            self.tables = NgramTables(self.bigrams, self.trigrams,
+                                      self.bigram_floor, self.trigram_floor)
+        
+        # Simulated annealing (search='anneal')
+        # Temperatures are in score units (average log-probability per n-gram),
+        # so they do not depend on the text length
+        # Short anneals + a few restarts find the key in fewer total swaps than hill climbing
+        self.anneal_iterations = 5000
+        self.anneal_start_temp = 0.1
+        self.anneal_end_temp = 0.002
+        self.anneal_schedule = 'geometric'
+        
+        # str.translate tables per key (key = 26 plain letters as bytes)
+        self.translate_tables = KeyScheduleCache(self._make_translate_table, 64)
+        
+        # Cipher-space n-gram counts of the last ciphertext (reused across restarts)
+        self._scorer_text = None
+        self._scorer = None
+    
+    def __getstate__(self):
+        # Sent to worker processes: the scorer cache is rebuilt there
+        state = self.__dict__.copy()
+        state['_scorer_text'] = None
+        state['_scorer'] = None
+        state['translate_tables'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.translate_tables = KeyScheduleCache(self._make_translate_table, 64)
     
     def _load_bigrams(self):
         """Load bigram frequencies - FIXED: No duplicates"""
@@ -71,45 +122,21 @@ class MonoalphabeticCipher:
     
     def score(self, text):
         """
-        Score text using bigrams + trigrams
+        Score text using bigrams + trigrams (or quadgrams, if loaded)
         FIXED: Normalized by n-gram count (prevents length bias)
+        Weighted combination: 0.3 bigram + 0.7 trigram (dense table lookups)
         """
-        text = text.lower()
-        
-        # Bigram scoring
-        bigram_score = 0.0
-        bigram_count = 0
-        for i in range(len(text) - 1):
-            bg = text[i:i+2]
-            if bg.isalpha():
-                bigram_score += self.bigrams.get(bg, self.bigram_floor)
-                bigram_count += 1
-        
-        # Trigram scoring
-        trigram_score = 0.0
-        trigram_count = 0
-        for i in range(len(text) - 2):
-            tg = text[i:i+3]
-            if tg.isalpha():
-                trigram_score += self.trigrams.get(tg, self.trigram_floor)
-                trigram_count += 1
-        
-        # CRITICAL FIX: Normalize by count
-        if bigram_count > 0:
-            bigram_score /= bigram_count
-        if trigram_count > 0:
-            trigram_score /= trigram_count
-        
-        # Weighted combination (Trigram more important)
-        score = (0.3 * bigram_score) + (0.7 * trigram_score)
-        
-        return score
+        if METRICS.enabled:
+            METRICS.incr('mono_score_calls')
+        return self.tables.score(text)
     
-    def initial_key(self, ciphertext):
+    def initial_key(self, ciphertext, rng=None):
         """
         IMPROVED: Smart frequency-based initialization
         Only map top 12 letters, randomize rest (more robust)
+        rng: random.Random to draw from (default: module random)
         """
+        rng = rng or random
         text = ciphertext.lower()
         
         # Count letter frequencies
@@ -133,11 +160,12 @@ class MonoalphabeticCipher:
         used_cipher = set(key.keys())
         used_plain = set(key.values())
         
-        unused_cipher = list(all_letters - used_cipher)
-        unused_plain = list(all_letters - used_plain)
+        # Sorted so the result depends only on rng (not on set order)
+        unused_cipher = sorted(all_letters - used_cipher)
+        unused_plain = sorted(all_letters - used_plain)
         
         # Shuffle for randomness
-        random.shuffle(unused_plain)
+        rng.shuffle(unused_plain)
         
         for i, cipher_char in enumerate(unused_cipher):
             if i < len(unused_plain):
@@ -154,94 +182,270 @@ class MonoalphabeticCipher:
         
         return key
     
+    def _make_translate_table(self, plain):
+        """plain: bytes, plain[i] = plain letter of cipher letter ALPHABET[i]"""
+        plain = plain.decode('ascii')
+        return str.maketrans(ALPHABET + ALPHABET.upper(), plain + plain.upper())
+    
     def decrypt(self, ciphertext, key):
-        """Apply key to decrypt"""
-        result = []
-        for char in ciphertext:
-            if char.islower():
-                result.append(key.get(char, char))
-            elif char.isupper():
-                result.append(key.get(char.lower(), char.lower()).upper())
-            else:
-                result.append(char)
-        return ''.join(result)
+        """
+        Apply key to decrypt
+        One C-level str.translate; tables are cached per key
+        Letters missing from key are left unchanged
+        """
+        if METRICS.enabled:
+            METRICS.incr('mono_decrypt_calls')
+        plain = ''.join(key.get(c, c) for c in ALPHABET)
+        return ciphertext.translate(self.translate_tables.get(plain.encode('ascii')))
+    
+    def swap_scorer(self, ciphertext):
+        """
+        Incremental scorer for ciphertext
+        Tokenizing and counting n-grams is done once per ciphertext, not per restart
+        """
+        if self._scorer_text != ciphertext:
+            self._scorer = SwapScorer(ciphertext, self.tables)
+            self._scorer_text = ciphertext
+        return self._scorer
     
-    def hill_climb(self, ciphertext, key, max_iter=20000):
+    def hill_climb(self, ciphertext, key, max_iter=20000, rng=None, deadline=None, cancel=None):
         """
         FIXED: Hill climbing with lateral moves
         Allows moves with equal score (escapes local maxima better)
+        Each swap is scored incrementally - no plaintext is built per candidate
+        rng: random.Random to draw swaps from (default: module random)
+        deadline: time.time() value after which the climb stops early
+        cancel: CancellationToken - raises OperationCancelled once it is set
         """
-        best_key = key.copy()
-        best_text = self.decrypt(ciphertext, best_key)
-        best_score = self.score(best_text)
+        rng = rng or random
+        scorer = self.swap_scorer(ciphertext)
+        best_score = scorer.set_key(key)
         
         letters = list('abcdefghijklmnopqrstuvwxyz')
         no_improve = 0
+        accepted = 0
+        iteration = -1
         
         for iteration in range(max_iter):
             # Random swap
-            a, b = random.sample(letters, 2)
-            key[a], key[b] = key[b], key[a]
+            a, b = rng.sample(letters, 2)
+            a, b = ord(a) - 97, ord(b) - 97
             
-            # Evaluate
-            text = self.decrypt(ciphertext, key)
-            score = self.score(text)
+            # Evaluate: only n-gram types containing a or b change
+            delta = scorer.swap_delta(a, b)
             
             # FIXED: Accept if >= (not just >)
             # This allows lateral moves
-            if score >= best_score:
-                best_score = score
-                best_key = key.copy()
+            if delta >= 0:
+                best_score = scorer.apply_swap(a, b, delta)
+                accepted += 1
                 no_improve = 0
             else:
-                # Rollback
-                key[a], key[b] = key[b], key[a]
                 no_improve += 1
             
             # Early stopping
             if no_improve > 3000:
                 break
+            
+            # Time budget / cancellation (checked every 1000 swaps - time.time() is not free)
+            if iteration % 1000 == 999:
+                check_cancelled(cancel)
+                if deadline is not None and time.time() > deadline:
+                    break
+        
+        # Recompute from scratch so rounding in the running deltas does not accumulate
+        best_key = scorer.key_dict()
+        best_score = scorer.set_key(best_key)
         
+        if METRICS.enabled:
+            self._record_search(iteration + 1, accepted)
         return best_key, best_score
     
-    def crack(self, ciphertext, restarts=20):
+    def _record_search(self, evaluated, accepted):
+        """Add one climb / anneal to the metrics (2 full scorings: start + final)"""
+        METRICS.incr('mono_score_calls', 2)
+        METRICS.incr('mono_swaps_evaluated', evaluated)
+        METRICS.incr('mono_swaps_accepted', accepted)
+    
+    def temperature(self, progress, schedule=None, start_temp=None, end_temp=None):
+        """
+        Annealing temperature at progress 0.0 .. 1.0 of the budget
+        schedule: 'geometric', 'linear' or a callable progress -> temperature
+        """
+        schedule = schedule or self.anneal_schedule
+        start_temp = self.anneal_start_temp if start_temp is None else start_temp
+        end_temp = self.anneal_end_temp if end_temp is None else end_temp
+        
+        if callable(schedule):
+            return schedule(progress)
+        if schedule == 'geometric':
+            return start_temp * (end_temp / start_temp) ** progress
+        if schedule == 'linear':
+            return start_temp + (end_temp - start_temp) * progress
+        raise ValueError(f"Unknown temperature schedule: {schedule}")
+    
+    def anneal(self, ciphertext, key, iterations=None, time_budget=None, schedule=None,
+               start_temp=None, end_temp=None, rng=None, deadline=None, cancel=None):
+        """
+        Simulated annealing over key swaps
+        Worse swaps are accepted with probability exp(delta / T); T falls from
+        start_temp to end_temp over the budget, so the search settles into the best basin
+        iterations: swap budget (default self.anneal_iterations)
+        time_budget: seconds - the schedule follows wall-clock time instead
+        cancel: CancellationToken - checked with the schedule (every 256 swaps)
+        Returns: (best key seen, score) - same as hill_climb
+        """
+        rng = rng or random
+        if iterations is None and time_budget is None:
+            iterations = self.anneal_iterations
+        
+        scorer = self.swap_scorer(ciphertext)
+        current = scorer.set_key(key)
+        best_score = current
+        best_key = scorer.key_dict()
+        
+        start = time.time()
+        iteration = 0
+        accepted = 0
+        temp = self.temperature(0.0, schedule, start_temp, end_temp)
+        
+        while iterations is None or iteration < iterations:
+            # Advance the schedule every 256 swaps (cheap enough for time.time())
+            if iteration % 256 == 0:
+                check_cancelled(cancel)
+                now = time.time()
+                progress = 0.0 if iterations is None else iteration / iterations
+                if time_budget is not None:
+                    progress = max(progress, (now - start) / time_budget)
+                if progress >= 1.0 or (deadline is not None and now > deadline):
+                    break
+                temp = self.temperature(progress, schedule, start_temp, end_temp)
+            iteration += 1
+            
+            a, b = rng.sample(range(26), 2)
+            delta = scorer.swap_delta(a, b)
+            
+            # Metropolis acceptance
+            if delta >= 0 or rng.random() < math.exp(delta / temp):
+                current = scorer.apply_swap(a, b, delta)
+                accepted += 1
+                if current > best_score:
+                    best_score = current
+                    best_key = scorer.key_dict()
+        
+        # Exact score of the best key (no accumulated rounding)
+        best_score = scorer.set_key(best_key)
+        
+        if METRICS.enabled:
+            self._record_search(iteration, accepted)
+        return best_key, best_score
+    
+    def run_restart(self, ciphertext, seed, deadline=None, search='hill', cancel=None):
+        """
+        One independent restart, fully determined by seed
+        search: 'hill' (hill_climb) or 'anneal' (simulated annealing)
+        Returns: (key, score)
+        """
+        rng = random.Random(seed)
+        
+        # Initialize with smart frequency analysis
+        key = self.initial_key(ciphertext, rng)
+        
+        # Add random perturbation (5-15 swaps)
+        for _ in range(rng.randint(5, 15)):
+            a, b = rng.sample('abcdefghijklmnopqrstuvwxyz', 2)
+            key[a], key[b] = key[b], key[a]
+        
+        if search == 'anneal':
+            return self.anneal(ciphertext, key, rng=rng, deadline=deadline, cancel=cancel)
+        if search == 'hill':
+            return self.hill_climb(ciphertext, key, rng=rng, deadline=deadline, cancel=cancel)
+        raise ValueError(f"Unknown search: {search}")
+    
+    def crack(self, ciphertext, restarts=20, workers=None, seed=None,
+              target_score=None, time_limit=None, search='hill',
+              progress=None, cancel=None, verbose=True):
         """
         Multi-restart hill climbing
         Standard approach for substitution ciphers
+        workers: number of processes (None or 1 = run restarts in this process)
+        seed: master seed - restart i always gets the same derived seed, so the
+              result does not depend on workers or completion order
+              (None = draw the seeds from module random)
+        target_score: stop as soon as a restart reaches this score
+        time_limit: seconds - stop starting restarts (and cut running ones short) after this
+        search: 'hill' (fast greedy climbs, needs many restarts) or 'anneal'
+                (simulated annealing - escapes local optima, needs few restarts)
+        progress: callback(finished_restarts, restarts, best_score, restart_index, score, key),
+                  called as each restart finishes (completion order)
+        cancel: CancellationToken - running restarts stop within a few ms and
+                OperationCancelled is raised (pool workers share the token)
+        verbose: print the banner and one line per restart (False = silent)
+        Returns: (key, plaintext, score)
         """
-        print("="*60)
-        print("CRACKING MONOALPHABETIC SUBSTITUTION")
-        print("="*60)
-        print(f"Text length: {len(ciphertext)} characters")
-        print(f"Restarts: {restarts}")
-        print()
+        if verbose:
+            print("="*60)
+            print("CRACKING MONOALPHABETIC SUBSTITUTION")
+            print("="*60)
+            print(f"Text length: {len(ciphertext)} characters")
+            print(f"Restarts: {restarts}")
+            if search != 'hill':
+                print(f"Search: {search}")
+            if workers and workers > 1:
+                print(f"Workers: {workers}")
+            print()
+        
+        master = random.Random(seed) if seed is not None else random
+        seeds = [master.getrandbits(64) for _ in range(restarts)]
+        deadline = time.time() + time_limit if time_limit is not None else None
+        
+        if workers and workers > 1:
+            results = iter_completed(_run_restart, [(s, deadline, search) for s in seeds], workers,
+                                     initializer=_init_restart_worker,
+                                     initargs=(self, ciphertext, cancel))
+        else:
+            results = ((r, self.run_restart(ciphertext, s, deadline, search, cancel))
+                       for r, s in enumerate(seeds))
         
         best_global_key = None
         best_global_score = float('-inf')
+        best_restart = None
+        finished = 0
         
-        for r in range(restarts):
-            # Initialize with smart frequency analysis
-            key = self.initial_key(ciphertext)
-            
-            # Add random perturbation (5-15 swaps)
-            for _ in range(random.randint(5, 15)):
-                a, b = random.sample('abcdefghijklmnopqrstuvwxyz', 2)
-                key[a], key[b] = key[b], key[a]
-            
-            # Hill climb
-            key, score = self.hill_climb(ciphertext, key)
-            
-            print(f"Restart {r+1:2d}/{restarts}: score = {score:8.4f}")
-            
-            # Track best
-            if score > best_global_score:
-                best_global_score = score
-                best_global_key = key.copy()
+        try:
+            for r, (key, score) in results:
+                finished += 1
+                METRICS.incr('mono_restarts')
+                if verbose:
+                    print(f"Restart {r+1:2d}/{restarts}: score = {score:8.4f}")
+                
+                # Track best (ties go to the lower restart index - independent of finish order)
+                if (best_restart is None or score > best_global_score or
+                        (score == best_global_score and r < best_restart)):
+                    best_global_score = score
+                    best_global_key = key.copy()
+                    best_restart = r
+                
+                if progress is not None:
+                    progress(finished, restarts, best_global_score, r, score, key)
+                
+                if target_score is not None and best_global_score >= target_score:
+                    if verbose:
+                        print(f"Target score {target_score:.4f} reached")
+                    break
+                if deadline is not None and time.time() > deadline:
+                    if verbose:
+                        print(f"Time limit ({time_limit}s) reached")
+                    break
+        finally:
+            # Cancels restarts that have not started yet
+            results.close()
         
-        print()
-        print("="*60)
-        print(f"BEST SCORE: {best_global_score:.4f}")
-        print("="*60)
+        if verbose:
+            print()
+            print("="*60)
+            print(f"BEST SCORE: {best_global_score:.4f} ({finished}/{restarts} restarts)")
+            print("="*60)
         
         plaintext = self.decrypt(ciphertext, best_global_key)
         return best_global_key, plaintext, best_global_score
@@ -251,23 +455,52 @@ class MonoalphabeticCipher:
         return ', '.join(f"{k}->{v}" for k, v in sorted(key.items()))
 
 
-def crack_from_file(input_file, output_file):
+# ==================== PARALLEL RESTARTS ====================
+
+_worker_cipher = None
+_worker_ciphertext = None
+_worker_cancel = None
+
+
+def _init_restart_worker(cipher, ciphertext, cancel=None):
+    """Process pool initializer: one cipher (tables + swap scorer) per worker"""
+    global _worker_cipher, _worker_ciphertext, _worker_cancel
+    _worker_cipher = cipher
+    _worker_ciphertext = ciphertext
+    _worker_cancel = cancel
+    # Count n-grams once per worker, not once per restart
+    cipher.swap_scorer(ciphertext)
+
+
+def _run_restart(seed, deadline, search):
+    """Run in worker process"""
+    return _worker_cipher.run_restart(_worker_ciphertext, seed, deadline, search, _worker_cancel)
+
+
+def crack_from_file(input_file, output_file, quadgrams=None, workers=None,
+                    progress=None, cancel=None, verbose=True):
     """
     Crack cipher from file and save result
+    quadgrams: optional quadgram table / path (see MonoalphabeticCipher)
+    workers: processes for parallel restarts
+    progress, cancel, verbose: see MonoalphabeticCipher.crack (nothing is written if cancelled)
     Output format:
     Line 1: score
     Line 2: mapping
     Line 3+: plaintext
     """
-    print(f"Reading ciphertext from: {input_file}")
+    if verbose:
+        print(f"Reading ciphertext from: {input_file}")
     with open(input_file, 'r', encoding='utf-8') as f:
         ciphertext = f.read()
     
-    print(f"Ciphertext length: {len(ciphertext)} characters\n")
+    if verbose:
+        print(f"Ciphertext length: {len(ciphertext)} characters\n")
     
     # Crack
-    cipher = MonoalphabeticCipher()
-    key, plaintext, score = cipher.crack(ciphertext)
+    cipher = MonoalphabeticCipher(quadgrams)
+    key, plaintext, score = cipher.crack(ciphertext, workers=workers, progress=progress,
+                                         cancel=cancel, verbose=verbose)
     
     # Save output
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -275,8 +508,9 @@ def crack_from_file(input_file, output_file):
         f.write(cipher.format_key(key) + '\n')
         f.write(plaintext)
     
-    print(f"\n✓ Results saved to: {output_file}")
-    print(f"Final score: {score:.4f}")
+    if verbose:
+        print(f"\n✓ Results saved to: {output_file}")
+        print(f"Final score: {score:.4f}")
     
     return key, plaintext, score
 
@@ -0,0 +1,158 @@
+"""
+Incremental Swap Scoring for Substitution Hill Climbing
+- Ciphertext is tokenized once into letter indices
+- N-gram occurrence counts are kept in cipher space
+- A key swap re-scores only the n-gram types that contain the swapped letters
+Gives exactly the same score as MonoalphabeticCipher.score(decrypt(...))
+"""
+
+from ..ngram_tables import ALPHABET, letter_codes, iter_ngram_codes
+
+
+class _ComponentState:
+    """Cipher-space counts and cached values for one n-gram table"""
+
+    def __init__(self, codes, table, weight):
+        self.n = table.n
+        self.table = table.table
+
+        # Occurrence counts per n-gram type in cipher space
+        counts = {}
+        total = 0
+        other = 0  # n-grams with a non-ASCII letter - always the floor
+        for ngram in iter_ngram_codes(codes, self.n):
+            total += 1
+            if ngram is None:
+                other += 1
+            else:
+                ngram = tuple(ngram)
+                counts[ngram] = counts.get(ngram, 0) + 1
+
+        self.const = other * table.floor
+        # Normalization factor (counts do not depend on the key)
+        self.scale = weight / total if total else 0.0
+
+        # Per-type records: (cipher letters, count)
+        self.types = list(counts.items())
+
+        # For each cipher letter: indices of the types that contain it
+        self.by_letter = [[] for _ in range(26)]
+        for i, (letters, _) in enumerate(self.types):
+            for letter in set(letters):
+                self.by_letter[letter].append(i)
+
+        self.pairs = {}  # (a, b) -> affected records (i, count, letters...)
+        self.values = None
+
+    def index(self, k, letters):
+        """Table index of cipher letters under key k"""
+        index = 0
+        for c in letters:
+            index = index * 26 + k[c]
+        return index
+
+    def set_key(self, k):
+        """Recompute every cached value; returns the weighted sum"""
+        table = self.table
+        self.values = [table[self.index(k, letters)] for letters, _ in self.types]
+        total = self.const + sum(v * n for v, (_, n) in zip(self.values, self.types))
+        return total * self.scale
+
+    def affected(self, a, b):
+        """Type records containing cipher letter a or b (cached per pair)"""
+        pair = (a, b) if a < b else (b, a)
+        records = self.pairs.get(pair)
+        if records is None:
+            indices = sorted(set(self.by_letter[a]) | set(self.by_letter[b]))
+            records = [(i, self.types[i][1]) + self.types[i][0] for i in indices]
+            self.pairs[pair] = records
+        return records
+
+    def delta(self, k, a, b):
+        """Weighted score change of the affected types (k already swapped)"""
+        table = self.table
+        values = self.values
+        delta = 0.0
+
+        # Unrolled index computation for the common sizes
+        if self.n == 2:
+            for i, n, c1, c2 in self.affected(a, b):
+                delta += n * (table[k[c1] * 26 + k[c2]] - values[i])
+        elif self.n == 3:
+            for i, n, c1, c2, c3 in self.affected(a, b):
+                delta += n * (table[(k[c1] * 26 + k[c2]) * 26 + k[c3]] - values[i])
+        elif self.n == 4:
+            for i, n, c1, c2, c3, c4 in self.affected(a, b):
+                delta += n * (table[((k[c1] * 26 + k[c2]) * 26 + k[c3]) * 26 + k[c4]] - values[i])
+        else:
+            for record in self.affected(a, b):
+                delta += record[1] * (table[self.index(k, record[2:])] - values[record[0]])
+
+        return delta * self.scale
+
+    def apply(self, k, a, b):
+        """Refresh cached values of the affected types (k already swapped)"""
+        table = self.table
+        values = self.values
+        for record in self.affected(a, b):
+            values[record[0]] = table[self.index(k, record[2:])]
+
+
+class SwapScorer:
+    """
+    Score of a substitution key on a fixed ciphertext, updated per swap
+    tables: NgramTables (weighted n-gram tables with floors baked in)
+    """
+
+    def __init__(self, ciphertext, tables):
+        codes = letter_codes(ciphertext)
+        self.components = [_ComponentState(codes, table, weight)
+                           for table, weight in tables.components]
+        self.key = None
+        self.score = None
+
+    # ==================== FULL EVALUATION ====================
+
+    def set_key(self, key):
+        """
+        Load a key {cipher letter: plain letter} and compute its score from scratch
+        Returns: score
+        """
+        self.key = [ALPHABET.index(key[c]) for c in ALPHABET]
+        self.score = sum(component.set_key(self.key) for component in self.components)
+        return self.score
+
+    def key_dict(self):
+        """Current key as {cipher letter: plain letter}"""
+        return {ALPHABET[c]: ALPHABET[p] for c, p in enumerate(self.key)}
+
+    # ==================== SWAP EVALUATION ====================
+
+    def swap_delta(self, a, b):
+        """
+        Score change if the plain letters of cipher letters a and b were swapped
+        a, b: cipher letter indices (0..25)
+        The key is left unchanged
+        """
+        k = self.key
+        k[a], k[b] = k[b], k[a]
+        delta = sum(component.delta(k, a, b) for component in self.components)
+        k[a], k[b] = k[b], k[a]
+        return delta
+
+    def apply_swap(self, a, b, delta=None):
+        """
+        Swap the plain letters of cipher letters a and b
+        Updates the cached values of the affected types only
+        Returns: new score
+        """
+        if delta is None:
+            delta = self.swap_delta(a, b)
+
+        k = self.key
+        k[a], k[b] = k[b], k[a]
+        for component in self.components:
+            component.apply(k, a, b)
+
+        self.score += delta
+        return self.score
@@ -0,0 +1,460 @@
+"""
+Dense N-gram Tables
+Log-probability / frequency tables compiled once into flat array('d') buffers
+indexed by letter codes (a=0 .. z=25), with the floor value baked in
+Shared by the monoalphabetic, Caesar and Vigenère scorers
+
+Large tables (e.g. 26^4 quadgrams) can be built from a text corpus or a
+counts file and saved to a binary file that is memory-mapped on load
+"""
+
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+OTHER = 26  # Non-ASCII letter: part of an n-gram, but never in the tables
+BREAK = -1  # Non-letter: n-grams across it are skipped
+
+_CODES = {char: i for i, char in enumerate(ALPHABET)}
+_DROP_ASCII = dict.fromkeys(range(128))  # str.translate table: delete every ASCII char
+
+
+def ngram_index(ngram):
+    """'the' -> 19*26^2 + 7*26 + 4"""
+    index = 0
+    for char in ngram:
+        index = index * 26 + _CODES[char]
+    return index
+
+
+def dense_table(ngrams, n, floor=0.0):
+    """
+    Compile {'th': logp, ...} into a flat array('d') of 26^n entries
+    Unseen n-grams get the floor value
+    """
+    table = array('d', [floor]) * (26 ** n)
+    for ngram, value in ngrams.items():
+        table[ngram_index(ngram)] = value
+    return table
+
+
+def letter_codes(text):
+    """
+    Map text to letter codes (after lower()):
+    a-z -> 0..25, other letters -> OTHER, everything else -> BREAK
+    """
+    codes = _CODES
+    return [codes[char] if char in codes else (OTHER if char.isalpha() else BREAK)
+            for char in text.lower()]
+
+
+def letter_counts(text):
+    """
+    Letter histogram of text (case-insensitive)
+    Returns: list of 27 counts - a..z, then all other letters
+    """
+    # One C-level str.count per letter instead of a Python loop per character
+    lower = text.lower()
+    counts = [lower.count(char) for char in ALPHABET]
+    if lower.isascii():
+        counts.append(0)
+    else:
+        counts.append(sum(1 for char in lower.translate(_DROP_ASCII) if char.isalpha()))
+    return counts
+
+
+def iter_ngram_codes(codes, n):
+    """
+    Yield the letter codes of every n-gram made entirely of letters
+    N-grams containing an OTHER letter are yielded as None (always the floor)
+    """
+    run = 0
+    last_other = -n
+    for pos, code in enumerate(codes):
+        if code < 0:
+            run = 0
+            continue
+        run += 1
+        if code == OTHER:
+            last_other = pos
+        if run >= n:
+            if pos - last_other < n:
+                yield None
+            else:
+                yield codes[pos - n + 1:pos + 1]
+
+
+class NgramTable:
+    """
+    One dense n-gram log-probability table
+    table: 26^n floats (array('d') or a memoryview over a memory-mapped file)
+    floor: value for unseen n-grams (already baked into table)
+    path: binary file the table was mapped from (None for in-memory tables)
+    """
+
+    def __init__(self, n, table, floor, path=None):
+        if len(table) != 26 ** n:
+            raise ValueError(f"{n}-gram table must have {26 ** n} entries, got {len(table)}")
+        self.n = n
+        self.table = table
+        self.floor = floor
+        self.path = path
+
+    def __reduce__(self):
+        # Mapped tables travel to worker processes as their path - each worker maps
+        # the same file read-only instead of receiving a pickled copy
+        if self.path is not None:
+            return (load_ngram_table, (self.path,))
+        return (NgramTable, (self.n, self.table, self.floor))
+
+    def score(self, text):
+        """Average log-probability per n-gram"""
+        total = 0.0
+        count = 0
+        table = self.table
+        for codes in iter_ngram_codes(letter_codes(text), self.n):
+            count += 1
+            if codes is None:
+                total += self.floor
+            else:
+                index = 0
+                for code in codes:
+                    index = index * 26 + code
+                total += table[index]
+        return total / count if count else 0.0
+
+
+class NgramTables:
+    """
+    Weighted combination of n-gram tables
+    score(): sum of weight * (average log-probability) over the tables,
+    each normalized by its own n-gram count
+    Default: built-in bigrams (0.3) + trigrams (0.7)
+    """
+
+    def __init__(self, bigrams, trigrams, bigram_floor, trigram_floor,
+                 weights=(0.3, 0.7)):
+        self.components = [
+            (NgramTable(2, dense_table(bigrams, 2, bigram_floor), bigram_floor), weights[0]),
+            (NgramTable(3, dense_table(trigrams, 3, trigram_floor), trigram_floor), weights[1]),
+        ]
+
+    @classmethod
+    def from_tables(cls, components):
+        """
+        Build from already compiled tables
+        components: list of (NgramTable, weight)
+        """
+        tables = cls.__new__(cls)
+        tables.components = list(components)
+        return tables
+
+    @classmethod
+    def from_quadgrams(cls, quadgrams):
+        """
+        Quadgram-only scoring
+        quadgrams: NgramTable, or a path accepted by load_quadgrams
+        """
+        if not isinstance(quadgrams, NgramTable):
+            quadgrams = load_quadgrams(os.fspath(quadgrams))
+        if quadgrams.n != 4:
+            raise ValueError(f"Expected a quadgram table, got {quadgrams.n}-grams")
+        return cls.from_tables([(quadgrams, 1.0)])
+
+    def ngram_sums(self, text):
+        """
+        Sum and count of log-probabilities for every table
+        Only n-grams made entirely of letters are counted
+        Returns: list of (sum, count), one per component
+        """
+        sizes = [table.n for table, _ in self.components]
+        tables = [table.table for table, _ in self.components]
+        floors = [table.floor for table, _ in self.components]
+        moduli = [26 ** n for n in sizes]
+        sums = [0.0] * len(sizes)
+        counts = [0] * len(sizes)
+        max_modulus = max(moduli)
+
+        rolling = 0
+        run = 0
+        last_other = -max(sizes)
+
+        for pos, code in enumerate(letter_codes(text)):
+            if code < 0:
+                run = 0
+                continue
+
+            run += 1
+            if code == OTHER:
+                last_other = pos
+                code = 0
+            rolling = (rolling * 26 + code) % max_modulus
+
+            for j, n in enumerate(sizes):
+                if run >= n:
+                    counts[j] += 1
+                    if pos - last_other < n:
+                        sums[j] += floors[j]
+                    else:
+                        sums[j] += tables[j][rolling % moduli[j]]
+
+        return list(zip(sums, counts))
+
+    def score(self, text):
+        """Weighted n-gram score, each table normalized by its n-gram count"""
+        score = 0.0
+        for (total, count), (_, weight) in zip(self.ngram_sums(text), self.components):
+            if count > 0:
+                score += weight * total / count
+        return score
+
+    def score_ngram(self, text, n=3):
+        """Average log-probability of a single n-gram size"""
+        for (total, count), (table, _) in zip(self.ngram_sums(text), self.components):
+            if table.n == n:
+                return total / count if count else 0.0
+        return 0.0
+
+
+def chi_squared_counts(counts, total, expected, scale=1.0):
+    """
+    Chi-squared statistic of a letter histogram against expected frequencies
+    counts: 26 (or more) letter counts, total: number of letters
+    expected: dense 26-entry frequency table (dense_table(freq, 1))
+    scale: multiply observed proportions (100 for percent tables)
+    """
+    chi2 = 0.0
+    for i in range(26):
+        observed = counts[i] / total * scale
+        chi2 += (observed - expected[i]) ** 2 / expected[i]
+    return chi2
+
+
+def shift_chi_squared(counts, expected, scale=1.0):
+    """
+    Chi-squared of all 26 Caesar shifts from one letter histogram
+    Decrypting with shift s turns cipher letter (i + s) into plain letter i, so the
+    plaintext histogram is the cipher histogram rotated by s - no text is regenerated
+    counts: letter_counts of the ciphertext (non-ASCII letters count in the total only)
+    expected, scale: as in chi_squared_counts
+    Returns: list of 26 chi-squared values, index = shift
+    """
+    total = sum(counts)
+    if total == 0:
+        return [float('inf')] * 26
+
+    observed = [count / total * scale for count in counts[:26]]
+    scores = []
+    for shift in range(26):
+        chi2 = 0.0
+        for i in range(26):
+            chi2 += (observed[(i + shift) % 26] - expected[i]) ** 2 / expected[i]
+        scores.append(chi2)
+    return scores
+
+
+def best_shift(counts, expected, scale=1.0):
+    """Caesar shift with the lowest chi-squared (first one on ties)"""
+    scores = shift_chi_squared(counts, expected, scale)
+    return scores.index(min(scores))
+
+
+def _build_shift_tables():
+    """str.translate tables: table[s] undoes a Caesar shift of s (both cases)"""
+    tables = []
+    for shift in range(26):
+        plain = ALPHABET[-shift:] + ALPHABET[:-shift] if shift else ALPHABET
+        tables.append(str.maketrans(ALPHABET + ALPHABET.upper(), plain + plain.upper()))
+    return tables
+
+
+_SHIFT_TABLES = _build_shift_tables()
+
+
+def shift_table(shift):
+    """
+    Translate table that decrypts a Caesar shift (any int, taken mod 26)
+    Only a-z / A-Z are mapped - everything else passes through unchanged
+    """
+    return _SHIFT_TABLES[shift % 26]
+
+
+# ==================== LARGE TABLES: BUILD / SAVE / MAP ====================
+
+# Binary layout: magic, version, n, byte order ('<' or '>'), floor, then 26^n doubles
+TABLE_MAGIC = b'NGRM'
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct('<4sBBcxd')
+
+
+def count_ngrams(text, n=4):
+    """
+    Count n-grams in a corpus text
+    N-grams never span non-letters (same rule as the scorers)
+    Returns: dict 'tion' -> count
+    """
+    counts = {}
+    for codes in iter_ngram_codes(letter_codes(text), n):
+        if codes is not None:
+            ngram = ''.join(ALPHABET[c] for c in codes)
+            counts[ngram] = counts.get(ngram, 0) + 1
+    return counts
+
+
+def load_ngram_counts(filepath):
+    """
+    Read a counts file: one 'NGRAM COUNT' pair per line (e.g. 'TION 13168375')
+    Returns: dict 'tion' -> count
+    """
+    counts = {}
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            parts = line.split()
+            if not parts:
+                continue
+            if len(parts) != 2 or not parts[1].isdigit():
+                raise ValueError(f"{filepath}:{line_number}: expected 'NGRAM COUNT', got {line.strip()!r}")
+            ngram = parts[0].lower()
+            counts[ngram] = counts.get(ngram, 0) + int(parts[1])
+    return counts
+
+
+def _is_counts_file(filepath):
+    """Counts files have 'LETTERS NUMBER' on every line (checks the first lines)"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for _ in range(20):
+            line = f.readline()
+            if not line:
+                break
+            parts = line.split()
+            if parts and not (len(parts) == 2 and parts[0].isalpha() and parts[1].isdigit()):
+                return False
+    return True
+
+
+def table_from_counts(counts, n=None):
+    """
+    Log10-probability table from n-gram counts
+    Unseen n-grams get log10(0.01 / total)
+    Returns: NgramTable (in memory)
+    """
+    if not counts:
+        raise ValueError("No n-grams to build a table from")
+
+    if n is None:
+        n = len(next(iter(counts)))
+
+    total = 0
+    for ngram, count in counts.items():
+        if len(ngram) != n or any(c not in _CODES for c in ngram):
+            raise ValueError(f"Invalid {n}-gram: {ngram!r}")
+        total += count
+
+    floor = math.log10(0.01 / total)
+    logp = {ngram: math.log10(count / total) for ngram, count in counts.items()}
+    return NgramTable(n, dense_table(logp, n, floor), floor)
+
+
+def build_ngram_table(source, n=4):
+    """
+    Build a table from a local corpus text file or a counts file (auto-detected)
+    Returns: NgramTable (in memory)
+    """
+    if _is_counts_file(source):
+        return table_from_counts(load_ngram_counts(source), n)
+
+    with open(source, 'r', encoding='utf-8', errors='replace') as f:
+        return table_from_counts(count_ngrams(f.read(), n), n)
+
+
+def save_ngram_table(table, filepath):
+    """
+    Write table to a binary file (header + raw doubles, native byte order)
+    Written to a temp file next to filepath, then renamed over it: processes that
+    have the old file memory-mapped keep their pages, concurrent writers never interleave
+    """
+    byteorder = b'<' if sys.byteorder == 'little' else b'>'
+    values = table.table if isinstance(table.table, array) else array('d', table.table)
+
+    temp_path = f"{filepath}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, table.n, byteorder, table.floor))
+            values.tofile(f)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def load_ngram_table(filepath):
+    """
+    Memory-map a table saved by save_ngram_table
+    Nothing is parsed or copied - pages are shared read-only between processes
+    Returns: NgramTable backed by the mapped file
+    """
+    with open(filepath, 'rb') as f:
+        header = f.read(TABLE_HEADER.size)
+        if len(header) != TABLE_HEADER.size:
+            raise ValueError(f"Not an n-gram table file: {filepath}")
+
+        magic, version, n, byteorder, floor = TABLE_HEADER.unpack(header)
+        if magic != TABLE_MAGIC:
+            raise ValueError(f"Not an n-gram table file: {filepath}")
+        if version != TABLE_VERSION:
+            raise ValueError(f"Unsupported n-gram table version: {version}")
+
+        expected_size = TABLE_HEADER.size + 8 * 26 ** n
+        if os.fstat(f.fileno()).st_size != expected_size:
+            raise ValueError(f"Truncated n-gram table file: {filepath}")
+
+        native = b'<' if sys.byteorder == 'little' else b'>'
+        if byteorder != native:
+            # Written on a machine with the other byte order - load and swap instead
+            values = array('d')
+            values.fromfile(f, 26 ** n)
+            values.byteswap()
+            return NgramTable(n, values, floor)
+
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    values = memoryview(mapped)[TABLE_HEADER.size:].cast('d')
+    return NgramTable(n, values, floor, path=os.path.abspath(filepath))
+
+
+def load_quadgrams(source, cache_path=None):
+    """
+    Quadgram table for the scorers
+    source: corpus text / counts file, or a binary table saved earlier
+    cache_path: binary file to build once and memory-map afterwards
+                (default: source + '.bin'); rebuilt when source is newer
+    Returns: NgramTable
+    """
+    with open(source, 'rb') as f:
+        is_binary = f.read(len(TABLE_MAGIC)) == TABLE_MAGIC
+    if is_binary:
+        return load_ngram_table(source)
+
+    cache_path = cache_path or source + '.bin'
+    if (not os.path.exists(cache_path) or
+            os.path.getmtime(cache_path) < os.path.getmtime(source)):
+        save_ngram_table(build_ngram_table(source, 4), cache_path)
+
+    return load_ngram_table(cache_path)
+
+
+if __name__ == "__main__":
+    # Build a binary quadgram table: python -m algorithms.ngram_tables <corpus|counts> <output.bin>
+    if len(sys.argv) != 3:
+        print("Usage: python -m algorithms.ngram_tables <corpus-or-counts-file> <output.bin>")
+        sys.exit(1)
+
+    quadgrams = build_ngram_table(sys.argv[1], 4)
+    save_ngram_table(quadgrams, sys.argv[2])
+    print(f"✓ Saved {26 ** 4} quadgram entries to {sys.argv[2]} (floor {quadgrams.floor:.4f})")
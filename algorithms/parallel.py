@@ -0,0 +1,71 @@
+"""
+Parallel Helpers
+Split CBC ciphertext into independent chunks and decrypt them in a process pool
+Shared by the AES and DES mode layers
+Also streams independent jobs (e.g. cracker restarts) back as they finish
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def split_cbc_chunks(ciphertext, iv, block_size, workers, min_chunk=64 * 1024):
+    """
+    Split ciphertext into contiguous chunks of whole blocks
+    Each chunk carries the ciphertext block before it as its chaining value
+    (the IV for the first chunk), so chunks decrypt independently
+    Returns: list of (chunk, previous_block)
+    """
+    block_count = len(ciphertext) // block_size
+
+    # At least min_chunk bytes per chunk - smaller chunks cost more in IPC than they save
+    min_blocks = max(1, min_chunk // block_size)
+    blocks_per_chunk = max(min_blocks, -(-block_count // workers))
+
+    chunks = []
+    for start_block in range(0, block_count, blocks_per_chunk):
+        start = start_block * block_size
+        end = min(start + blocks_per_chunk * block_size, len(ciphertext))
+        previous_block = iv if start == 0 else ciphertext[start - block_size:start]
+        chunks.append((ciphertext[start:end], previous_block))
+
+    return chunks
+
+
+def map_chunks(worker, chunk_args, workers):
+    """
+    Run worker(*args) for every args tuple in a process pool
+    Results come back in submission order
+    A single chunk runs in-process (no pool start-up cost)
+    """
+    if len(chunk_args) <= 1 or workers <= 1:
+        return [worker(*args) for args in chunk_args]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunk_args))) as pool:
+        futures = [pool.submit(worker, *args) for args in chunk_args]
+        return [future.result() for future in futures]
+
+
+def iter_completed(worker, job_args, workers, initializer=None, initargs=()):
+    """
+    Run worker(*args) for every args tuple in a process pool
+    Yields (index, result) as each job finishes - completion order, not submission order
+    initializer(*initargs) runs once per worker process (e.g. to build shared tables)
+    Closing the generator early cancels jobs that have not started yet
+    Without a pool (workers <= 1) jobs run in-process, in order
+    """
+    if len(job_args) <= 1 or not workers or workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for index, args in enumerate(job_args):
+            yield index, worker(*args)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(job_args)),
+                               initializer=initializer, initargs=initargs)
+    try:
+        futures = {pool.submit(worker, *args): index for index, args in enumerate(job_args)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Jobs already running finish; queued ones are dropped
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -1,5 +1,21 @@
 from collections import Counter, defaultdict
+from itertools import accumulate
 import math
+import re
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+from ..ngram_tables import (dense_table, letter_counts, chi_squared_counts, best_shift,
+                            shift_table)
+from ..cancellation import check_cancelled
+
+HAS_NUMPY = np is not None
+
+# Unicode letter runs: every letter advances the key, as in clean_text
+_LETTER_RUNS = re.compile(r'([^\W\d_]+)')
 
 class VigenereCipher:
     def __init__(self):
@@ -12,34 +28,103 @@ class VigenereCipher:
             'u': 0.0276, 'v': 0.0098, 'w': 0.0236, 'x': 0.0015, 'y': 0.0197,
             'z': 0.0007
         }
+        # Dense 26-entry table (index = letter code) for chi-squared
+        self.english_freq_table = dense_table(self.english_freq, 1)
         self.IC_ENGLISH = 0.0686
 
     def clean_text(self, text):
         return ''.join(c.lower() for c in text if c.isalpha())
 
     # ================= KASISKI EXAMINATION =================
-    def kasiski_examination(self, ciphertext, min_len=3, max_len=5, max_keylen=30):
+    def kasiski_examination(self, ciphertext, min_len=3, max_len=5, max_keylen=30,
+                            max_letters=None):
+        """
+        Key lengths suggested by the spacings of repeated sequences
+        max_letters: cap on work - only the first max_letters letters are scanned
+                     (None = whole text; a few thousand repeats are plenty)
+        Returns: up to 10 key lengths, most frequent factor first
+        """
         text = self.clean_text(ciphertext)
-        seq_positions = defaultdict(list)
-
-        for l in range(min_len, max_len + 1):
-            for i in range(len(text) - l):
-                seq = text[i:i+l]
-                seq_positions[seq].append(i)
-
-        spacings = []
-        for positions in seq_positions.values():
-            if len(positions) >= 2:
-                for i in range(len(positions) - 1):
-                    spacings.append(positions[i+1] - positions[i])
-
-        factor_count = Counter()
-        for space in spacings:
-            for k in range(2, min(space, max_keylen + 1)):
-                if space % k == 0:
-                    factor_count[k] += 1
-
-        return [k for k, _ in factor_count.most_common(10)]
+        if max_letters is not None:
+            text = text[:max_letters]
+
+        spacing_counts = self.repeat_spacings(text, min_len, max_len)
+        factor_count = self.count_factors(spacing_counts, max_keylen)
+
+        ranked = sorted(factor_count.items(), key=lambda item: (-item[1], item[0]))
+        return [k for k, count in ranked[:10] if count > 0]
+
+    def repeat_spacings(self, text, min_len=3, max_len=5):
+        """
+        Histogram of spacings between consecutive occurrences of every repeated
+        sequence of min_len..max_len letters
+        Sequences are base-26 integers updated by a rolling hash (exact for
+        these lengths - no collisions, no substring strings stored)
+        Returns: Counter spacing -> number of times it occurs
+        """
+        if text.isascii():
+            codes = [b - 97 for b in text.encode('ascii')]
+        else:
+            # Non-ASCII letters get their own codes above 'z'
+            alphabet = {c: i for i, c in enumerate(sorted(set(text)))}
+            codes = [alphabet[c] for c in text]
+        base = max(codes, default=0) + 1
+
+        if HAS_NUMPY and len(codes) > max_len:
+            return self._repeat_spacings_numpy(codes, base, min_len, max_len)
+
+        spacings = Counter()
+        for length in range(min_len, max_len + 1):
+            modulus = base ** length
+            last_seen = {}
+            value = 0
+            # Windows start at 0 .. len(text) - length - 1
+            for end in range(len(codes) - 1):
+                value = (value * base + codes[end]) % modulus
+                start = end - length + 1
+                if start < 0:
+                    continue
+                previous = last_seen.get(value)
+                if previous is not None:
+                    spacings[start - previous] += 1
+                last_seen[value] = start
+        return spacings
+
+    def _repeat_spacings_numpy(self, codes, base, min_len, max_len):
+        """
+        Same spacings via sorting: window values are sorted stably, so equal
+        neighbours are consecutive occurrences of the same sequence
+        """
+        codes = np.array(codes, dtype=np.int64)
+        spacings = Counter()
+        for length in range(min_len, max_len + 1):
+            windows = len(codes) - length
+            if windows < 2:
+                continue
+            values = np.zeros(windows, dtype=np.int64)
+            for j in range(length):
+                values = values * base + codes[j:j + windows]
+            order = np.argsort(values, kind='stable')
+            repeated = values[order[1:]] == values[order[:-1]]
+            gaps = (order[1:] - order[:-1])[repeated]
+            hist = np.bincount(gaps)
+            for spacing in np.flatnonzero(hist).tolist():
+                spacings[spacing] += int(hist[spacing])
+        return spacings
+
+    def count_factors(self, spacing_counts, max_keylen=30):
+        """
+        For every k in 2..max_keylen: how many spacings k divides (spacing itself
+        excluded, as before). Sieve over the spacing histogram - each k walks its
+        multiples once instead of trial-dividing every spacing
+        Returns: dict k -> count
+        """
+        largest = max(spacing_counts, default=0)
+        factor_count = {}
+        for k in range(2, max_keylen + 1):
+            factor_count[k] = sum(spacing_counts.get(m, 0)
+                                  for m in range(2 * k, largest + 1, k))
+        return factor_count
 
     # ================= INDEX OF COINCIDENCE =================
     def calculate_ic(self, text):
@@ -49,16 +134,52 @@ class VigenereCipher:
         freq = Counter(text)
         return sum(v * (v - 1) for v in freq.values()) / (n * (n - 1))
 
-    def ic_analysis(self, ciphertext, max_keylen=20):
-        text = self.clean_text(ciphertext)
-        results = []
+    def average_ics(self, text, max_keylen=20):
+        """
+        Average column IC for every key length 1..max_keylen
+        text: cleaned text (clean_text)
+        Returns: list of (k, avg_ic)
+        """
+        if HAS_NUMPY and len(text) > 1:
+            return self._average_ics_numpy(text, max_keylen)
 
+        # Pure Python: column k of length L is the slice text[j::L] - no string building
+        results = []
         for k in range(1, max_keylen + 1):
-            groups = ['' for _ in range(k)]
-            for i, c in enumerate(text):
-                groups[i % k] += c
-            avg_ic = sum(self.calculate_ic(g) for g in groups) / k
+            avg_ic = sum(self.calculate_ic(text[j::k]) for j in range(k)) / k
             results.append((k, avg_ic))
+        return results
+
+    def _average_ics_numpy(self, text, max_keylen):
+        """
+        Text -> letter-index array once; per key length, one np.bincount over
+        (column * alphabet + letter) gives every column histogram at once
+        """
+        if text.isascii():
+            chars = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        else:
+            chars = np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+        # Every distinct character gets its own bin (non-ASCII letters too, same as Counter)
+        _, codes = np.unique(chars, return_inverse=True)
+        alphabet = int(codes.max()) + 1
+        codes = codes.astype(np.int64)
+        positions = np.arange(len(text), dtype=np.int64)
+
+        results = []
+        for k in range(1, max_keylen + 1):
+            hist = np.bincount((positions % k) * alphabet + codes,
+                               minlength=k * alphabet).reshape(k, alphabet)
+            sizes = hist.sum(axis=1)
+            pairs = (hist * (hist - 1)).sum(axis=1)
+            denominators = sizes * (sizes - 1)
+            column_ics = np.where(denominators > 0, pairs / np.maximum(denominators, 1), 0.0)
+            # Python sum keeps the result bit-identical to the pure-Python path
+            results.append((k, sum(column_ics.tolist()) / k))
+        return results
+
+    def ic_analysis(self, ciphertext, max_keylen=20):
+        text = self.clean_text(ciphertext)
+        results = self.average_ics(text, max_keylen)
 
         results.sort(key=lambda x: abs(x[1] - self.IC_ENGLISH))
         return [k for k, _ in results[:10]]
@@ -68,72 +189,98 @@ class VigenereCipher:
         n = len(text)
         if n == 0:
             return float('inf')
-        freq = Counter(text)
-        chi2 = 0
-        for c in 'abcdefghijklmnopqrstuvwxyz':
-            observed = freq.get(c, 0) / n
-            expected = self.english_freq[c]
-            chi2 += ((observed - expected) ** 2) / expected
-        return chi2
+        return chi_squared_counts(letter_counts(text), n, self.english_freq_table)
 
     # ================= FIND KEY =================
     def crack_caesar(self, text):
-        best_shift = 0
-        best_score = float('inf')
-
-        for shift in range(26):
-            decrypted = ''.join(chr((ord(c) - ord('a') - shift) % 26 + ord('a')) for c in text)
-            score = self.chi_squared(decrypted)
-            if score < best_score:
-                best_score = score
-                best_shift = shift
-
-        return best_shift
+        """
+        Best shift of one column: its histogram is counted once and all 26
+        shifts are scored by rotating it against english_freq (no decrypted text)
+        """
+        return best_shift(letter_counts(text), self.english_freq_table)
 
     def find_key(self, ciphertext, keylen):
         text = self.clean_text(ciphertext)
-        groups = ['' for _ in range(keylen)]
-
-        for i, c in enumerate(text):
-            groups[i % keylen] += c
-
-        key = ''
-        for g in groups:
-            shift = self.crack_caesar(g)
-            key += chr(shift + ord('a'))
 
-        return key
+        # Column j = every keylen-th letter starting at j
+        return ''.join(chr(self.crack_caesar(text[j::keylen]) + ord('a'))
+                       for j in range(keylen))
 
     # ================= DECRYPT =================
     def decrypt(self, ciphertext, key):
-        result = []
-        ki = 0
         key = key.lower()
-
-        for c in ciphertext:
-            if c.isalpha():
-                base = ord('A') if c.isupper() else ord('a')
-                shift = ord(key[ki % len(key)]) - ord('a')
-                result.append(chr((ord(c) - base - shift) % 26 + base))
-                ki += 1
-            else:
-                result.append(c)
-        return ''.join(result)
+        shifts = [ord(k) - ord('a') for k in key]
+        if not shifts:
+            return ciphertext
+
+        if HAS_NUMPY and len(ciphertext) >= 4096 and ciphertext.isascii():
+            return self._decrypt_numpy(ciphertext, shifts)
+
+        # Letters only, then every column j (letters j, j+L, ...) is one Caesar
+        # shift -> one str.translate per column, interleaved back by slice assignment
+        # (shift_table maps only A-Z / a-z: other letters keep their key slot unchanged)
+        parts = _LETTER_RUNS.split(ciphertext)
+        letters = ''.join(parts[1::2])
+        plain = list(letters)
+        for j, shift in enumerate(shifts):
+            plain[j::len(shifts)] = letters[j::len(shifts)].translate(shift_table(shift))
+        plain = ''.join(plain)
+
+        # Cut the decrypted letters back into runs of the original lengths and put
+        # them between the non-letter runs (map/accumulate: no per-word Python loop)
+        ends = list(accumulate(map(len, parts[1::2])))
+        starts = [0] + ends[:-1]
+        parts[1::2] = map(plain.__getitem__, map(slice, starts, ends))
+        return ''.join(parts)
+
+    def _decrypt_numpy(self, ciphertext, shifts):
+        # Letter-index buffer: gather the letters, shift column by column,
+        # scatter them back - non-letter bytes are never touched
+        data = np.frombuffer(ciphertext.encode('ascii'), dtype=np.uint8)
+        upper = (data >= 65) & (data <= 90)
+        lower = (data >= 97) & (data <= 122)
+        positions = np.flatnonzero(upper | lower)
+
+        base = np.where(upper[positions], 65, 97).astype(np.int16)
+        letters = data[positions].astype(np.int16) - base
+        key_shifts = np.array(shifts, dtype=np.int16)[np.arange(len(positions)) % len(shifts)]
+
+        out = data.copy()
+        out[positions] = (letters - key_shifts) % 26 + base
+        return out.tobytes().decode('ascii')
 
     # ================= MAIN CRACK =================
-    def crack(self, ciphertext):
+    def crack(self, ciphertext, progress=None, cancel=None):
+        """
+        progress: callback(steps_done, steps_total, best_chi_squared) - Kasiski, IC,
+                  then up to 3 candidate key lengths; steps_total is always 5
+                  (fewer candidates: the last one reports 5/5)
+        cancel: CancellationToken - checked between steps
+        """
+        max_candidates = 3
+        steps = 2 + max_candidates
+
+        check_cancelled(cancel)
         kasiski_keys = self.kasiski_examination(ciphertext)
+        if progress is not None:
+            progress(1, steps, None)
+
+        check_cancelled(cancel)
         ic_keys = self.ic_analysis(ciphertext)
 
         candidate_lengths = [k for k in kasiski_keys if k in ic_keys]
         if not candidate_lengths:
-            candidate_lengths = ic_keys[:3]
+            candidate_lengths = ic_keys[:max_candidates]
+        candidate_lengths = candidate_lengths[:max_candidates]
+        if progress is not None:
+            progress(2, steps, None)
 
         best_key = ''
         best_plain = ''
         best_score = float('inf')
 
-        for klen in candidate_lengths[:3]:
+        for i, klen in enumerate(candidate_lengths):
+            check_cancelled(cancel)
             key = self.find_key(ciphertext, klen)
             plain = self.decrypt(ciphertext, key)
             score = self.chi_squared(self.clean_text(plain))
@@ -143,17 +290,21 @@ class VigenereCipher:
                 best_key = key
                 best_plain = plain
 
+            if progress is not None:
+                last = i == len(candidate_lengths) - 1
+                progress(steps if last else 3 + i, steps, best_score)
+
         return best_key, best_plain
 
 
 # ================= FILE HELPER =================
 
-def crack_from_file(input_file, output_file):
+def crack_from_file(input_file, output_file, progress=None, cancel=None):
     with open(input_file, 'r', encoding='utf-8') as f:
         ciphertext = f.read()
 
     cipher = VigenereCipher()
-    key, plaintext = cipher.crack(ciphertext)
+    key, plaintext = cipher.crack(ciphertext, progress, cancel)
 
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(key + '\n')
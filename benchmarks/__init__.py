@@ -0,0 +1,13 @@
+"""
+Benchmark Suite
+Đo throughput / latency của các block cipher engine và các cracker
+
+Chạy: python -m benchmarks --help
+"""
+
+from .harness import (BenchmarkCase, run_case, run_suite, compare_results,
+                      load_results, save_results)
+from .cases import all_cases, generate_text
+
+__all__ = ['BenchmarkCase', 'run_case', 'run_suite', 'compare_results',
+           'load_results', 'save_results', 'all_cases', 'generate_text']
@@ -0,0 +1,115 @@
+"""
+Benchmark CLI
+
+    python -m benchmarks                          # toàn bộ suite (64MB với engine pure-Python rất lâu)
+    python -m benchmarks --quick                  # kích thước nhỏ, chạy nhanh
+    python -m benchmarks --filter 'aes-*/cbc/*' --sizes 1KB,1MB
+    python -m benchmarks --quick --output current.json --baseline baseline.json
+    python -m benchmarks --quick --save-baseline baseline.json
+
+Exit code 1 nếu có case sai kết quả hoặc chậm hơn baseline quá --threshold
+"""
+
+import argparse
+import fnmatch
+import sys
+
+from .cases import (all_cases, BLOCK_SIZES, TEXT_SIZES, QUICK_BLOCK_SIZES,
+                    QUICK_TEXT_SIZES, DEFAULT_SEED)
+from .harness import run_suite, save_results, load_results, compare_results
+
+
+def _format_number(value, fmt):
+    return format(value, fmt) if value is not None else '-'
+
+
+def print_result(name, stats):
+    """In 1 dòng kết quả"""
+    if 'error' in stats:
+        print(f"{name:<36} ERROR {stats['error']}")
+        return
+    ok = {True: '', False: '  WRONG RESULT', None: ''}[stats['ok']]
+    print(f"{name:<36} p50 {stats['p50_ms']:>11.3f} ms  p99 {stats['p99_ms']:>11.3f} ms  "
+          f"{_format_number(stats['mb_per_s'], '>9.3f')} MB/s  "
+          f"{_format_number(stats['ops_per_s'], '>10.2f')} ops/s  "
+          f"RSS {_format_number(stats['peak_rss_kb'], '>8')} KB{ok}", flush=True)
+
+
+def print_comparison(rows, threshold):
+    """In bảng so sánh với baseline, trả về số case hồi quy"""
+    print("\n" + "=" * 70)
+    print(f"BASELINE COMPARISON (threshold {threshold:.0%})")
+    print("=" * 70)
+    bad = 0
+    for row in rows:
+        if row['status'] == 'regression':
+            bad += 1
+        ratio = f"{row['p50_ratio']:.2f}x time" if row['p50_ratio'] is not None else ''
+        if row['rss_ratio'] is not None:
+            ratio += f", {row['rss_ratio']:.2f}x RSS"
+        print(f"{row['status'].upper():<11} {row['name']:<36} {ratio}")
+    print(f"\n{bad} regression(s)")
+    return bad
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmark cipher engines and crackers')
+    parser.add_argument('--filter', action='append', default=[],
+                        help="glob on case names, e.g. 'aes-*/ecb/*' (repeatable)")
+    parser.add_argument('--sizes', type=_split, help='block cipher sizes, e.g. 1KB,1MB,64MB')
+    parser.add_argument('--text-sizes', type=_split, help='cracker text sizes, e.g. 1k,10k,1M')
+    parser.add_argument('--quick', action='store_true', help='small sizes only')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--min-time', type=float, default=1.0,
+                        help='minimum measured seconds per case (default 1.0)')
+    parser.add_argument('--min-repeats', type=int, default=3)
+    parser.add_argument('--no-isolate', action='store_true',
+                        help='run cases in this process (faster, peak RSS is cumulative)')
+    parser.add_argument('--list', action='store_true', help='list case names and exit')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='compare against this results JSON')
+    parser.add_argument('--save-baseline', help='write results JSON as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown / RSS growth vs baseline (default 0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    block_sizes = args.sizes or (QUICK_BLOCK_SIZES if args.quick else BLOCK_SIZES)
+    text_sizes = args.text_sizes or (QUICK_TEXT_SIZES if args.quick else TEXT_SIZES)
+    cases = all_cases(block_sizes, text_sizes, args.seed)
+    if args.filter:
+        cases = [case for case in cases
+                 if any(fnmatch.fnmatchcase(case.name, pattern) for pattern in args.filter)]
+
+    if args.list:
+        for case in cases:
+            print(case.name)
+        return 0
+    if not cases:
+        print("No benchmark cases match the filter")
+        return 1
+
+    print(f"Running {len(cases)} benchmark case(s)\n")
+    results = run_suite(cases, args.min_time, args.min_repeats,
+                        isolate=not args.no_isolate, on_result=print_result)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            save_results(results, path)
+            print(f"\nResults saved to: {path}")
+
+    failures = sum(1 for stats in results['results'].values() if stats.get('ok') is False)
+    if args.baseline:
+        # Chạy có --filter: case không được chọn không tính là 'missing'
+        names = [case.name for case in cases] if args.filter else None
+        rows = compare_results(results, load_results(args.baseline), args.threshold, names)
+        failures += print_comparison(rows, args.threshold)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Benchmark Cases
+- Block ciphers: AES (mọi engine), DES, 3DES x ECB/CBC x encrypt/decrypt x kích thước dữ liệu
+- Crackers: Caesar, Vigenère, Mono trên text sinh ngẫu nhiên (seed cố định)
+
+Mỗi case có setup() (không tính giờ) trả về (op, check):
+- op(): thao tác được đo
+- check(result): True nếu kết quả đúng (giải mã khớp / tìm đúng key)
+"""
+
+import random
+from functools import partial
+
+from algorithms.aes import AESModes, HAS_NUMPY
+from algorithms.des import DESModes, TripleDESModes
+from algorithms.caesar.caesar_cipher import CaesarCipher
+from algorithms.vigenere.vigenere_cipher import VigenereCipher
+from algorithms.monoalphabetic.mono_cipher import MonoalphabeticCipher
+from algorithms.ngram_tables import ALPHABET, shift_table
+from .harness import BenchmarkCase
+
+
+DEFAULT_SEED = 20240601
+
+# Kích thước mặc định theo yêu cầu; --quick dùng bộ nhỏ
+BLOCK_SIZES = ['1KB', '1MB', '64MB']
+TEXT_SIZES = ['1k', '10k', '100k', '1M']
+QUICK_BLOCK_SIZES = ['1KB', '64KB']
+QUICK_TEXT_SIZES = ['1k', '10k']
+
+# Engine -> (factory, key length)
+BLOCK_ENGINES = {
+    'aes-reference': (partial(AESModes, engine='reference'), 16),
+    'aes-ttable': (partial(AESModes, engine='ttable'), 16),
+    'des': (DESModes, 8),
+    '3des': (TripleDESModes, 24),
+}
+if HAS_NUMPY:
+    # Không có numpy thì 'numpy' chỉ là alias của 'ttable' -> bỏ qua
+    BLOCK_ENGINES['aes-numpy'] = (partial(AESModes, engine='numpy'), 16)
+
+CRACKERS = ['caesar', 'vigenere', 'mono']
+
+# 200 từ tiếng Anh phổ biến, theo thứ tự tần suất (trọng số ~ Zipf)
+WORDS = """
+the of and to a in is you that it he was for on are as with his they i at be this
+have from or one had by word but not what all were we when your can said there use
+an each which she do how their if will up other about out many then them these so
+some her would make like him into time has look two more write go see number no way
+could people my than first water been call who oil its now find long down day did get
+come made may part over new sound take only little work know place year live me back
+give most very after thing our just name good sentence man think say great where help
+through much before line right too mean old any same tell boy follow came want show
+also around form three small set put end does another well large must big even such
+because turn here why ask went men read need land different home us move try kind hand
+picture again change off play spell air away animal house point page letter mother
+answer found study still learn should america world high every near add food between
+own below country plant last school father keep tree never start city earth eye light
+""".split()
+
+
+def parse_size(text):
+    """
+    '1KB' -> 1024, '64MB' -> 64 MiB, '10k' -> 10000, '1M' -> 1000000
+    Đơn vị *B là byte nhị phân (block cipher), k/M không có B là số ký tự thập phân
+    """
+    text = text.strip()
+    units = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'k': 1000, 'M': 1000 ** 2}
+    for suffix in ('KB', 'MB', 'GB', 'k', 'M'):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * units[suffix])
+    return int(text)
+
+
+def generate_text(length, seed=DEFAULT_SEED):
+    """
+    Sinh text tiếng Anh giả lập dài đúng `length` ký tự (tái lập được theo seed)
+    Câu gồm 6-15 từ, viết hoa chữ đầu, kết thúc bằng dấu chấm
+    """
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 2) for rank in range(len(WORDS))]
+    parts = []
+    size = 0
+    while size < length:
+        words = rng.choices(WORDS, weights, k=rng.randint(6, 15))
+        sentence = ' '.join(words).capitalize() + '. '
+        parts.append(sentence)
+        size += len(sentence)
+    return ''.join(parts)[:length]
+
+
+# ==================== BLOCK CIPHER CASES ====================
+
+def _block_setup(engine, mode, operation, nbytes, seed):
+    factory, key_len = BLOCK_ENGINES[engine]
+    cipher = factory()
+    rng = random.Random(seed)
+    key = rng.randbytes(key_len)
+    iv = rng.randbytes(cipher.block_size) if mode == 'CBC' else None
+    plaintext = rng.randbytes(nbytes)
+
+    if operation == 'encrypt':
+        def op():
+            return cipher.encrypt(plaintext, key, mode=mode, iv=iv)[0]
+
+        def check(ciphertext):
+            return cipher.decrypt(ciphertext, key, mode=mode, iv=iv) == plaintext
+    else:
+        ciphertext, _ = cipher.encrypt(plaintext, key, mode=mode, iv=iv)
+
+        def op():
+            return cipher.decrypt(ciphertext, key, mode=mode, iv=iv, workers=1)
+
+        def check(result):
+            return result == plaintext
+
+    return op, check
+
+
+def block_cases(sizes=None, seed=DEFAULT_SEED):
+    """Case block cipher: '<engine>/<mode>/<operation>/<size>'"""
+    cases = []
+    for engine in BLOCK_ENGINES:
+        for mode in ('ECB', 'CBC'):
+            for operation in ('encrypt', 'decrypt'):
+                for size in sizes or BLOCK_SIZES:
+                    nbytes = parse_size(size)
+                    cases.append(BenchmarkCase(
+                        f"{engine}/{mode.lower()}/{operation}/{size}",
+                        partial(_block_setup, engine, mode, operation, nbytes, seed),
+                        group='block', nbytes=nbytes,
+                        params={'engine': engine, 'mode': mode,
+                                'operation': operation, 'size': size}))
+    return cases
+
+
+# ==================== CRACKER CASES ====================
+
+def _vigenere_encrypt(plaintext, key):
+    """Mã hóa Vigenère (chỉ chữ ASCII, mỗi chữ cái tiến key 1 bước)"""
+    tables = [shift_table(-(ord(k) - ord('a'))) for k in key.lower()]
+    out = []
+    ki = 0
+    for c in plaintext:
+        if c.isalpha():
+            out.append(c.translate(tables[ki % len(tables)]))
+            ki += 1
+        else:
+            out.append(c)
+    return ''.join(out)
+
+
+def _letter_accuracy(expected, actual):
+    """Tỉ lệ chữ cái giải mã đúng"""
+    pairs = [(a, b) for a, b in zip(expected.lower(), actual.lower()) if a.isalpha()]
+    if not pairs:
+        return 1.0
+    return sum(a == b for a, b in pairs) / len(pairs)
+
+
+def _crack_setup(cracker, length, seed):
+    rng = random.Random(seed)
+    plaintext = generate_text(length, seed)
+
+    if cracker == 'caesar':
+        cipher = CaesarCipher()
+        key = rng.randrange(1, 26)
+        ciphertext = plaintext.translate(shift_table(-key))
+
+        def crack():
+            return cipher.crack(ciphertext, verbose=False)
+
+        def check(result):
+            return result[0] == key
+    elif cracker == 'vigenere':
+        cipher = VigenereCipher()
+        key = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 8)))
+        ciphertext = _vigenere_encrypt(plaintext, key)
+
+        def crack():
+            return cipher.crack(ciphertext)
+
+        def check(result):
+            return result[0].lower() == key
+    else:
+        cipher = MonoalphabeticCipher()
+        shuffled = list(ALPHABET)
+        rng.shuffle(shuffled)
+        shuffled = ''.join(shuffled)
+        ciphertext = plaintext.translate(str.maketrans(ALPHABET + ALPHABET.upper(),
+                                                       shuffled + shuffled.upper()))
+
+        def crack():
+            return cipher.crack(ciphertext, restarts=8, workers=1, seed=seed, verbose=False)
+
+        def check(result):
+            return _letter_accuracy(plaintext, result[1]) >= 0.9
+
+    return crack, check
+
+
+def crack_cases(sizes=None, seed=DEFAULT_SEED):
+    """Case cracker: 'crack/<cipher>/<size>'"""
+    cases = []
+    for cracker in CRACKERS:
+        for size in sizes or TEXT_SIZES:
+            length = parse_size(size)
+            cases.append(BenchmarkCase(
+                f"crack/{cracker}/{size}",
+                partial(_crack_setup, cracker, length, seed),
+                group='crack', nbytes=length, max_repeats=5,
+                params={'cracker': cracker, 'size': size, 'seed': seed}))
+    return cases
+
+
+def all_cases(block_sizes=None, text_sizes=None, seed=DEFAULT_SEED):
+    """Toàn bộ case theo thứ tự chạy"""
+    return block_cases(block_sizes, seed) + crack_cases(text_sizes, seed)
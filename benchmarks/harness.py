@@ -0,0 +1,224 @@
+"""
+Benchmark Harness
+- Đo thời gian từng case (lặp lại thích ứng, bỏ lần chạy warm-up)
+- Thống kê: p50/p99/mean latency, MB/s, ops/s, peak RSS
+- Mỗi case chạy trong 1 process riêng -> peak RSS không bị case trước làm nhiễu
+- Ghi / đọc kết quả JSON và so sánh với baseline
+"""
+
+import json
+import math
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+RESULTS_VERSION = 1
+
+
+class BenchmarkCase:
+    """
+    Một case benchmark
+    name: tên duy nhất, dạng 'nhóm/.../kích thước'
+    setup: callable (picklable) trả về (op, check) - không tính giờ
+    nbytes: số byte / ký tự xử lý mỗi lần op() (để tính MB/s)
+    max_repeats: giới hạn số lần lặp (case chậm)
+    """
+
+    def __init__(self, name, setup, group='', nbytes=0, params=None, max_repeats=50):
+        self.name = name
+        self.setup = setup
+        self.group = group
+        self.nbytes = nbytes
+        self.params = params or {}
+        self.max_repeats = max_repeats
+
+    def __repr__(self):
+        return f"BenchmarkCase({self.name!r})"
+
+
+def percentile(samples, q):
+    """Percentile q (0-100) với nội suy tuyến tính giữa 2 mẫu"""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    pos = (len(ordered) - 1) * q / 100
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def peak_rss_kb():
+    """Peak RSS của process hiện tại (KB), None nếu không đo được"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak //= 1024  # macOS trả về byte
+    return peak
+
+
+def measure(op, min_time=1.0, min_repeats=3, max_repeats=50, warmup_limit=0.05):
+    """
+    Gọi op() lặp lại, trả về (danh sách thời gian (giây), kết quả lần cuối)
+    - Lần đầu là warm-up (bị bỏ) nếu nhanh hơn warmup_limit
+    - Lặp tới khi đủ min_repeats lần VÀ tổng thời gian >= min_time, tối đa max_repeats
+    - Case rất chậm (lần đầu > min_time) chỉ chạy đúng 1 lần
+    """
+    start = time.perf_counter()
+    result = op()
+    first = time.perf_counter() - start
+    samples = [] if first < warmup_limit else [first]
+    if first >= min_time:
+        return samples, result
+
+    total = 0.0
+    while len(samples) < max_repeats and (len(samples) < min_repeats or total < min_time):
+        start = time.perf_counter()
+        result = op()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        total += elapsed
+    return samples, result
+
+
+def summarize(case, samples, ok):
+    """Thống kê cho 1 case từ các mẫu thời gian"""
+    p50 = percentile(samples, 50)
+    return {
+        'group': case.group,
+        'params': case.params,
+        'nbytes': case.nbytes,
+        'repeats': len(samples),
+        'p50_ms': p50 * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'mean_ms': sum(samples) / len(samples) * 1000,
+        'min_ms': min(samples) * 1000,
+        'mb_per_s': case.nbytes / p50 / 1e6 if p50 > 0 else None,
+        'ops_per_s': 1 / p50 if p50 > 0 else None,
+        'ok': ok,
+    }
+
+
+def run_case(case, min_time=1.0, min_repeats=3):
+    """Chạy 1 case trong process hiện tại"""
+    op, check = case.setup()
+    samples, result = measure(op, min_time, min_repeats, case.max_repeats)
+    ok = check(result) if check else None
+    stats = summarize(case, samples, ok)
+    stats['peak_rss_kb'] = peak_rss_kb()
+    return stats
+
+
+def environment():
+    """Thông tin môi trường ghi kèm kết quả (để so sánh baseline có ý nghĩa)"""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__ if np is not None else None,
+    }
+
+
+def run_suite(cases, min_time=1.0, min_repeats=3, isolate=True, on_result=None):
+    """
+    Chạy danh sách case, trả về dict kết quả (dạng JSON)
+    isolate: mỗi case 1 process mới -> peak_rss_kb là của riêng case đó
+             (False: cùng process, peak RSS tăng dần qua các case)
+    on_result: callback(name, stats) sau mỗi case
+    """
+    results = {}
+    for case in cases:
+        try:
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    stats = pool.submit(run_case, case, min_time, min_repeats).result()
+            else:
+                stats = run_case(case, min_time, min_repeats)
+        except Exception as e:
+            stats = {'group': case.group, 'params': case.params, 'nbytes': case.nbytes,
+                     'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        stats['rss_isolated'] = isolate
+        results[case.name] = stats
+        if on_result:
+            on_result(case.name, stats)
+
+    return {
+        'version': RESULTS_VERSION,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'results': results,
+    }
+
+
+# ==================== JSON I/O ====================
+
+def save_results(results, path):
+    """Ghi kết quả ra file JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_results(path):
+    """Đọc kết quả / baseline từ file JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    if results.get('version') != RESULTS_VERSION:
+        raise ValueError(f"Unsupported benchmark results version: {results.get('version')}")
+    return results
+
+
+# ==================== BASELINE COMPARISON ====================
+
+def compare_results(current, baseline, threshold=0.2, names=None):
+    """
+    So sánh kết quả hiện tại với baseline
+    - Thời gian: p50 chậm hơn baseline quá threshold (0.2 = 20%) -> 'regression'
+    - Bộ nhớ: peak RSS lớn hơn baseline quá threshold -> 'regression'
+    - Case sai kết quả (ok = False) -> 'failed'
+    names: chỉ so sánh các case này (mặc định: mọi case trong current và baseline)
+    Returns: danh sách dict {name, status, p50_ratio, rss_ratio}, sắp theo tên
+    status: 'ok', 'faster', 'regression', 'failed', 'new', 'missing'
+    """
+    rows = []
+    cur = current['results']
+    base = baseline['results']
+
+    if names is None:
+        names = set(cur) | set(base)
+    for name in sorted(names):
+        row = {'name': name, 'p50_ratio': None, 'rss_ratio': None}
+        if name not in cur:
+            row['status'] = 'missing'
+        elif cur[name].get('ok') is False:
+            row['status'] = 'failed'
+        elif name not in base or 'p50_ms' not in base[name]:
+            row['status'] = 'new'
+        else:
+            row['p50_ratio'] = cur[name]['p50_ms'] / base[name]['p50_ms']
+            if cur[name].get('peak_rss_kb') and base[name].get('peak_rss_kb'):
+                row['rss_ratio'] = cur[name]['peak_rss_kb'] / base[name]['peak_rss_kb']
+
+            if row['p50_ratio'] > 1 + threshold or (row['rss_ratio'] or 0) > 1 + threshold:
+                row['status'] = 'regression'
+            elif row['p50_ratio'] < 1 - threshold:
+                row['status'] = 'faster'
+            else:
+                row['status'] = 'ok'
+        rows.append(row)
+    return rows
@@ -0,0 +1,12 @@
+"""
+Command-line Front End
+Batch crack / encrypt / decrypt nhiều file không cần GUI
+
+Chạy: python -m cli --help
+"""
+
+from .batch import (OPERATIONS, collect_inputs, output_name, plan_jobs, run_job,
+                    run_batch, summarize)
+
+__all__ = ['OPERATIONS', 'collect_inputs', 'output_name', 'plan_jobs', 'run_job',
+           'run_batch', 'summarize']
@@ -0,0 +1,141 @@
+"""
+Batch CLI - xử lý nhiều file không cần GUI
+
+    python -m cli caesar input_dir/ -o out/
+    python -m cli mono 'data/**/*.txt' -o out/ --workers 8
+    python -m cli aes-encrypt plain/ -o enc/ --key-env AES_KEY --mode CBC
+    python -m cli des-decrypt 'enc/*.enc' -o plain/ --key 133457799BBCDFF1
+
+Output: 1 file kết quả / input, results.jsonl (ghi ngay khi từng file xong)
+và summary.json trong thư mục output
+Exit code: 0 = mọi file thành công, 1 = có file lỗi, 2 = tham số sai / không có input
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from utils.file_handler import hex_to_bytes
+from .batch import (OPERATIONS, CRACKERS, CIPHERS, RESULTS_LOG, SUMMARY_FILE, plan_jobs,
+                    run_batch, summarize, write_json, Progress)
+
+
+def _parse_key(args, parser):
+    """Key / IV (hex) cho block cipher, kiểm tra độ dài trước khi chạy batch"""
+    name = args.operation.split('-')[0]
+    cipher = CIPHERS[name]()
+
+    key_hex = args.key
+    if args.key_env:
+        key_hex = os.environ.get(args.key_env)
+        if not key_hex:
+            parser.error(f"environment variable {args.key_env} is not set")
+    if not key_hex:
+        parser.error(f"{args.operation} needs --key or --key-env")
+
+    try:
+        key = cipher._validate_key(hex_to_bytes(key_hex))
+        iv = cipher._validate_iv(hex_to_bytes(args.iv)) if args.iv else None
+    except ValueError as e:
+        parser.error(str(e))
+    return key, iv
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m cli',
+        description='Crack, encrypt or decrypt many files in parallel (headless)')
+    parser.add_argument('operation', choices=OPERATIONS)
+    parser.add_argument('inputs', nargs='+', help='files, directories or glob patterns')
+    parser.add_argument('-o', '--output-dir', required=True, help='directory for results')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='walk input directories recursively')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='worker processes (default: CPU count, 1 = no pool)')
+    parser.add_argument('--summary', help='summary JSON path (default: <output-dir>/summary.json)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='no progress output')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='keep the crackers\' own stdout output')
+
+    block = parser.add_argument_group('block ciphers (aes/des/3des)')
+    block.add_argument('--key', help='key in hex')
+    block.add_argument('--key-env', help='read the hex key from this environment variable')
+    block.add_argument('--mode', type=str.upper, choices=['ECB', 'CBC', 'CTR'],
+                       help='encrypt: default ECB; decrypt: default = from file header')
+    block.add_argument('--iv', help='IV / CTR nonce in hex (encrypt: random per file if omitted; '
+                                    'CTR encryption accepts it for a single file only)')
+    block.add_argument('--format', dest='file_format', choices=['binary', 'hex'],
+                       default='binary', help='encrypted file format (default: binary)')
+    block.add_argument('--engine', choices=['reference', 'ttable', 'numpy'],
+                       help='AES engine (default: fastest available)')
+
+    parser.add_argument('--quadgrams', help='mono: quadgram corpus / counts / table file')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    options = {'verbose': args.verbose}
+    if args.operation in CRACKERS:
+        if args.quadgrams:
+            options['quadgrams'] = args.quadgrams
+    else:
+        key, iv = _parse_key(args, parser)
+        options.update(key=key, iv=iv, mode=args.mode, file_format=args.file_format,
+                       engine=args.engine)
+
+    try:
+        jobs = plan_jobs(args.operation, args.inputs, args.output_dir, args.recursive, **options)
+    except ValueError as e:
+        parser.error(str(e))
+    if not jobs:
+        print("No input files found", file=sys.stderr)
+        return 2
+    if (args.operation.endswith('-encrypt') and args.mode == 'CTR' and args.iv and
+            len(jobs) > 1):
+        # Cùng key + cùng nonce = cùng keystream cho mọi file (XOR 2 ciphertext lộ plaintext)
+        parser.error("--iv with --mode CTR would reuse one nonce for every file; "
+                     "omit --iv to draw a random nonce per file")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    workers = args.workers or os.cpu_count() or 1
+    progress = None if args.quiet else Progress(len(jobs))
+    if progress:
+        print(f"{args.operation}: {len(jobs)} file(s), {workers} worker(s)", file=sys.stderr)
+
+    start = time.time()
+    finished = []
+    interrupted = False
+    with open(os.path.join(args.output_dir, RESULTS_LOG), 'w', encoding='utf-8') as log:
+        def on_result(record):
+            finished.append(record)
+            log.write(json.dumps(record, ensure_ascii=False) + '\n')
+            log.flush()
+            if progress:
+                progress.update(record)
+
+        try:
+            records = run_batch(jobs, workers, on_result)
+        except KeyboardInterrupt:
+            # Job chưa chạy bị hủy; summary vẫn ghi các file đã xong
+            records = finished + [None] * (len(jobs) - len(finished))
+            interrupted = True
+
+    summary = summarize(args.operation, records, workers, time.time() - start)
+    summary_path = args.summary or os.path.join(args.output_dir, SUMMARY_FILE)
+    write_json(summary_path, summary)
+
+    if not args.quiet:
+        print(f"{summary['succeeded']}/{summary['total']} succeeded, {summary['failed']} failed "
+              f"in {summary['seconds']:.1f}s - summary: {summary_path}", file=sys.stderr)
+    if interrupted:
+        return 130
+    return 1 if summary['failed'] or summary['finished'] < summary['total'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
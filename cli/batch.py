@@ -0,0 +1,283 @@
+"""
+Batch Processing
+Chạy crack / mã hóa / giải mã cho nhiều file trên process pool, không cần GUI
+- Input: file, thư mục hoặc glob ('data/**/*.txt')
+- Mỗi file 1 job độc lập; lỗi của 1 file không dừng cả batch
+- Kết quả từng file được ghi ngay khi xong (results.jsonl) + summary JSON cuối cùng
+"""
+
+import glob
+import json
+import os
+import sys
+import time
+
+from algorithms.caesar.caesar_cipher import crack_from_file as crack_caesar_file
+from algorithms.vigenere.vigenere_cipher import crack_from_file as crack_vigenere_file
+from algorithms.monoalphabetic.mono_cipher import crack_from_file as crack_mono_file
+from algorithms.aes import AESModes
+from algorithms.des import DESModes, TripleDESModes
+from algorithms.parallel import iter_completed
+from utils.file_handler import encrypt_file_stream, decrypt_file_stream, bytes_to_hex
+
+
+# Block cipher theo tên dùng trong operation ('aes-encrypt', '3des-decrypt', ...)
+CIPHERS = {
+    'aes': AESModes,
+    'des': DESModes,
+    '3des': TripleDESModes,
+}
+
+CRACKERS = ('caesar', 'vigenere', 'mono')
+
+# File báo cáo batch ghi vào thư mục output (không bao giờ là input của batch sau)
+RESULTS_LOG = 'results.jsonl'
+SUMMARY_FILE = 'summary.json'
+
+OPERATIONS = list(CRACKERS) + [f"{name}-{action}" for name in CIPHERS
+                               for action in ('encrypt', 'decrypt')]
+
+
+# ==================== INPUT / OUTPUT PATHS ====================
+
+def _glob_root(pattern):
+    """
+    Thư mục trước thành phần glob đầu tiên ('data/**/*.txt' -> 'data')
+    Kết quả glob được tính tương đối với thư mục này (giữ cấu trúc thư mục như input là thư mục)
+    """
+    root = []
+    for part in os.path.normpath(pattern).split(os.sep)[:-1]:
+        if glob.has_magic(part):
+            break
+        root.append(part)
+    return os.sep.join(root) or (os.sep if pattern.startswith(os.sep) else '.')
+
+
+def collect_inputs(sources, recursive=False):
+    """
+    Mở rộng danh sách file / thư mục / glob thành danh sách (path, relative name)
+    relative name: đường dẫn tương đối với thư mục gốc (để giữ cấu trúc thư mục ở output)
+    Trùng lặp bị bỏ, thứ tự ổn định (sắp xếp theo từng source)
+    """
+    found = []
+    seen = set()
+
+    def add(path, relative):
+        real = os.path.realpath(path)
+        if real not in seen:
+            seen.add(real)
+            found.append((path, relative))
+
+    for source in sources:
+        if os.path.isdir(source):
+            if recursive:
+                for root, dirs, files in os.walk(source):
+                    dirs.sort()
+                    for name in sorted(files):
+                        path = os.path.join(root, name)
+                        add(path, os.path.relpath(path, source))
+            else:
+                for name in sorted(os.listdir(source)):
+                    path = os.path.join(source, name)
+                    if os.path.isfile(path):
+                        add(path, name)
+        elif os.path.isfile(source):
+            add(source, os.path.basename(source))
+        else:
+            root = _glob_root(source)
+            for path in sorted(glob.glob(source, recursive=True)):
+                if os.path.isfile(path):
+                    add(path, os.path.relpath(path, root))
+
+    return found
+
+
+def output_name(operation, relative):
+    """
+    Tên file output cho 1 input
+    crack: <name>.cracked.txt | encrypt: <name>.enc | decrypt: bỏ '.enc' (hoặc thêm '.dec')
+    """
+    if operation in CRACKERS:
+        return os.path.splitext(relative)[0] + '.cracked.txt'
+    if operation.endswith('-encrypt'):
+        return relative + '.enc'
+    if relative.endswith('.enc'):
+        return relative[:-len('.enc')]
+    return relative + '.dec'
+
+
+def plan_jobs(operation, sources, output_dir, recursive=False, **options):
+    """
+    Tạo danh sách job cho các input
+    options: key, mode, iv, file_format, engine (block cipher) / quadgrams (mono) / verbose
+    File nằm trong output_dir bị bỏ qua (chạy lại batch không xử lý lại output cũ),
+    cũng như results.jsonl / summary.json của batch trước (output dir cũ dùng làm input)
+    Returns: list of job dicts (picklable)
+    Raises ValueError nếu 2 input cho ra cùng 1 file output (vd. glob trùng tên ở 2 thư mục)
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation} (available: {', '.join(OPERATIONS)})")
+
+    output_root = os.path.realpath(output_dir) + os.sep
+    jobs = []
+    outputs = {}
+    for path, relative in collect_inputs(sources, recursive):
+        if (os.path.realpath(path).startswith(output_root) or
+                os.path.basename(path) in (RESULTS_LOG, SUMMARY_FILE)):
+            continue
+        output = os.path.join(output_dir, output_name(operation, relative))
+        if output in outputs:
+            raise ValueError(f"{outputs[output]} and {path} would both write {output}")
+        outputs[output] = path
+        jobs.append(dict(options, operation=operation, input=path, output=output))
+    return jobs
+
+
+# ==================== WORKER ====================
+
+def _make_cipher(name, engine=None):
+    if name == 'aes':
+        # 'numpy': vectorized cho ECB / CTR / CBC decrypt, T-table cho từng block (CBC encrypt)
+        # -> không chậm hơn engine nào ở mọi mode; không có numpy thì là T-table
+        return AESModes(engine=engine or 'numpy')
+    return CIPHERS[name]()
+
+
+def _execute(job):
+    """Thực hiện 1 job, trả về dict kết quả riêng của operation"""
+    operation = job['operation']
+    source, target = job['input'], job['output']
+
+    verbose = bool(job.get('verbose'))
+    if operation == 'caesar':
+        key, _ = crack_caesar_file(source, target, verbose=verbose)
+        return {'key': key}
+    if operation == 'vigenere':
+        key, _ = crack_vigenere_file(source, target)
+        return {'key': key}
+    if operation == 'mono':
+        key, _, score = crack_mono_file(source, target, quadgrams=job.get('quadgrams'),
+                                         verbose=verbose)
+        return {'key': ''.join(key[c] for c in sorted(key)), 'score': score}
+
+    name, action = operation.split('-')
+    cipher = _make_cipher(name, job.get('engine'))
+    if action == 'encrypt':
+        mode = job.get('mode') or 'ECB'
+        iv = encrypt_file_stream(cipher, source, target, job['key'], mode, job.get('iv'),
+                                 file_format=job.get('file_format') or 'binary')
+        return {'mode': mode, 'iv': bytes_to_hex(iv) if iv else None}
+
+    used = decrypt_file_stream(cipher, source, target, job['key'], job.get('mode'), job.get('iv'))
+    return {'mode': used['mode'], 'iv': bytes_to_hex(used['iv']) if used['iv'] else None,
+            'format': used['format']}
+
+
+def run_job(job):
+    """
+    Process pool worker: 1 file
+    Không bao giờ raise - lỗi được ghi vào kết quả ('status': 'failed', 'error')
+    Các cracker chỉ in ra stdout khi job['verbose']
+    """
+    record = {'input': job['input'], 'output': job['output'], 'operation': job['operation']}
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(job['output']) or '.', exist_ok=True)
+        record['result'] = _execute(job)
+        record['status'] = 'ok'
+    except Exception as e:
+        record['status'] = 'failed'
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = round(time.perf_counter() - start, 6)
+    return record
+
+
+# ==================== BATCH ====================
+
+class Progress:
+    """
+    Tiến độ tổng hợp trên stderr
+    Terminal: 1 dòng cập nhật tại chỗ; không phải terminal (log, cron): tối đa 1 dòng / interval giây
+    """
+
+    def __init__(self, total, stream=None, interval=5.0):
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.start = time.time()
+        self._last = 0.0
+        self._tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+
+    def update(self, record):
+        self.done += 1
+        if record['status'] != 'ok':
+            self.failed += 1
+            # Lỗi luôn được in (không bị gộp vào dòng tiến độ)
+            self._write(f"FAILED {record['input']}: {record['error']}", newline=True)
+
+        now = time.time()
+        if self.done == self.total or (now - self._last >= (0.1 if self._tty else self.interval)):
+            self._last = now
+            self._write(self.line(now), newline=not self._tty or self.done == self.total)
+
+    def line(self, now=None):
+        elapsed = (now or time.time()) - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        percent = self.done / self.total * 100 if self.total else 100.0
+        return (f"[{self.done}/{self.total}] {percent:5.1f}%  ok {self.done - self.failed}  "
+                f"failed {self.failed}  {rate:.2f} files/s  ETA {eta:.0f}s")
+
+    def _write(self, text, newline):
+        if self._tty:
+            self.stream.write('\r\033[K' + text + ('\n' if newline else ''))
+        else:
+            self.stream.write(text + '\n')
+        self.stream.flush()
+
+
+def run_batch(jobs, workers=None, on_result=None):
+    """
+    Chạy các job trên process pool (workers=None: mọi CPU, 1: tuần tự trong process này)
+    on_result: callback(record) ngay khi mỗi file xong (thứ tự hoàn thành)
+    Returns: danh sách kết quả theo thứ tự job
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    records = [None] * len(jobs)
+    results = iter_completed(run_job, [(job,) for job in jobs], workers)
+    try:
+        for index, record in results:
+            records[index] = record
+            if on_result is not None:
+                on_result(record)
+    finally:
+        # Ctrl+C: job chưa chạy bị hủy
+        results.close()
+    return records
+
+
+def summarize(operation, records, workers, seconds):
+    """Summary JSON của 1 batch"""
+    failed = [r for r in records if r is not None and r['status'] != 'ok']
+    finished = [r for r in records if r is not None]
+    return {
+        'operation': operation,
+        'workers': workers,
+        'total': len(records),
+        'finished': len(finished),
+        'succeeded': len(finished) - len(failed),
+        'failed': len(failed),
+        'seconds': round(seconds, 3),
+        'files': finished,
+    }
+
+
+def write_json(path, data):
+    """Ghi JSON (UTF-8, giữ nguyên ký tự không phải ASCII)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write('\n')
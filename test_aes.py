@@ -61,8 +61,9 @@ def test_aes_with_files():
     os.makedirs('test_files', exist_ok=True)
     
     plaintext_file = 'test_files/aes_plaintext.txt'
-    encrypted_ecb_file = 'test_files/aes_encrypted_ecb.txt'
-    encrypted_cbc_file = 'test_files/aes_encrypted_cbc.txt'
+    encrypted_ecb_file = 'test_files/aes_encrypted_ecb.enc'
+    encrypted_cbc_file = 'test_files/aes_encrypted_cbc.enc'
+    legacy_cbc_file = 'test_files/aes_encrypted_cbc.txt'
     decrypted_ecb_file = 'test_files/aes_decrypted_ecb.txt'
     decrypted_cbc_file = 'test_files/aes_decrypted_cbc.txt'
     
@@ -86,13 +87,14 @@ This test will verify that our implementation works correctly for both ECB and C
     plaintext_bytes = test_text.encode('utf-8')
     ciphertext_ecb, _ = aes.encrypt(plaintext_bytes, key, mode='ECB')
     
-    save_encrypted_output(encrypted_ecb_file, bytes_to_hex(ciphertext_ecb), 
-                         mode='ECB')
+    save_encrypted_container(encrypted_ecb_file, ciphertext_ecb, 'AES', mode='ECB',
+                             original_length=len(plaintext_bytes))
     print(f"✓ Encrypted and saved to: {encrypted_ecb_file}")
     
     # Decrypt ECB
-    data_ecb = parse_encrypted_input(encrypted_ecb_file)
-    ciphertext_ecb = hex_to_bytes(data_ecb['ciphertext'])
+    data_ecb = load_encrypted_file(encrypted_ecb_file)
+    assert data_ecb['format'] == 'binary' and data_ecb['algorithm'] == 'AES'
+    ciphertext_ecb = data_ecb['ciphertext']
     decrypted_ecb = aes.decrypt(ciphertext_ecb, key, mode='ECB')
     
     write_text_file(decrypted_ecb_file, decrypted_ecb.decode('utf-8'))
@@ -108,15 +110,16 @@ This test will verify that our implementation works correctly for both ECB and C
     print("\n--- Testing CBC Mode ---")
     ciphertext_cbc, iv = aes.encrypt(plaintext_bytes, key, mode='CBC')
     
-    save_encrypted_output(encrypted_cbc_file, bytes_to_hex(ciphertext_cbc), 
-                         bytes_to_hex(iv), mode='CBC')
+    save_encrypted_container(encrypted_cbc_file, ciphertext_cbc, 'AES', mode='CBC',
+                             iv=iv, original_length=len(plaintext_bytes))
     print(f"✓ Encrypted and saved to: {encrypted_cbc_file}")
     print(f"  IV: {bytes_to_hex(iv)}")
     
     # Decrypt CBC
-    data_cbc = parse_encrypted_input(encrypted_cbc_file)
-    ciphertext_cbc = hex_to_bytes(data_cbc['ciphertext'])
-    iv_cbc = hex_to_bytes(data_cbc['iv'])
+    data_cbc = load_encrypted_file(encrypted_cbc_file)
+    assert data_cbc['mode'] == 'CBC' and data_cbc['original_length'] == len(plaintext_bytes)
+    ciphertext_cbc = data_cbc['ciphertext']
+    iv_cbc = data_cbc['iv']
     decrypted_cbc = aes.decrypt(ciphertext_cbc, key, mode='CBC', iv=iv_cbc)
     
     write_text_file(decrypted_cbc_file, decrypted_cbc.decode('utf-8'))
@@ -126,6 +129,19 @@ This test will verify that our implementation works correctly for both ECB and C
     decrypted_text = read_text_file(decrypted_cbc_file)
     assert original == decrypted_text, "CBC file test failed!"
     print("✓ CBC File Test Passed!")
+    
+    # Legacy hex text files are still readable (auto-detected)
+    print("\n--- Testing Legacy Hex Format ---")
+    save_encrypted_output(legacy_cbc_file, bytes_to_hex(ciphertext_cbc),
+                         bytes_to_hex(iv), mode='CBC')
+    data_legacy = load_encrypted_file(legacy_cbc_file)
+    assert data_legacy['format'] == 'hex', "Legacy format not detected!"
+    assert data_legacy['ciphertext'] == ciphertext_cbc and data_legacy['iv'] == iv
+    
+    # Binary container is about half the size of the hex text
+    assert os.path.getsize(encrypted_cbc_file) < os.path.getsize(legacy_cbc_file) * 0.6
+    print(f"✓ Legacy Format Test Passed! ({os.path.getsize(legacy_cbc_file)} bytes hex "
+          f"vs {os.path.getsize(encrypted_cbc_file)} bytes binary)")
 
 
 def test_aes_long_text():
@@ -202,8 +218,7 @@ def test_standard_vectors():
     print("TEST 5: NIST Standard Test Vectors")
     print("="*70)
     
-    from algorithms.aes import AESCore
-    aes = AESCore()
+    from algorithms.aes import AESCore, AESTTableCore, AESNumpyCore, HAS_NUMPY
     
     # FIPS 197 Appendix B test vector
     key = bytes.fromhex('2b7e151628aed2a6abf7158809cf4f3c')
@@ -214,18 +229,273 @@ def test_standard_vectors():
     print(f"Plaintext: {plaintext.hex()}")
     print(f"Expected:  {expected.hex()}")
     
-    ciphertext = aes.encrypt_block(plaintext, key)
-    print(f"Got:       {ciphertext.hex()}")
+    engines = [AESCore(), AESTTableCore()]
+    if HAS_NUMPY:
+        engines.append(AESNumpyCore())
+    else:
+        print("(numpy not installed - skipping AESNumpyCore)")
     
-    if ciphertext == expected:
+    for aes in engines:
+        print(f"\n--- {type(aes).__name__} ---")
+        
+        ciphertext = aes.encrypt_block(plaintext, key)
+        print(f"Got:       {ciphertext.hex()}")
+        
+        assert ciphertext == expected, "NIST test vector failed!"
         print("✓ NIST test vector passed!")
-    else:
-        print("✗ NIST test vector failed!")
+        
+        # Decrypt to verify
+        decrypted = aes.decrypt_block(ciphertext, key)
+        assert decrypted == plaintext, "Decryption verification failed!"
+        print("✓ Decryption verification passed!")
+
+
+def test_engines():
+    """Test that every AES engine produces identical ciphertext"""
+    print("\n" + "="*70)
+    print("TEST 7: AES Engines")
+    print("="*70)
+    
+    from algorithms.aes.aes_modes import ENGINES
+    
+    key = b'EngineTestKey!!!'
+    iv = b'EngineTestIV0000'
+    plaintext = b'All engines must agree on every block of ciphertext. ' * 30
+    
+    reference = AESModes(engine='reference')
+    expected_ecb, _ = reference.encrypt(plaintext, key, mode='ECB')
+    expected_cbc, _ = reference.encrypt(plaintext, key, mode='CBC', iv=iv)
+    
+    for engine in ENGINES:
+        aes = AESModes(engine=engine)
+        
+        ciphertext_ecb, _ = aes.encrypt(plaintext, key, mode='ECB')
+        ciphertext_cbc, _ = aes.encrypt(plaintext, key, mode='CBC', iv=iv)
+        assert ciphertext_ecb == expected_ecb, f"{engine}: ECB mismatch!"
+        assert ciphertext_cbc == expected_cbc, f"{engine}: CBC mismatch!"
+        
+        assert aes.decrypt(ciphertext_ecb, key, mode='ECB') == plaintext
+        assert aes.decrypt(ciphertext_cbc, key, mode='CBC', iv=iv) == plaintext
+        print(f"✓ Engine '{engine}' passed!")
+
+
+def test_key_schedule_cache():
+    """Test that the key is expanded once per key, not once per block"""
+    print("\n" + "="*70)
+    print("TEST 6: Key Schedule Cache")
+    print("="*70)
+    
+    aes = AESModes()
+    key = b'CacheTestKey0001'
+    plaintext = b'Key expansion should happen once per message. ' * 20
+    
+    ciphertext, _ = aes.encrypt(plaintext, key, mode='ECB')
+    stats = aes.key_cache.stats()
+    print(f"After encrypt: {stats}")
+    assert stats['misses'] == 1, "Key should be expanded exactly once"
+    
+    decrypted = aes.decrypt(ciphertext, key, mode='ECB')
+    assert decrypted == plaintext, "Decryption with cached key failed!"
+    
+    stats = aes.key_cache.stats()
+    print(f"After decrypt: {stats}")
+    assert stats['misses'] == 1 and stats['hits'] == 1, "Second message should hit the cache"
+    
+    # Prepared keys give the same result as raw keys
+    from algorithms.aes import AESCore
+    core = AESCore()
+    schedule = core.prepare(key)
+    block = plaintext[:16]
+    assert core.encrypt_block(block, schedule) == core.encrypt_block(block, key)
+    print("✓ Key schedule cache test passed!")
+
+
+def test_ctr_mode():
+    """Test AES-CTR against NIST SP 800-38A and random-access decryption"""
+    print("\n" + "="*70)
+    print("TEST 8: CTR Mode")
+    print("="*70)
+    
+    aes = AESModes()
+    
+    # NIST SP 800-38A F.5.1 CTR-AES128.Encrypt
+    key = bytes.fromhex('2b7e151628aed2a6abf7158809cf4f3c')
+    nonce = bytes.fromhex('f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff')
+    plaintext = bytes.fromhex(
+        '6bc1bee22e409f96e93d7e117393172a' 'ae2d8a571e03ac9c9eb76fac45af8e51'
+        '30c81c46a35ce411e5fbc1191a0a52ef' 'f69f2445df4f9b17ad2b417be66c3710')
+    expected = bytes.fromhex(
+        '874d6191b620e3261bef6864990db6ce' '9806f66b7970fdff8617187bb9fffdff'
+        '5ae4df3edbd5d35e5b4f09020db03eab' '1e031dda2fbe03d1792170a0f3009cee')
+    
+    ciphertext, _ = aes.encrypt(plaintext, key, mode='CTR', iv=nonce)
+    assert ciphertext == expected, "CTR test vector failed!"
+    assert aes.decrypt(ciphertext, key, mode='CTR', iv=nonce) == plaintext
+    print("✓ NIST CTR test vector passed!")
+    
+    # No padding: ciphertext length equals plaintext length
+    message = b'CTR mode needs no padding and supports random access. ' * 40
+    ciphertext, nonce = aes.encrypt(message, key, mode='CTR')
+    assert len(ciphertext) == len(message), "CTR must not pad!"
+    
+    # Random access: any byte range decrypts on its own
+    for offset, length in [(0, 5), (7, 30), (100, 16), (333, 500), (len(message) - 3, 10)]:
+        part = aes.decrypt_range(ciphertext, key, nonce, offset, length)
+        assert part == message[offset:offset + length], f"Range ({offset}, {length}) failed!"
+    print("✓ Random-access decryption passed!")
+
+
+def test_parallel_cbc():
+    """Test CBC decryption split across a process pool"""
+    print("\n" + "="*70)
+    print("TEST 9: Parallel CBC Decryption")
+    print("="*70)
+    
+    aes = AESModes(engine='ttable')
+    aes.parallel_min_chunk = 256  # Force several chunks on a small message
+    
+    key = b'ParallelTestKey!'
+    plaintext = b'Each chunk carries its preceding ciphertext block. ' * 60
+    ciphertext, iv = aes.encrypt(plaintext, key, mode='CBC')
+    
+    for workers in [1, 2, 4]:
+        decrypted = aes.decrypt(ciphertext, key, mode='CBC', iv=iv, workers=workers)
+        assert decrypted == plaintext, f"Parallel CBC failed with {workers} workers!"
+        print(f"✓ {workers} worker(s) passed!")
+
+
+def test_streaming():
+    """Test streaming Encryptor/Decryptor and chunked file helpers"""
+    print("\n" + "="*70)
+    print("TEST 10: Streaming Encryption")
+    print("="*70)
+    
+    import tempfile
+    
+    cipher = AESModes()
+    key = b'StreamingTestKey'
+    plaintext = b'Streaming keeps memory constant for files of any size. ' * 50
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        plaintext_file = os.path.join(tmp, 'plain.txt')
+        encrypted_file = os.path.join(tmp, 'encrypted.txt')
+        decrypted_file = os.path.join(tmp, 'decrypted.txt')
+        write_binary_file(plaintext_file, plaintext)
+        
+        for mode in ['ECB', 'CBC', 'CTR']:
+            # Incremental API gives the same bytes as one-shot encrypt()
+            encryptor = cipher.encryptor(key, mode)
+            streamed = b''.join(encryptor.update(plaintext[i:i + 100])
+                                for i in range(0, len(plaintext), 100))
+            streamed += encryptor.finalize()
+            expected, _ = cipher.encrypt(plaintext, key, mode=mode, iv=encryptor.iv)
+            assert streamed == expected, f"{mode} streaming mismatch!"
+            
+            # File helpers with a chunk size that does not align to blocks
+            for file_format in ['binary', 'hex']:
+                encrypt_file_stream(cipher, plaintext_file, encrypted_file, key, mode,
+                                    chunk_size=333, file_format=file_format)
+                assert is_container_file(encrypted_file) == (file_format == 'binary')
+                used = decrypt_file_stream(cipher, encrypted_file, decrypted_file, key, chunk_size=333)
+                assert used['format'] == file_format
+                assert read_binary_file(decrypted_file) == plaintext, \
+                    f"{mode} {file_format} file streaming failed!"
+            print(f"✓ {mode} streaming passed!")
+        
+        # Wrong key: padding check fails and no half-written plaintext is left behind
+        encrypt_file_stream(cipher, plaintext_file, encrypted_file, key, 'CBC')
+        os.remove(decrypted_file)
+        try:
+            decrypt_file_stream(cipher, encrypted_file, decrypted_file, b'WrongStreamKey!!')
+            assert False, "Wrong key should fail!"
+        except ValueError:
+            pass
+        assert not os.path.exists(decrypted_file), "Partial output was not removed!"
+        print("✓ Failed stream removes its output!")
+        
+        # Container mode / IV come from the header - a conflicting mode or IV is rejected
+        for wrong in [{'mode': 'ECB'}, {'iv': b'0' * 16}]:
+            try:
+                decrypt_file_stream(cipher, encrypted_file, decrypted_file, key, **wrong)
+                assert False, f"Mismatch {wrong} should fail!"
+            except ValueError as e:
+                print(f"✓ Rejected {list(wrong)[0]} mismatch: {e}")
+        used = decrypt_file_stream(cipher, encrypted_file, decrypted_file, key, mode='cbc')
+        assert used['mode'] == 'CBC' and read_binary_file(decrypted_file) == plaintext
+
+
+def test_metrics():
+    """Test per-stage metrics (disabled by default, exported as dict / Prometheus)"""
+    print("\n" + "="*70)
+    print("TEST 11: Metrics")
+    print("="*70)
+    
+    import tempfile
+    from algorithms.metrics import METRICS
+    
+    cipher = AESModes()
+    key = b'MetricsTestKey!!'
+    plaintext = b'Stage timings show where the time goes. ' * 30
+    
+    # Disabled: nothing is recorded
+    METRICS.reset()
+    cipher.encrypt(plaintext, key, mode='CBC')
+    assert METRICS.snapshot()['stages'] == {}, "Disabled metrics must not record!"
+    
+    METRICS.enable()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'plain.bin')
+            write_binary_file(path, plaintext)
+            ciphertext, iv = cipher.encrypt(read_binary_file(path), key, mode='CBC')
+            bytes_to_hex(ciphertext)
+            assert cipher.decrypt(ciphertext, key, mode='CBC', iv=iv) == plaintext
+        
+        stages = METRICS.snapshot()['stages']
+        print(f"Stages: {sorted(stages)}")
+        for stage in ['key_schedule', 'block_cipher', 'padding', 'hex_encode',
+                      'file_read', 'file_write']:
+            assert stages[stage]['calls'] > 0, f"Stage {stage} not recorded!"
+        assert stages['block_cipher']['bytes'] == 2 * len(ciphertext)
+        assert 'crypto_stage_seconds_total{stage="block_cipher"}' in METRICS.to_prometheus()
+    finally:
+        METRICS.disable()
+        METRICS.reset()
+    print("✓ Metrics test passed!")
+
+
+def test_numpy_single_blocks():
+    """numpy engine must hand single blocks (CBC encryption) to the T-table core"""
+    print("\n" + "="*70)
+    print("TEST 12: NumPy Engine - Single Blocks")
+    print("="*70)
     
-    # Decrypt to verify
-    decrypted = aes.decrypt_block(ciphertext, key)
-    assert decrypted == plaintext, "Decryption verification failed!"
-    print("✓ Decryption verification passed!")
+    from unittest import mock
+    from algorithms.aes import HAS_NUMPY
+    from algorithms.aes.aes_ttable import AESTTableCore
+    
+    if not HAS_NUMPY:
+        print("(numpy not installed - skipping)")
+        return
+    
+    key = b'SingleBlockKey!!'
+    iv = b'SingleBlockIV000'
+    plaintext = os.urandom(32 * 16 - 1)  # 32 blocks after padding
+    
+    aes = AESModes(engine='numpy')
+    with mock.patch.object(AESTTableCore, 'encrypt_block', autospec=True,
+                           side_effect=AESTTableCore.encrypt_block) as encrypt_block:
+        ciphertext = aes.encrypt(plaintext, key, mode='CBC', iv=iv)
+    print(f"T-table encrypt_block calls: {encrypt_block.call_count}")
+    assert encrypt_block.call_count == 32, "CBC encryption did not use the scalar core per block!"
+    assert ciphertext == AESModes(engine='ttable').encrypt(plaintext, key, mode='CBC', iv=iv)
+    
+    block = os.urandom(16)
+    with mock.patch.object(AESTTableCore, 'decrypt_block', autospec=True,
+                           side_effect=AESTTableCore.decrypt_block) as decrypt_block:
+        assert aes.aes_core.decrypt_block(aes.aes_core.encrypt_block(block, key), key) == block
+    assert decrypt_block.call_count == 1, "decrypt_block did not use the scalar core!"
+    print("✓ NumPy single-block test passed!")
 
 
 def run_all_tests():
@@ -240,6 +510,13 @@ def run_all_tests():
         test_aes_long_text()
         test_padding()
         test_standard_vectors()
+        test_key_schedule_cache()
+        test_engines()
+        test_ctr_mode()
+        test_parallel_cbc()
+        test_streaming()
+        test_metrics()
+        test_numpy_single_blocks()
         
         print("\n" + "="*70)
         print(" "*20 + "✓ ALL TESTS PASSED!")
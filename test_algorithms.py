@@ -45,6 +45,13 @@ def test_caesar():
     print(f"MATCH: {'✓' if found_key == key else '✗'}")
     print(f"\nDecrypted: {decrypted[:100]}...")
     
+    # Histogram-rotation scores must equal scoring each decrypted candidate
+    rotated = cipher.shift_frequency_scores(ciphertext)
+    for k in range(26):
+        direct = cipher.calculate_frequency_score(cipher.decrypt_with_key(ciphertext, k))
+        assert abs(rotated[k] - direct) < 1e-9, f"Shift score mismatch for key {k}"
+    print("✓ Shift scores from one histogram match per-key scoring")
+    
     return found_key == key
 
 def test_vigenere():
@@ -97,6 +104,346 @@ def test_vigenere():
     
     return found_key.upper() == key.upper()
 
+def test_mono():
+    """Test Monoalphabetic Substitution Cipher"""
+    print("\n\n" + "="*60)
+    print("TESTING MONOALPHABETIC CIPHER")
+    print("="*60)
+    
+    import random
+    random.seed(2024)  # Reproducible restarts
+    
+    cipher = MonoalphabeticCipher()
+    
+    plaintext = """Substitution ciphers replace every letter of the plaintext with another 
+    letter of the alphabet. The key is a permutation of the twenty six letters, so there are 
+    far too many keys to try them all. Instead the cracker starts from a guess based on letter 
+    frequencies and improves it by swapping pairs of letters while the text looks more like 
+    English. Common bigrams and trigrams such as the, and, ing and ion guide the search.""" * 6
+    
+    # Encrypt with a random key
+    letters = list('abcdefghijklmnopqrstuvwxyz')
+    shuffled = letters[:]
+    random.shuffle(shuffled)
+    enc_key = dict(zip(letters, shuffled))
+    ciphertext = cipher.decrypt(plaintext, enc_key)
+    print(f"Ciphertext preview: {ciphertext[:100]}...")
+    
+    # Incremental swap scores must equal a full re-score of the decrypted text
+    scorer = cipher.swap_scorer(ciphertext)
+    key = cipher.initial_key(ciphertext)
+    scorer.set_key(key)
+    for _ in range(50):
+        a, b = random.sample(range(26), 2)
+        scorer.apply_swap(a, b)
+    full = cipher.score(cipher.decrypt(ciphertext, scorer.key_dict()))
+    assert abs(scorer.score - full) < 1e-9, "Incremental score drifted from full score"
+    print("✓ Incremental score matches full score")
+    
+    # Crack
+    found_key, decrypted, score = cipher.crack(ciphertext, restarts=5)
+    
+    matches = sum(1 for p, d in zip(plaintext, decrypted) if p == d)
+    accuracy = matches / len(plaintext)
+    print(f"\nScore: {score:.4f}")
+    print(f"Character accuracy: {accuracy:.1%}")
+    print(f"Decrypted preview: {decrypted[:100]}...")
+    
+    assert abs(score - cipher.score(decrypted)) < 1e-9, "Returned score does not match plaintext"
+    # Small built-in n-gram tables: most letters, not necessarily all, come out right
+    assert accuracy > 0.75, "Cracked plaintext too far from original"
+    assert ' the ' in decrypted, "Most common trigram not recovered"
+
+    # Parallel restarts: same master seed -> same result, whatever the worker count
+    finished = []
+    serial = cipher.crack(ciphertext, restarts=3, seed=7)
+    parallel = cipher.crack(ciphertext, restarts=3, seed=7, workers=2,
+                            progress=lambda done, total, best, r, s, k: finished.append(r))
+    assert serial == parallel, "Parallel restarts not reproducible"
+    assert sorted(finished) == [0, 1, 2], "Restart scores not streamed back"
+    print("✓ Parallel restarts reproduce the sequential result")
+
+    # Early stop once the target score is reached
+    finished = []
+    cipher.crack(ciphertext, restarts=10, seed=7, target_score=-100.0,
+                 progress=lambda done, total, best, r, s, k: finished.append(r))
+    assert finished == [0], "Did not stop at target score"
+
+    # Simulated annealing: same return signature, same quality
+    found_key, decrypted, score = cipher.crack(ciphertext, restarts=10, seed=7, search='anneal')
+    anneal_accuracy = sum(1 for p, d in zip(plaintext, decrypted) if p == d) / len(plaintext)
+    print(f"Annealing accuracy: {anneal_accuracy:.1%}")
+    assert abs(score - cipher.score(decrypted)) < 1e-9, "Annealing score does not match plaintext"
+    assert anneal_accuracy > 0.75, "Annealing plaintext too far from original"
+    assert cipher.temperature(0.0) == cipher.anneal_start_temp
+    assert abs(cipher.temperature(1.0) - cipher.anneal_end_temp) < 1e-12
+    return accuracy > 0.75
+
+def test_quadgrams():
+    """Test quadgram tables: build, save, memory-map, score"""
+    print("\n\n" + "="*60)
+    print("TESTING QUADGRAM TABLES")
+    print("="*60)
+
+    import pickle
+    import random
+    import tempfile
+    from algorithms.ngram_tables import (build_ngram_table, count_ngrams, load_ngram_table,
+                                         load_quadgrams, save_ngram_table)
+    random.seed(2025)
+
+    corpus = """Frequency analysis works best with statistics gathered from a large body of
+    text. Quadgrams capture far more of the structure of English than bigrams and trigrams:
+    words such as tion, that, ther and with appear again and again. The table has one entry
+    for every possible group of four letters, so it is built once and saved to a binary file
+    that is mapped into memory whenever a cracker needs it.""" * 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_path = os.path.join(tmp, "corpus.txt")
+        counts_path = os.path.join(tmp, "counts.txt")
+        with open(corpus_path, "w", encoding="utf-8") as f:
+            f.write(corpus)
+        with open(counts_path, "w", encoding="utf-8") as f:
+            for ngram, count in count_ngrams(corpus, 4).items():
+                f.write(f"{ngram.upper()} {count}\n")
+
+        # Corpus and counts file give the same table
+        from_corpus = build_ngram_table(corpus_path)
+        from_counts = build_ngram_table(counts_path)
+        assert list(from_corpus.table) == list(from_counts.table), "Corpus/counts tables differ"
+        print(f"✓ Built {len(from_corpus.table)} quadgram entries (floor {from_corpus.floor:.4f})")
+
+        # Saved + memory-mapped table scores exactly like the in-memory one
+        bin_path = os.path.join(tmp, "quadgrams.bin")
+        save_ngram_table(from_corpus, bin_path)
+        mapped = load_ngram_table(bin_path)
+        assert mapped.path is not None, "Table was not memory-mapped"
+        sample = corpus[:200]
+        assert mapped.score(sample) == from_corpus.score(sample), "Mapped table scores differ"
+        assert pickle.loads(pickle.dumps(mapped)).score(sample) == mapped.score(sample)
+        print("✓ Memory-mapped table matches in-memory table")
+
+        # load_quadgrams builds <source>.bin once and maps it
+        quadgrams = load_quadgrams(corpus_path)
+        assert os.path.exists(corpus_path + ".bin"), "Binary cache not written"
+
+        # Mono cracker with quadgram scoring
+        cipher = MonoalphabeticCipher(quadgrams=quadgrams)
+        letters = list('abcdefghijklmnopqrstuvwxyz')
+        shuffled = letters[:]
+        random.shuffle(shuffled)
+        plaintext = corpus[:1200]
+        ciphertext = cipher.decrypt(plaintext, dict(zip(letters, shuffled)))
+
+        scorer = cipher.swap_scorer(ciphertext)
+        scorer.set_key(cipher.initial_key(ciphertext))
+        for _ in range(50):
+            a, b = random.sample(range(26), 2)
+            scorer.apply_swap(a, b)
+        full = cipher.score(cipher.decrypt(ciphertext, scorer.key_dict()))
+        assert abs(scorer.score - full) < 1e-9, "Incremental quadgram score drifted"
+        print("✓ Incremental quadgram score matches full score")
+
+        found_key, decrypted, score = cipher.crack(ciphertext, restarts=10)
+        accuracy = sum(1 for p, d in zip(plaintext, decrypted) if p == d) / len(plaintext)
+        print(f"Character accuracy: {accuracy:.1%}")
+
+        # Release the mapping before the temp directory is removed (Windows)
+        del cipher, scorer, quadgrams, mapped
+
+    assert accuracy > 0.9, "Quadgram crack too far from original"
+    return accuracy > 0.9
+
+def test_batch_cli():
+    """Test the headless batch CLI (python -m cli)"""
+    print("\n\n" + "="*60)
+    print("TESTING BATCH CLI")
+    print("="*60)
+
+    import json
+    import tempfile
+    from cli.__main__ import main as batch_main
+
+    caesar = CaesarCipher()
+    plaintext = "The quick brown fox jumps over the lazy dog and keeps running. " * 20
+    key_hex = '000102030405060708090a0b0c0d0e0f'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = os.path.join(tmp, 'in')
+        os.makedirs(os.path.join(inputs, 'sub'))
+        for name, shift in [('a.txt', 3), (os.path.join('sub', 'b.txt'), 11)]:
+            with open(os.path.join(inputs, name), 'w', encoding='utf-8') as f:
+                f.write(caesar.decrypt_with_key(plaintext, 26 - shift))
+
+        # Crack every file (recursive directory input, 2 workers)
+        out = os.path.join(tmp, 'cracked')
+        code = batch_main(['caesar', inputs, '-r', '-o', out, '-j', '2', '-q'])
+        with open(os.path.join(out, 'summary.json'), encoding='utf-8') as f:
+            summary = json.load(f)
+        keys = {os.path.basename(r['input']): r['result']['key'] for r in summary['files']}
+        print(f"Exit code: {code}, keys: {keys}")
+        if code != 0 or keys != {'a.txt': 3, 'b.txt': 11}:
+            return False
+        if not os.path.exists(os.path.join(out, 'sub', 'b.cracked.txt')):
+            return False
+
+        # Glob matches keep their path below the pattern's fixed prefix
+        from cli.batch import collect_inputs
+        relative = [rel for _, rel in collect_inputs([os.path.join(inputs, '**', '*.txt')])]
+        print(f"Glob relative names: {relative}")
+        if relative != ['a.txt', os.path.join('sub', 'b.txt')]:
+            return False
+
+        # AES round trip on a glob; decrypting with the wrong cipher fails with exit code 1
+        enc = os.path.join(tmp, 'enc')
+        dec = os.path.join(tmp, 'dec')
+        code = batch_main(['aes-encrypt', os.path.join(inputs, '*.txt'), '-o', enc,
+                           '--key', key_hex, '--mode', 'CBC', '-q'])
+        code += batch_main(['aes-decrypt', enc, '-o', dec, '--key', key_hex, '-q'])
+        with open(os.path.join(dec, 'a.txt'), encoding='utf-8') as f:
+            round_trip = f.read() == caesar.decrypt_with_key(plaintext, 23)
+        wrong = batch_main(['des-decrypt', enc, '-o', os.path.join(tmp, 'bad'),
+                            '--key', key_hex[:16], '-q'])
+        print(f"AES round trip: {round_trip}, wrong cipher exit code: {wrong}")
+        return code == 0 and round_trip and wrong == 1
+
+
+def test_cancellation():
+    """Test progress callbacks and cancellation tokens (crackers + streaming)"""
+    print("\n\n" + "="*60)
+    print("TESTING PROGRESS / CANCELLATION")
+    print("="*60)
+
+    import tempfile
+    import time
+    from algorithms.aes import AESModes
+    from algorithms.cancellation import CancellationToken, OperationCancelled
+    from utils.file_handler import encrypt_file_stream
+
+    # Caesar: one progress step per key
+    steps = []
+    CaesarCipher().brute_force("Wkh txlfn eurzq ira mxpsv ryhu wkh odcb grj " * 5,
+                               progress=lambda done, total, best: steps.append(done))
+    print(f"Caesar progress steps: {len(steps)}")
+    if steps != list(range(1, 27)):
+        return False
+
+    # Mono: cancel from the progress callback after the first restart
+    mono = MonoalphabeticCipher()
+    ciphertext = CaesarCipher().decrypt_with_key(
+        "the quick brown fox jumps over the lazy dog " * 40, 7)
+    token = CancellationToken()
+    seen = []
+
+    def on_progress(done, total, best, *restart):
+        seen.append(done)
+        token.cancel()
+
+    start = time.time()
+    try:
+        mono.crack(ciphertext, restarts=50, workers=1, seed=1, progress=on_progress, cancel=token)
+        return False
+    except OperationCancelled:
+        pass
+    print(f"Mono cancelled after {seen} restart(s) in {time.time() - start:.3f}s")
+    if seen != [1]:
+        return False
+
+    # Streaming: an already-cancelled token stops before any block, partial output removed
+    token = CancellationToken()
+    token.cancel()
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'plain.bin')
+        target = os.path.join(tmp, 'plain.enc')
+        with open(source, 'wb') as f:
+            f.write(os.urandom(64 * 1024))
+        try:
+            encrypt_file_stream(AESModes(), source, target, bytes(16), 'CBC', bytes(16),
+                                chunk_size=4096, cancel=token)
+            return False
+        except OperationCancelled:
+            pass
+        print(f"Stream cancelled, output removed: {not os.path.exists(target)}")
+        return not os.path.exists(target)
+
+
+def test_job_scheduler():
+    """Test the GUI job scheduler (no Tk: a stub root stands in for after())"""
+    print("\n\n" + "="*60)
+    print("TESTING JOB SCHEDULER")
+    print("="*60)
+
+    import tempfile
+    import time
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ui'))
+    from job_scheduler import JobScheduler, DONE, CANCELLED
+    from algorithms.caesar.caesar_cipher import crack_from_file as caesar_crack_file
+    from algorithms.monoalphabetic.mono_cipher import crack_from_file as mono_crack_file
+
+    class StubRoot:
+        """Stands in for the Tk root: after() callbacks run from pump() (run inside after() they would recurse through _poll)"""
+
+        def __init__(self):
+            self.pending = []
+
+        def after(self, ms, callback):
+            self.pending.append(callback)
+
+        def pump(self, timeout=60):
+            deadline = time.time() + timeout
+            while self.pending and time.time() < deadline:
+                callback = self.pending.pop(0)
+                time.sleep(0.01)
+                callback()
+            return not self.pending
+
+    root = StubRoot()
+    scheduler = JobScheduler(root, max_workers=2, max_concurrent=1, poll_ms=10)
+    counts = []
+    scheduler.on_change = lambda running, queued: counts.append((running, queued))
+    events = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            # Running job: mono crack, cancelled through its token on the first progress report
+            long_job = scheduler.submit(
+                mono_crack_file, 'test_files/input_mono_cipher.txt',
+                os.path.join(tmp, 'mono.txt'), workers=1, verbose=False,
+                on_done=lambda result: events.append('mono done'),
+                on_cancel=lambda: events.append('mono cancelled'),
+                on_progress=lambda *values: scheduler.cancel(long_job))
+            # Completes once the mono job has stopped
+            done_job = scheduler.submit(
+                caesar_crack_file, 'test_files/input_caesar.txt',
+                os.path.join(tmp, 'caesar.txt'), verbose=False,
+                on_done=lambda result: events.append('caesar done'),
+                on_error=lambda e: events.append(f'caesar error {e}'))
+            # Queued job: dropped before it starts
+            queued_job = scheduler.submit(
+                caesar_crack_file, 'test_files/input_caesar.txt',
+                os.path.join(tmp, 'never.txt'), verbose=False,
+                on_done=lambda result: events.append('queued done'),
+                on_cancel=lambda: events.append('queued cancelled'))
+            print(f"Running / queued after submit: {scheduler.running} / {scheduler.queued}")
+            scheduler.cancel(queued_job)
+
+            if not root.pump():
+                print("Scheduler did not finish in time")
+                return False
+        finally:
+            scheduler.shutdown()
+
+        print(f"Events: {events}")
+        print(f"Counts (running, queued): {counts}")
+        print(f"States: {long_job.state}, {done_job.state}, {queued_job.state}")
+        return (events == ['queued cancelled', 'mono cancelled', 'caesar done']
+                and long_job.state == CANCELLED and done_job.state == DONE
+                and queued_job.state == CANCELLED
+                and os.path.exists(os.path.join(tmp, 'caesar.txt'))
+                and not os.path.exists(os.path.join(tmp, 'never.txt'))
+                and all(running <= scheduler.max_concurrent for running, queued in counts))
+
+
 def create_test_files():
     """Tạo file test mẫu"""
     print("\n\n" + "="*60)
@@ -176,6 +523,41 @@ def main():
     except Exception as e:
         print(f"\n✗ Vigenère Cipher Test Failed: {e}")
     
+    # Test Monoalphabetic
+    try:
+        mono_result = test_mono()
+        print(f"\n{'✓' if mono_result else '✗'} Monoalphabetic Cipher Test")
+    except Exception as e:
+        print(f"\n✗ Monoalphabetic Cipher Test Failed: {e}")
+
+    # Test quadgram tables
+    try:
+        quadgram_result = test_quadgrams()
+        print(f"\n{'✓' if quadgram_result else '✗'} Quadgram Tables Test")
+    except Exception as e:
+        print(f"\n✗ Quadgram Tables Test Failed: {e}")
+
+    # Test batch CLI
+    try:
+        batch_result = test_batch_cli()
+        print(f"\n{'✓' if batch_result else '✗'} Batch CLI Test")
+    except Exception as e:
+        print(f"\n✗ Batch CLI Test Failed: {e}")
+
+    # Test progress / cancellation
+    try:
+        cancel_result = test_cancellation()
+        print(f"\n{'✓' if cancel_result else '✗'} Progress / Cancellation Test")
+    except Exception as e:
+        print(f"\n✗ Progress / Cancellation Test Failed: {e}")
+
+    # Test job scheduler
+    try:
+        scheduler_result = test_job_scheduler()
+        print(f"\n{'✓' if scheduler_result else '✗'} Job Scheduler Test")
+    except Exception as e:
+        print(f"\n✗ Job Scheduler Test Failed: {e}")
+
     # Create test files
     create_test_files()
     
@@ -57,8 +57,9 @@ def test_des_with_files():
     os.makedirs('test_files', exist_ok=True)
     
     plaintext_file = 'test_files/des_plaintext.txt'
-    encrypted_ecb_file = 'test_files/des_encrypted_ecb.txt'
-    encrypted_cbc_file = 'test_files/des_encrypted_cbc.txt'
+    encrypted_ecb_file = 'test_files/des_encrypted_ecb.enc'
+    encrypted_cbc_file = 'test_files/des_encrypted_cbc.enc'
+    legacy_cbc_file = 'test_files/des_encrypted_cbc.txt'
     decrypted_ecb_file = 'test_files/des_decrypted_ecb.txt'
     decrypted_cbc_file = 'test_files/des_decrypted_cbc.txt'
     
@@ -82,13 +83,14 @@ This test will verify that our implementation works correctly for both ECB and C
     plaintext_bytes = test_text.encode('utf-8')
     ciphertext_ecb, _ = des.encrypt(plaintext_bytes, key, mode='ECB')
     
-    save_encrypted_output(encrypted_ecb_file, bytes_to_hex(ciphertext_ecb), 
-                         mode='ECB')
+    save_encrypted_container(encrypted_ecb_file, ciphertext_ecb, 'DES', mode='ECB',
+                             original_length=len(plaintext_bytes))
     print(f"✓ Encrypted and saved to: {encrypted_ecb_file}")
     
     # Decrypt ECB
-    data_ecb = parse_encrypted_input(encrypted_ecb_file)
-    ciphertext_ecb = hex_to_bytes(data_ecb['ciphertext'])
+    data_ecb = load_encrypted_file(encrypted_ecb_file)
+    assert data_ecb['format'] == 'binary' and data_ecb['algorithm'] == 'DES'
+    ciphertext_ecb = data_ecb['ciphertext']
     decrypted_ecb = des.decrypt(ciphertext_ecb, key, mode='ECB')
     
     write_text_file(decrypted_ecb_file, decrypted_ecb.decode('utf-8'))
@@ -104,15 +106,16 @@ This test will verify that our implementation works correctly for both ECB and C
     print("\n--- Testing CBC Mode ---")
     ciphertext_cbc, iv = des.encrypt(plaintext_bytes, key, mode='CBC')
     
-    save_encrypted_output(encrypted_cbc_file, bytes_to_hex(ciphertext_cbc), 
-                         bytes_to_hex(iv), mode='CBC')
+    save_encrypted_container(encrypted_cbc_file, ciphertext_cbc, 'DES', mode='CBC',
+                             iv=iv, original_length=len(plaintext_bytes))
     print(f"✓ Encrypted and saved to: {encrypted_cbc_file}")
     print(f"  IV: {bytes_to_hex(iv)}")
     
     # Decrypt CBC
-    data_cbc = parse_encrypted_input(encrypted_cbc_file)
-    ciphertext_cbc = hex_to_bytes(data_cbc['ciphertext'])
-    iv_cbc = hex_to_bytes(data_cbc['iv'])
+    data_cbc = load_encrypted_file(encrypted_cbc_file)
+    assert data_cbc['mode'] == 'CBC' and data_cbc['original_length'] == len(plaintext_bytes)
+    ciphertext_cbc = data_cbc['ciphertext']
+    iv_cbc = data_cbc['iv']
     decrypted_cbc = des.decrypt(ciphertext_cbc, key, mode='CBC', iv=iv_cbc)
     
     write_text_file(decrypted_cbc_file, decrypted_cbc.decode('utf-8'))
@@ -122,6 +125,19 @@ This test will verify that our implementation works correctly for both ECB and C
     decrypted_text = read_text_file(decrypted_cbc_file)
     assert original == decrypted_text, "CBC file test failed!"
     print("✓ CBC File Test Passed!")
+    
+    # Legacy hex text files are still readable (auto-detected)
+    print("\n--- Testing Legacy Hex Format ---")
+    save_encrypted_output(legacy_cbc_file, bytes_to_hex(ciphertext_cbc),
+                         bytes_to_hex(iv), mode='CBC')
+    data_legacy = load_encrypted_file(legacy_cbc_file)
+    assert data_legacy['format'] == 'hex', "Legacy format not detected!"
+    assert data_legacy['ciphertext'] == ciphertext_cbc and data_legacy['iv'] == iv
+    
+    # Binary container is about half the size of the hex text
+    assert os.path.getsize(encrypted_cbc_file) < os.path.getsize(legacy_cbc_file) * 0.6
+    print(f"✓ Legacy Format Test Passed! ({os.path.getsize(legacy_cbc_file)} bytes hex "
+          f"vs {os.path.getsize(encrypted_cbc_file)} bytes binary)")
 
 
 def test_des_long_text():
@@ -190,6 +206,215 @@ def test_padding():
     print("\n✓ All padding tests passed!")
 
 
+def test_parallel_cbc():
+    """Test giải mã CBC song song trên process pool"""
+    print("\n" + "="*60)
+    print("TEST 5: Parallel CBC Decryption")
+    print("="*60)
+    
+    des = DESModes()
+    des.parallel_min_chunk = 64  # Ép chia nhiều chunk với message ngắn
+    
+    key = b'Paralle1'
+    plaintext = b'Each chunk carries its preceding ciphertext block. ' * 10
+    ciphertext, iv = des.encrypt(plaintext, key, mode='CBC')
+    
+    for workers in [1, 2, 4]:
+        decrypted = des.decrypt(ciphertext, key, mode='CBC', iv=iv, workers=workers)
+        assert decrypted == plaintext, f"Parallel CBC failed with {workers} workers!"
+        print(f"✓ {workers} worker(s) passed!")
+
+
+def test_streaming():
+    """Test streaming Encryptor/Decryptor and chunked file helpers"""
+    print("\n" + "="*60)
+    print("TEST 6: Streaming Encryption")
+    print("="*60)
+    
+    import tempfile
+    
+    cipher = DESModes()
+    key = b'Stream01'
+    plaintext = b'Streaming keeps memory constant for files of any size. ' * 50
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        plaintext_file = os.path.join(tmp, 'plain.txt')
+        encrypted_file = os.path.join(tmp, 'encrypted.txt')
+        decrypted_file = os.path.join(tmp, 'decrypted.txt')
+        write_binary_file(plaintext_file, plaintext)
+        
+        for mode in ['ECB', 'CBC']:
+            # Incremental API gives the same bytes as one-shot encrypt()
+            encryptor = cipher.encryptor(key, mode)
+            streamed = b''.join(encryptor.update(plaintext[i:i + 100])
+                                for i in range(0, len(plaintext), 100))
+            streamed += encryptor.finalize()
+            expected, _ = cipher.encrypt(plaintext, key, mode=mode, iv=encryptor.iv)
+            assert streamed == expected, f"{mode} streaming mismatch!"
+            
+            # File helpers with a chunk size that does not align to blocks
+            for file_format in ['binary', 'hex']:
+                encrypt_file_stream(cipher, plaintext_file, encrypted_file, key, mode,
+                                    chunk_size=333, file_format=file_format)
+                assert is_container_file(encrypted_file) == (file_format == 'binary')
+                used = decrypt_file_stream(cipher, encrypted_file, decrypted_file, key, chunk_size=333)
+                assert used['format'] == file_format
+                assert read_binary_file(decrypted_file) == plaintext, \
+                    f"{mode} {file_format} file streaming failed!"
+            print(f"✓ {mode} streaming passed!")
+
+
+def test_standard_vectors():
+    """Test với các test vector chuẩn của DES"""
+    print("\n" + "="*60)
+    print("TEST 7: Standard Test Vectors")
+    print("="*60)
+    
+    from algorithms.des import DESCore
+    
+    des = DESCore()
+    
+    # (key, plaintext, ciphertext)
+    vectors = [
+        ('133457799BBCDFF1', '0123456789ABCDEF', '85E813540F0AB405'),
+        ('0E329232EA6D0D73', '8787878787878787', '0000000000000000'),
+        ('0000000000000000', '0000000000000000', '8CA64DE9C1B123A7'),
+        ('FFFFFFFFFFFFFFFF', 'FFFFFFFFFFFFFFFF', '7359B2163E4EDC58'),
+    ]
+    
+    for key_hex, plain_hex, cipher_hex in vectors:
+        key = bytes.fromhex(key_hex)
+        plaintext = bytes.fromhex(plain_hex)
+        expected = bytes.fromhex(cipher_hex)
+        
+        ciphertext = des.encrypt_block(plaintext, key)
+        assert ciphertext == expected, f"Test vector failed for key {key_hex}!"
+        assert des.decrypt_block(ciphertext, key) == plaintext, f"Decryption failed for key {key_hex}!"
+        print(f"✓ Key {key_hex}: {plain_hex} -> {cipher_hex}")
+    
+    # Block / key sai độ dài phải bị từ chối
+    key = bytes.fromhex('133457799BBCDFF1')
+    for call in (lambda: des.encrypt_block(b'abc', key),
+                 lambda: des.decrypt_block(bytes(10), key),
+                 lambda: des.encrypt_block(bytes(8), bytes(4)),
+                 lambda: des.prepare(bytes(10))):
+        try:
+            call()
+            assert False, "Invalid block / key length was accepted!"
+        except ValueError:
+            pass
+    print("✓ Invalid block / key lengths rejected")
+
+
+def test_key_schedule_cache():
+    """Test key schedule được tạo 1 lần cho mỗi key, không phải mỗi block"""
+    print("\n" + "="*60)
+    print("TEST 8: Key Schedule Cache")
+    print("="*60)
+    
+    from algorithms.des import DESCore
+    
+    des = DESModes(key_cache_size=2)
+    key = b'CacheKey'
+    plaintext = b'Subkeys should be generated once per key. ' * 20
+    
+    ciphertext, iv = des.encrypt(plaintext, key, mode='CBC')
+    stats = des.key_cache.stats()
+    print(f"After encrypt: {stats}")
+    assert stats['misses'] == 1, "Key should be scheduled exactly once"
+    
+    decrypted = des.decrypt(ciphertext, key, mode='CBC', iv=iv)
+    assert decrypted == plaintext, "Decryption with cached key failed!"
+    
+    stats = des.key_cache.stats()
+    print(f"After decrypt: {stats}")
+    assert stats['misses'] == 1 and stats['hits'] == 1, "Second message should hit the cache"
+    
+    # Cache is bounded
+    for other_key in [b'OtherK01', b'OtherK02', b'OtherK03']:
+        des.encrypt(plaintext, other_key, mode='ECB')
+    assert len(des.key_cache) == 2, "Cache should not grow past maxsize"
+    
+    # Prepared keys: 16 subkeys, same result as raw keys, immutable
+    core = DESCore()
+    schedule = core.prepare(key)
+    assert len(schedule.subkeys) == 16
+    assert schedule.decrypt_round_keys[:8] == schedule.subkeys[15]
+    block = plaintext[:8]
+    assert core.encrypt_block(block, schedule) == core.encrypt_block(block, key)
+    try:
+        schedule.key = b'Changed!'
+        assert False, "DESKeySchedule should be immutable"
+    except AttributeError:
+        pass
+    print("✓ Key schedule cache test passed!")
+
+
+def test_triple_des():
+    """Test 3DES (EDE2/EDE3) trên cùng DES engine"""
+    print("\n" + "="*60)
+    print("TEST 9: Triple DES")
+    print("="*60)
+    
+    import tempfile
+    from algorithms.des import DESCore, TripleDESModes
+    
+    tdes = TripleDESModes()
+    core = DESCore()
+    
+    # NIST SP 800-67 Appendix B (ECB, 3 keys)
+    key3 = bytes.fromhex('0123456789ABCDEF23456789ABCDEF01456789ABCDEF0123')
+    plaintext = b'The qufck brown fox jump'
+    expected = bytes.fromhex('A826FD8CE53B855FCCE21C8112256FE668D5C05DD9B6B900')
+    assert tdes.des_core.encrypt_blocks(plaintext, key3) == expected, "3DES test vector failed!"
+    print("✓ SP 800-67 test vector passed!")
+    
+    # EDE2: K3 = K1, khớp với ghép 3 lần single DES
+    key2 = key3[:16]
+    block = b'EDE2Test'
+    k1, k2 = key2[:8], key2[8:]
+    composed = core.encrypt_block(core.decrypt_block(core.encrypt_block(block, k1), k2), k1)
+    assert tdes.des_core.encrypt_block(block, key2) == composed, "EDE2 mismatch!"
+    print("✓ EDE2 matches E(K1, D(K2, E(K1, P)))")
+    
+    # Cùng interface encrypt/decrypt với DESModes
+    message = b'Partner feeds still speak Triple DES. ' * 10
+    for key in [key2, key3]:
+        for mode in ['ECB', 'CBC']:
+            ciphertext, iv = tdes.encrypt(message, key, mode=mode)
+            assert tdes.decrypt(ciphertext, key, mode=mode, iv=iv) == message, \
+                f"3DES {mode} with {len(key)}-byte key failed!"
+            print(f"✓ {mode} with {len(key)}-byte key passed!")
+    
+    # 3 key schedule được chuẩn bị 1 lần cho mỗi key
+    assert tdes.key_cache.stats()['misses'] == 2, "Each key should be scheduled once"
+    
+    # Parallel CBC + binary container
+    tdes.parallel_min_chunk = 64
+    ciphertext, iv = tdes.encrypt(message, key3, mode='CBC')
+    assert tdes.decrypt(ciphertext, key3, mode='CBC', iv=iv, workers=2) == message
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        plaintext_file = os.path.join(tmp, 'plain.txt')
+        encrypted_file = os.path.join(tmp, 'encrypted.enc')
+        decrypted_file = os.path.join(tmp, 'decrypted.txt')
+        write_binary_file(plaintext_file, message)
+        
+        encrypt_file_stream(tdes, plaintext_file, encrypted_file, key3, 'CBC', chunk_size=100)
+        assert load_encrypted_file(encrypted_file)['algorithm'] == '3DES'
+        decrypt_file_stream(tdes, encrypted_file, decrypted_file, key3, chunk_size=100)
+        assert read_binary_file(decrypted_file) == message, "3DES file streaming failed!"
+    print("✓ Parallel CBC and file streaming passed!")
+    
+    # Key không hợp lệ
+    for bad_key in [b'8bytes!!', b'x' * 20, b'SameHalfSameHalf']:
+        try:
+            tdes.encrypt(message, bad_key)
+            assert False, f"Key {bad_key!r} should be rejected"
+        except ValueError as e:
+            print(f"✓ Rejected {len(bad_key)}-byte key: {e}")
+
+
 def run_all_tests():
     """Run tất cả các tests"""
     print("\n" + "="*70)
@@ -201,6 +426,11 @@ def run_all_tests():
         test_des_with_files()
         test_des_long_text()
         test_padding()
+        test_parallel_cbc()
+        test_streaming()
+        test_standard_vectors()
+        test_key_schedule_cache()
+        test_triple_des()
         
         print("\n" + "="*70)
         print(" "*20 + "✓ ALL TESTS PASSED!")
@@ -0,0 +1,258 @@
+"""
+Job Scheduler
+Runs the GUI's CPU-bound jobs (crackers, DES/AES file streams) in a persistent
+process pool so they never compete with the Tk main loop for the GIL
+
+- Jobs are queued; at most max_concurrent run at once (the rest wait in order)
+- Progress and results are marshalled back to the Tk thread with after()
+- Every job gets a cancellation token; queued jobs are dropped, running ones
+  stop at their next checkpoint (see algorithms.cancellation)
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from algorithms.aes import AESModes
+from algorithms.cancellation import CancellationToken, OperationCancelled
+from algorithms.des import DESModes
+from utils.file_handler import (encrypt_file_stream, decrypt_file_stream,
+                                read_text_preview, read_ciphertext_preview)
+
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+# Worker processes post at most one progress update per interval (seconds)
+PROGRESS_INTERVAL = 0.05
+
+
+class Job:
+    """One submitted job - callbacks run on the Tk thread"""
+
+    def __init__(self, job_id, func, args, kwargs, on_done, on_error, on_cancel, on_progress):
+        self.id = job_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.on_progress = on_progress
+        self.state = QUEUED
+        self.token = None
+        self.future = None
+
+
+class _ProgressReporter:
+    """progress(done, total, *extra) inside a worker: throttled, sent over the manager queue"""
+
+    def __init__(self, job_id, progress_queue):
+        self.job_id = job_id
+        self.queue = progress_queue
+        self.last = 0.0
+
+    def __call__(self, done, total, *extra):
+        now = time.monotonic()
+        if done < total and now - self.last < PROGRESS_INTERVAL:
+            return
+        self.last = now
+        self.queue.put((self.job_id, (done, total) + extra))
+
+
+def _run_job(job_id, func, args, kwargs, progress_queue, cancel):
+    """Pool worker: func(*args, **kwargs, progress=..., cancel=...)"""
+    progress = _ProgressReporter(job_id, progress_queue) if progress_queue is not None else None
+    return func(*args, progress=progress, cancel=cancel, **kwargs)
+
+
+class JobScheduler:
+    """
+    Persistent process pool + job queue for a Tk root
+    root: widget with after() (the CryptoApp)
+    max_workers: pool processes (None = CPU count)
+    max_concurrent: jobs running at once (None = max_workers)
+    poll_ms: how often the Tk thread collects progress / results while jobs are active
+    The pool and its manager (cancellation events, progress queue) start on first submit
+    """
+
+    def __init__(self, root, max_workers=None, max_concurrent=None, poll_ms=50):
+        self.root = root
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrent = max_concurrent or self.max_workers
+        self.poll_ms = poll_ms
+        # 'spawn': never fork a process that is running Tk and executor threads
+        self._context = multiprocessing.get_context('spawn')
+        self._pool = None
+        self._manager = None
+        self._progress_queue = None
+        self._queued = deque()
+        self._running = {}
+        self._next_id = 0
+        self._polling = False
+        self._closed = False
+        # Callback(running, queued), called whenever the counts change
+        self.on_change = None
+
+    # ==================== PUBLIC API ====================
+
+    def submit(self, func, *args, on_done=None, on_error=None, on_cancel=None,
+               on_progress=None, **kwargs):
+        """
+        Queue func(*args, **kwargs) - func must be a picklable module-level function
+        accepting progress= and cancel= keyword arguments
+        on_done(result) / on_error(exception) / on_cancel() / on_progress(done, total, *extra)
+        Returns: Job (pass to cancel())
+        """
+        if self._closed:
+            raise RuntimeError("JobScheduler is shut down")
+        self._next_id += 1
+        job = Job(self._next_id, func, args, kwargs, on_done, on_error, on_cancel, on_progress)
+        self._queued.append(job)
+        self._start_queued()
+        self._changed()
+        return job
+
+    def cancel(self, job):
+        """Drop a queued job or signal a running one (its on_cancel runs when it stops)"""
+        if job.state == QUEUED:
+            self._queued.remove(job)
+            self._finish(job, CANCELLED)
+            self._changed()
+        elif job.state == RUNNING:
+            job.token.cancel()
+
+    @property
+    def running(self):
+        return len(self._running)
+
+    @property
+    def queued(self):
+        return len(self._queued)
+
+    def shutdown(self):
+        """Cancel everything and stop the pool without blocking the Tk thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queued.clear()
+        for job in self._running.values():
+            job.token.cancel()
+        self._running.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    # ==================== INTERNALS ====================
+
+    def _ensure_pool(self):
+        if self._manager is None:
+            self._manager = self._context.Manager()
+            self._progress_queue = self._manager.Queue()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=self._context)
+
+    def _start_queued(self):
+        while self._queued and len(self._running) < self.max_concurrent:
+            self._ensure_pool()
+            job = self._queued.popleft()
+            # Manager event: the token can be pickled to an already running pool
+            job.token = CancellationToken(self._manager.Event())
+            progress_queue = self._progress_queue if job.on_progress is not None else None
+            job.future = self._pool.submit(_run_job, job.id, job.func, job.args, job.kwargs,
+                                           progress_queue, job.token)
+            job.state = RUNNING
+            self._running[job.id] = job
+
+        if self._running and not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Tk thread: deliver progress, then results, then start queued jobs"""
+        self._polling = False
+        if self._closed:
+            return
+
+        # Progress first - a finished job's last update is already in the queue
+        while True:
+            try:
+                job_id, values = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            job = self._running.get(job_id)
+            if job is not None and not job.token.cancelled:
+                job.on_progress(*values)
+
+        finished = [job for job in self._running.values() if job.future.done()]
+        for job in finished:
+            del self._running[job.id]
+            try:
+                result = job.future.result()
+            except OperationCancelled:
+                self._finish(job, CANCELLED)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed) - the next job gets a fresh pool
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+                self._finish(job, FAILED, e)
+            except Exception as e:
+                self._finish(job, FAILED, e)
+            else:
+                self._finish(job, DONE, result)
+
+        self._start_queued()
+        if finished:
+            self._changed()
+
+    def _finish(self, job, state, value=None):
+        job.state = state
+        if state == DONE and job.on_done is not None:
+            job.on_done(value)
+        elif state == FAILED and job.on_error is not None:
+            job.on_error(value)
+        elif state == CANCELLED and job.on_cancel is not None:
+            job.on_cancel()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change(self.running, self.queued)
+
+
+# ==================== JOB FUNCTIONS ====================
+# Run inside pool workers - arguments and results must be picklable
+
+# AES: vectorized numpy engine, T-table for single blocks / without numpy (as the batch CLI)
+BLOCK_CIPHERS = {'DES': DESModes, 'AES': partial(AESModes, engine='numpy')}
+
+
+def block_cipher_job(algorithm, action, input_file, output_file, key, mode, iv,
+                     chunk_size, progress=None, cancel=None):
+    """
+    Stream-encrypt / decrypt one file with a cipher built in the worker
+    (cipher objects hold locks and are not picklable)
+    Returns: dict with 'mode', 'iv', 'format' and 'preview' (ciphertext hex / plaintext text)
+    """
+    cipher = BLOCK_CIPHERS[algorithm]()
+    if action == 'encrypt':
+        iv_used = encrypt_file_stream(cipher, input_file, output_file, key, mode, iv,
+                                      chunk_size=chunk_size, progress=progress, cancel=cancel)
+        return {'mode': mode, 'iv': iv_used, 'format': 'binary',
+                'preview': read_ciphertext_preview(output_file, 200)}
+
+    used = decrypt_file_stream(cipher, input_file, output_file, key, mode, iv,
+                               chunk_size=chunk_size, progress=progress, cancel=cancel)
+    used['preview'] = read_text_preview(output_file, 500)
+    return used
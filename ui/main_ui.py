@@ -2,7 +2,6 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
 import sys
-import threading
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,16 +10,21 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from algorithms.caesar.caesar_cipher import crack_from_file as crack_caesar_file
 from algorithms.monoalphabetic.mono_cipher import crack_from_file as crack_mono_file
 from algorithms.vigenere.vigenere_cipher import crack_from_file as crack_vigenere_file
-from algorithms.des import DESModes
-from algorithms.aes import AESModes  
 from explanation_viewer import ExplanationViewer
+from job_scheduler import JobScheduler, block_cipher_job, QUEUED
 from utils.file_handler import (
-    read_text_file, write_text_file,
     hex_to_bytes, bytes_to_hex,
-    read_des_key_from_hex, read_des_iv_from_hex,
-    save_encrypted_output, parse_encrypted_input
+    read_des_key_from_hex, read_des_iv_from_hex
 )
 
+# File dialog filters
+TEXT_FILETYPES = [("Text files", "*.txt"), ("All files", "*.*")]
+# DES/AES: binary container (.enc) first, plaintext and legacy hex (.txt) still selectable
+CIPHER_FILETYPES = [("Encrypted files", "*.enc"), ("Text files", "*.txt"), ("All files", "*.*")]
+
+# Streaming chunk for the GUI: small enough that Cancel stops DES/AES within milliseconds
+UI_STREAM_CHUNK_SIZE = 8 * 1024
+
 
 class CryptoApp(ctk.CTk):
     def __init__(self):
@@ -34,9 +38,17 @@ class CryptoApp(ctk.CTk):
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
         
-        # Khởi tạo DES & AES
-        self.des = DESModes()
-        # self.aes = AESModes() # Có thể khởi tạo ở đây hoặc trong hàm xử lý tùy ý
+        # Crack / DES / AES chạy trong process pool (Tk main loop không bị chặn bởi GIL)
+        # Mỗi tab 1 job tại 1 thời điểm, các tab chạy song song
+        self.scheduler = JobScheduler(self)
+        self.scheduler.on_change = self.update_jobs_status
+        # Job đang chạy / chờ của mỗi tab (prefix -> Job)
+        self._jobs = {}
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Thanh trạng thái: số job đang chạy / đang chờ
+        self.jobs_status_label = ctk.CTkLabel(self, text="", anchor="w")
+        self.jobs_status_label.pack(side="bottom", fill="x", padx=25, pady=(0, 5))
         
         # Tạo tabview
         self.tabview = ctk.CTkTabview(self, width=950, height=650)
@@ -90,6 +102,8 @@ class CryptoApp(ctk.CTk):
         self.caesar_result_text = ctk.CTkTextbox(main_frame, width=850, height=300)
         self.caesar_result_text.pack(padx=20, pady=5)
         
+        self.add_progress_controls(main_frame, "caesar")
+        
         btn_frame = ctk.CTkFrame(main_frame)
         btn_frame.pack(pady=20)
         
@@ -144,6 +158,8 @@ class CryptoApp(ctk.CTk):
         self.mono_result_text = ctk.CTkTextbox(main_frame, width=850, height=300)
         self.mono_result_text.pack(padx=20, pady=5)
         
+        self.add_progress_controls(main_frame, "mono")
+        
         btn_frame = ctk.CTkFrame(main_frame)
         btn_frame.pack(pady=20)
         
@@ -198,6 +214,8 @@ class CryptoApp(ctk.CTk):
         self.vigenere_result_text = ctk.CTkTextbox(main_frame, width=850, height=300)
         self.vigenere_result_text.pack(padx=20, pady=5)
         
+        self.add_progress_controls(main_frame, "vigenere")
+        
         btn_frame = ctk.CTkFrame(main_frame)
         btn_frame.pack(pady=20)
         
@@ -285,7 +303,7 @@ class CryptoApp(ctk.CTk):
         self.des_input_entry = ctk.CTkEntry(controls_frame, width=350)
         self.des_input_entry.grid(row=4, column=1, padx=10, pady=10)
         ctk.CTkButton(controls_frame, text="Browse", width=150,
-                     command=lambda: self.browse_file(self.des_input_entry)).grid(
+                     command=lambda: self.browse_file(self.des_input_entry, CIPHER_FILETYPES)).grid(
                          row=4, column=2, padx=10, pady=10)
         
         # Output file row
@@ -295,7 +313,7 @@ class CryptoApp(ctk.CTk):
         self.des_output_entry = ctk.CTkEntry(controls_frame, width=350)
         self.des_output_entry.grid(row=5, column=1, padx=10, pady=10)
         ctk.CTkButton(controls_frame, text="Browse", width=150,
-                     command=lambda: self.save_file(self.des_output_entry)).grid(
+                     command=lambda: self.save_file(self.des_output_entry, CIPHER_FILETYPES)).grid(
                          row=5, column=2, padx=10, pady=10)
         
         # Result area
@@ -307,6 +325,8 @@ class CryptoApp(ctk.CTk):
         self.des_result_text.pack(padx=20, pady=5)
         
         # Buttons
+        self.add_progress_controls(main_frame, "des")
+        
         btn_frame = ctk.CTkFrame(main_frame)
         btn_frame.pack(pady=15)
         
@@ -352,6 +372,8 @@ class CryptoApp(ctk.CTk):
                           value="ECB", command=self.on_aes_mode_change).pack(side="left", padx=10)
         ctk.CTkRadioButton(mode_frame, text="CBC", variable=self.aes_mode_var, 
                           value="CBC", command=self.on_aes_mode_change).pack(side="left", padx=10)
+        ctk.CTkRadioButton(mode_frame, text="CTR", variable=self.aes_mode_var, 
+                          value="CTR", command=self.on_aes_mode_change).pack(side="left", padx=10)
         
         # Action selection row
         ctk.CTkLabel(controls_frame, text="Action:", 
@@ -380,7 +402,7 @@ class CryptoApp(ctk.CTk):
                     font=ctk.CTkFont(size=14), width=140, anchor="w").grid(
                         row=3, column=0, padx=10, pady=10, sticky="w")
         self.aes_iv_entry = ctk.CTkEntry(controls_frame, width=350, 
-                                        placeholder_text="Required for CBC mode")
+                                        placeholder_text="Required for CBC mode (nonce for CTR)")
         self.aes_iv_entry.grid(row=3, column=1, padx=10, pady=10)
         self.aes_iv_btn = ctk.CTkButton(controls_frame, text="Generate Random", width=150,
                      command=self.generate_aes_iv, state="disabled")
@@ -393,7 +415,7 @@ class CryptoApp(ctk.CTk):
         self.aes_input_entry = ctk.CTkEntry(controls_frame, width=350)
         self.aes_input_entry.grid(row=4, column=1, padx=10, pady=10)
         ctk.CTkButton(controls_frame, text="Browse", width=150,
-                     command=lambda: self.browse_file(self.aes_input_entry)).grid(
+                     command=lambda: self.browse_file(self.aes_input_entry, CIPHER_FILETYPES)).grid(
                          row=4, column=2, padx=10, pady=10)
         
         # Output file row
@@ -403,7 +425,7 @@ class CryptoApp(ctk.CTk):
         self.aes_output_entry = ctk.CTkEntry(controls_frame, width=350)
         self.aes_output_entry.grid(row=5, column=1, padx=10, pady=10)
         ctk.CTkButton(controls_frame, text="Browse", width=150,
-                     command=lambda: self.save_file(self.aes_output_entry)).grid(
+                     command=lambda: self.save_file(self.aes_output_entry, CIPHER_FILETYPES)).grid(
                          row=5, column=2, padx=10, pady=10)
         
         # Result area
@@ -415,6 +437,8 @@ class CryptoApp(ctk.CTk):
         self.aes_result_text.pack(padx=20, pady=5)
         
         # Buttons
+        self.add_progress_controls(main_frame, "aes")
+        
         btn_frame = ctk.CTkFrame(main_frame)
         btn_frame.pack(pady=15)
         
@@ -514,108 +538,42 @@ class CryptoApp(ctk.CTk):
         self.des_execute_btn.configure(state="disabled", text="⏳ Processing...")
         self.des_result_text.delete("1.0", "end")
         self.des_result_text.insert("1.0", f"Executing DES {action}...\n")
-        
-        def run_des():
-            try:
-                if action == 'encrypt':
-                    self.des_encrypt_file(input_file, output_file, key, mode, iv)
-                else:
-                    self.des_decrypt_file(input_file, output_file, key, mode, iv)
-                
-                self.after(0, lambda: self.des_execute_btn.configure(
-                    state="normal", text="🔐 Execute DES"))
-            except Exception as e:
-                self.after(0, lambda: messagebox.showerror("Error", f"Execution failed:\n{str(e)}"))
-                self.after(0, lambda: self.des_execute_btn.configure(
-                    state="normal", text="🔐 Execute DES"))
-        
-        # Run in separate thread
-        thread = threading.Thread(target=run_des)
-        thread.daemon = True
-        thread.start()
-    
-    def des_encrypt_file(self, input_file, output_file, key, mode, iv):
-        """DES Encryption"""
-        try:
-            # Read plaintext
-            plaintext = read_text_file(input_file).encode('utf-8')
-            
-            # Encrypt
-            ciphertext, iv_used = self.des.encrypt(plaintext, key, mode=mode, iv=iv)
-            
-            # Convert to hex
-            ciphertext_hex = bytes_to_hex(ciphertext)
-            iv_hex = bytes_to_hex(iv_used) if iv_used else None
-            
-            # Save output
-            save_encrypted_output(output_file, ciphertext_hex, iv_hex, mode)
-            
-            # Display result
-            result = f"✓ Encryption Successful!\n\n"
-            result += f"Mode: {mode}\n"
-            result += f"Key: {bytes_to_hex(key).upper()}\n"
-            if iv_hex:
-                result += f"IV: {iv_hex.upper()}\n"
-            result += f"Input: {input_file}\n"
-            result += f"Output: {output_file}\n\n"
-            result += f"Ciphertext preview (first 200 hex chars):\n{ciphertext_hex.upper()[:200]}..."
-            
-            self.after(0, lambda: self.des_result_text.delete("1.0", "end"))
-            self.after(0, lambda: self.des_result_text.insert("1.0", result))
-            
-            self.after(0, lambda: messagebox.showinfo("Success", 
-                f"File encrypted successfully!\n\nOutput saved to:\n{output_file}"))
-            
-        except Exception as e:
-            raise Exception(f"Encryption failed: {str(e)}")
+        self.run_job("des", self.des_execute_btn, "🔐 Execute DES",
+                     block_cipher_job, "DES", action, input_file, output_file, key, mode, iv,
+                     UI_STREAM_CHUNK_SIZE,
+                     formatter=self.format_bytes_progress,
+                     on_done=lambda used: self.show_block_cipher_result(
+                         self.des_result_text, action, input_file, output_file, key, used),
+                     error_message="Execution failed",
+                     cancelled_text="Cancelled - partial output removed")
     
-    def des_decrypt_file(self, input_file, output_file, key, mode, iv):
-        """DES Decryption"""
-        try:
-            # Parse input file
-            data = parse_encrypted_input(input_file)
-            
-            # Get ciphertext
-            ciphertext = hex_to_bytes(data['ciphertext'])
-            
-            # Get IV from file if not provided
-            if mode == 'CBC' and iv is None:
-                if data['iv']:
-                    iv = hex_to_bytes(data['iv'])
-                else:
-                    raise ValueError("IV not found in encrypted file and not provided!")
-            
-            # Decrypt
-            plaintext = self.des.decrypt(ciphertext, key, mode=mode, iv=iv)
-            
-            # Save output
-            write_text_file(output_file, plaintext.decode('utf-8'))
-            
-            # Display result
-            result = f"✓ Decryption Successful!\n\n"
-            result += f"Mode: {mode}\n"
-            result += f"Key: {bytes_to_hex(key).upper()}\n"
-            if iv:
-                result += f"IV: {bytes_to_hex(iv).upper()}\n"
+    def show_block_cipher_result(self, result_text, action, input_file, output_file, key, used):
+        """DES/AES result (block_cipher_job) -> result box + message"""
+        result = f"✓ {action.capitalize()}ion Successful!\n\n"
+        result += f"Mode: {used['mode']}\n"
+        result += f"Key: {bytes_to_hex(key).upper()}\n"
+        if used['iv']:
+            result += f"IV: {bytes_to_hex(used['iv']).upper()}\n"
+        if action == 'encrypt':
             result += f"Input: {input_file}\n"
+            result += f"Output: {output_file} (binary container)\n\n"
+            result += f"Ciphertext preview (first 200 hex chars):\n{used['preview'].upper()[:200]}..."
+        else:
+            result += f"Input: {input_file} ({'binary container' if used['format'] == 'binary' else 'legacy hex'})\n"
             result += f"Output: {output_file}\n\n"
             result += f"Plaintext preview (first 500 chars):\n"
-            result += f"{plaintext.decode('utf-8')[:500]}..."
-            
-            self.after(0, lambda: self.des_result_text.delete("1.0", "end"))
-            self.after(0, lambda: self.des_result_text.insert("1.0", result))
-            
-            self.after(0, lambda: messagebox.showinfo("Success", 
-                f"File decrypted successfully!\n\nOutput saved to:\n{output_file}"))
-            
-        except Exception as e:
-            raise Exception(f"Decryption failed: {str(e)}")
+            result += f"{used['preview']}..."
+        
+        result_text.delete("1.0", "end")
+        result_text.insert("1.0", result)
+        messagebox.showinfo("Success",
+            f"File {action}ed successfully!\n\nOutput saved to:\n{output_file}")
             
     # ==================== AES FUNCTIONS ====================
     def on_aes_mode_change(self):
         """Enable/disable IV field based on mode"""
         mode = self.aes_mode_var.get()
-        if mode == "CBC":
+        if mode in ("CBC", "CTR"):
             self.aes_iv_entry.configure(state="normal")
             self.aes_iv_btn.configure(state="normal")
         else:
@@ -673,11 +631,11 @@ class CryptoApp(ctk.CTk):
             messagebox.showerror("Error", f"Invalid key: {str(e)}")
             return
         
-        # Validate IV for CBC
+        # Validate IV for CBC (nonce for CTR)
         iv = None
-        if mode == 'CBC':
+        if mode in ('CBC', 'CTR'):
             if not iv_hex and action == 'encrypt':
-                messagebox.showerror("Error", "IV is required for CBC mode encryption!\nPlease generate or enter IV.")
+                messagebox.showerror("Error", f"IV is required for {mode} mode encryption!\nPlease generate or enter IV.")
                 return
             if iv_hex:
                 try:
@@ -692,109 +650,15 @@ class CryptoApp(ctk.CTk):
         self.aes_execute_btn.configure(state="disabled", text="⏳ Processing...")
         self.aes_result_text.delete("1.0", "end")
         self.aes_result_text.insert("1.0", f"Executing AES {action}...\n")
-        
-        def run_aes():
-            try:
-                if action == 'encrypt':
-                    self.aes_encrypt_file(input_file, output_file, key, mode, iv)
-                else:
-                    self.aes_decrypt_file(input_file, output_file, key, mode, iv)
-                
-                self.after(0, lambda: self.aes_execute_btn.configure(
-                    state="normal", text="🔐 Execute AES"))
-            except Exception as e:
-                self.after(0, lambda: messagebox.showerror("Error", f"Execution failed:\n{str(e)}"))
-                self.after(0, lambda: self.aes_execute_btn.configure(
-                    state="normal", text="🔐 Execute AES"))
-        
-        # Run in separate thread
-        thread = threading.Thread(target=run_aes)
-        thread.daemon = True
-        thread.start()
-
-    def aes_encrypt_file(self, input_file, output_file, key, mode, iv):
-        """AES Encryption"""
-        try:
-            # Import AES (Already imported at top, but kept for logic consistency)
-            aes = AESModes()
-            
-            # Read plaintext
-            plaintext = read_text_file(input_file).encode('utf-8')
-            
-            # Encrypt
-            ciphertext, iv_used = aes.encrypt(plaintext, key, mode=mode, iv=iv)
-            
-            # Convert to hex
-            ciphertext_hex = bytes_to_hex(ciphertext)
-            iv_hex = bytes_to_hex(iv_used) if iv_used else None
-            
-            # Save output
-            save_encrypted_output(output_file, ciphertext_hex, iv_hex, mode)
-            
-            # Display result
-            result = f"✓ Encryption Successful!\n\n"
-            result += f"Mode: {mode}\n"
-            result += f"Key: {bytes_to_hex(key).upper()}\n"
-            if iv_hex:
-                result += f"IV: {iv_hex.upper()}\n"
-            result += f"Input: {input_file}\n"
-            result += f"Output: {output_file}\n\n"
-            result += f"Ciphertext preview (first 200 hex chars):\n{ciphertext_hex.upper()[:200]}..."
-            
-            self.after(0, lambda: self.aes_result_text.delete("1.0", "end"))
-            self.after(0, lambda: self.aes_result_text.insert("1.0", result))
-            
-            self.after(0, lambda: messagebox.showinfo("Success",
-                f"File encrypted successfully!\n\nOutput saved to:\n{output_file}"))
-            
-        except Exception as e:
-            raise Exception(f"Encryption failed: {str(e)}")
+        self.run_job("aes", self.aes_execute_btn, "🔐 Execute AES",
+                     block_cipher_job, "AES", action, input_file, output_file, key, mode, iv,
+                     UI_STREAM_CHUNK_SIZE,
+                     formatter=self.format_bytes_progress,
+                     on_done=lambda used: self.show_block_cipher_result(
+                         self.aes_result_text, action, input_file, output_file, key, used),
+                     error_message="Execution failed",
+                     cancelled_text="Cancelled - partial output removed")
 
-    def aes_decrypt_file(self, input_file, output_file, key, mode, iv):
-        """AES Decryption"""
-        try:
-            # Import AES
-            aes = AESModes()
-            
-            # Parse input file
-            data = parse_encrypted_input(input_file)
-            
-            # Get ciphertext
-            ciphertext = hex_to_bytes(data['ciphertext'])
-            
-            # Get IV from file if not provided
-            if mode == 'CBC' and iv is None:
-                if data['iv']:
-                    iv = hex_to_bytes(data['iv'])
-                else:
-                    raise ValueError("IV not found in encrypted file and not provided!")
-            
-            # Decrypt
-            plaintext = aes.decrypt(ciphertext, key, mode=mode, iv=iv)
-            
-            # Save output
-            write_text_file(output_file, plaintext.decode('utf-8'))
-            
-            # Display result
-            result = f"✓ Decryption Successful!\n\n"
-            result += f"Mode: {mode}\n"
-            result += f"Key: {bytes_to_hex(key).upper()}\n"
-            if iv:
-                result += f"IV: {bytes_to_hex(iv).upper()}\n"
-            result += f"Input: {input_file}\n"
-            result += f"Output: {output_file}\n\n"
-            result += f"Plaintext preview (first 500 chars):\n"
-            result += f"{plaintext.decode('utf-8')[:500]}..."
-            
-            self.after(0, lambda: self.aes_result_text.delete("1.0", "end"))
-            self.after(0, lambda: self.aes_result_text.insert("1.0", result))
-            
-            self.after(0, lambda: messagebox.showinfo("Success",
-                f"File decrypted successfully!\n\nOutput saved to:\n{output_file}"))
-            
-        except Exception as e:
-            raise Exception(f"Decryption failed: {str(e)}")
-    
     # ==================== CAESAR FUNCTIONS ====================
     
     def crack_caesar(self):
@@ -814,17 +678,11 @@ class CryptoApp(ctk.CTk):
         self.caesar_result_text.delete("1.0", "end")
         self.caesar_result_text.insert("1.0", "Cracking Caesar cipher...\n\n")
         
-        def run_crack():
-            try:
-                key, plaintext = crack_caesar_file(input_file, output_file)
-                self.after(0, lambda: self.update_caesar_result(key, plaintext, output_file))
-            except Exception as e:
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to crack: {str(e)}"))
-                self.after(0, lambda: self.caesar_crack_btn.configure(state="normal", text="🔓 Crack Caesar Cipher"))
-        
-        thread = threading.Thread(target=run_crack)
-        thread.daemon = True
-        thread.start()
+        self.run_job("caesar", self.caesar_crack_btn, "🔓 Crack Caesar Cipher",
+                     crack_caesar_file, input_file, output_file,
+                     formatter=self.format_caesar_progress,
+                     on_done=lambda result: self.update_caesar_result(*result, output_file),
+                     error_message="Failed to crack")
     
     def update_caesar_result(self, key, plaintext, output_file):
         self.caesar_result_text.delete("1.0", "end")
@@ -860,17 +718,11 @@ class CryptoApp(ctk.CTk):
         self.mono_result_text.delete("1.0", "end")
         self.mono_result_text.insert("1.0", "Analyzing mono-alphabetic cipher...\nThis may take a few minutes...\n\n")
         
-        def run_crack():
-            try:
-                mapping, plaintext, score = crack_mono_file(input_file, output_file)
-                self.after(0, lambda: self.update_mono_result(mapping, plaintext, score, output_file))
-            except Exception as e:
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to crack: {str(e)}"))
-                self.after(0, lambda: self.mono_crack_btn.configure(state="normal", text="🔍 Analyze & Decrypt"))
-        
-        thread = threading.Thread(target=run_crack)
-        thread.daemon = True
-        thread.start()
+        self.run_job("mono", self.mono_crack_btn, "🔍 Analyze & Decrypt",
+                     crack_mono_file, input_file, output_file,
+                     formatter=self.format_mono_progress,
+                     on_done=lambda result: self.update_mono_result(*result, output_file),
+                     error_message="Failed to crack")
     
     def update_mono_result(self, mapping, plaintext, score, output_file):
         self.mono_result_text.delete("1.0", "end")
@@ -911,17 +763,11 @@ class CryptoApp(ctk.CTk):
         self.vigenere_result_text.delete("1.0", "end")
         self.vigenere_result_text.insert("1.0", "Cracking Vigenère cipher...\nAnalyzing key length...\n\n")
         
-        def run_crack():
-            try:
-                key, plaintext = crack_vigenere_file(input_file, output_file)
-                self.after(0, lambda: self.update_vigenere_result(key, plaintext, output_file))
-            except Exception as e:
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to crack: {str(e)}"))
-                self.after(0, lambda: self.vigenere_crack_btn.configure(state="normal", text="🔑 Crack Vigenère"))
-        
-        thread = threading.Thread(target=run_crack)
-        thread.daemon = True
-        thread.start()
+        self.run_job("vigenere", self.vigenere_crack_btn, "🔑 Crack Vigenère",
+                     crack_vigenere_file, input_file, output_file,
+                     formatter=self.format_vigenere_progress,
+                     on_done=lambda result: self.update_vigenere_result(*result, output_file),
+                     error_message="Failed to crack")
     
     def update_vigenere_result(self, key, plaintext, output_file):
         self.vigenere_result_text.delete("1.0", "end")
@@ -940,22 +786,121 @@ class CryptoApp(ctk.CTk):
         self.vigenere_crack_btn.configure(state="normal", text="🔑 Crack Vigenère")
         messagebox.showinfo("Success", "Vigenère cipher cracked successfully!")
     
+    # ==================== PROGRESS / CANCEL ====================
+    
+    def add_progress_controls(self, parent, prefix):
+        """Progress bar + status (best score so far) + Cancel button for one tab"""
+        frame = ctk.CTkFrame(parent)
+        frame.pack(fill="x", padx=20, pady=(10, 0))
+        
+        bar = ctk.CTkProgressBar(frame, width=500)
+        bar.set(0)
+        bar.pack(side="left", padx=10, pady=8)
+        label = ctk.CTkLabel(frame, text="Idle", width=240, anchor="w")
+        label.pack(side="left", padx=10)
+        cancel_btn = ctk.CTkButton(frame, text="✖ Cancel", width=100, state="disabled",
+                                   fg_color="darkred", hover_color="#5a0000",
+                                   command=lambda: self.cancel_job(prefix))
+        cancel_btn.pack(side="right", padx=10)
+        
+        setattr(self, f"{prefix}_progress_bar", bar)
+        setattr(self, f"{prefix}_progress_label", label)
+        setattr(self, f"{prefix}_cancel_btn", cancel_btn)
+    
+    def run_job(self, prefix, button, button_text, func, *args, formatter, on_done,
+                error_message, cancelled_text="Cancelled", **kwargs):
+        """
+        Submit func(*args, **kwargs) to the scheduler as the tab's job
+        Callbacks run on the Tk thread; the tab's button is restored however the job ends
+        formatter(done, total, *extra) -> progress status text
+        """
+        def finish(status):
+            self._jobs.pop(prefix, None)
+            if status == "Done":
+                getattr(self, f"{prefix}_progress_bar").set(1)
+            getattr(self, f"{prefix}_progress_label").configure(text=status)
+            getattr(self, f"{prefix}_cancel_btn").configure(state="disabled")
+            button.configure(state="normal", text=button_text)
+        
+        def done(result):
+            finish("Done")
+            on_done(result)
+        
+        def failed(e):
+            finish("Failed")
+            messagebox.showerror("Error", f"{error_message}:\n{str(e)}")
+        
+        def progress(steps_done, steps_total, *extra):
+            getattr(self, f"{prefix}_progress_bar").set(steps_done / steps_total if steps_total else 1.0)
+            getattr(self, f"{prefix}_progress_label").configure(
+                text=formatter(steps_done, steps_total, *extra))
+        
+        job = self.scheduler.submit(func, *args, on_done=done, on_error=failed,
+                                    on_cancel=lambda: finish(cancelled_text),
+                                    on_progress=progress, **kwargs)
+        self._jobs[prefix] = job
+        getattr(self, f"{prefix}_progress_bar").set(0)
+        getattr(self, f"{prefix}_progress_label").configure(
+            text="Waiting for a free worker..." if job.state == QUEUED else "Starting...")
+        getattr(self, f"{prefix}_cancel_btn").configure(state="normal")
+    
+    def cancel_job(self, prefix):
+        """Cancel button: a queued job is dropped, a running one stops at its next checkpoint"""
+        job = self._jobs.get(prefix)
+        if job is not None:
+            getattr(self, f"{prefix}_progress_label").configure(text="Cancelling...")
+            getattr(self, f"{prefix}_cancel_btn").configure(state="disabled")
+            self.scheduler.cancel(job)
+    
+    def update_jobs_status(self, running, queued):
+        if not running and not queued:
+            self.jobs_status_label.configure(text="")
+            return
+        text = f"Jobs: {running} running"
+        if queued:
+            text += f", {queued} queued"
+        self.jobs_status_label.configure(text=text)
+    
+    def on_close(self):
+        """Cancel running jobs and stop the worker pool before closing the window"""
+        self.scheduler.shutdown()
+        self.destroy()
+    
+    @staticmethod
+    def format_bytes_progress(done, total):
+        return f"{done / 1024:.0f} / {total / 1024:.0f} KB"
+    
+    @staticmethod
+    def format_caesar_progress(done, total, best_score):
+        return f"Key {done}/{total} - best score {best_score:.4f}"
+    
+    @staticmethod
+    def format_mono_progress(done, total, best_score, *restart):
+        return f"Restart {done}/{total} - best fitness {best_score:.4f}"
+    
+    @staticmethod
+    def format_vigenere_progress(done, total, best_score):
+        if best_score is None:
+            return f"Step {done}/{total} - estimating key length"
+        return f"Step {done}/{total} - best χ² {best_score:.2f}"
+    
     # ==================== HELPER FUNCTIONS ====================
     
-    def browse_file(self, entry_widget):
+    def browse_file(self, entry_widget, filetypes=None):
         filename = filedialog.askopenfilename(
             title="Select file",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=filetypes or TEXT_FILETYPES
         )
         if filename:
             entry_widget.delete(0, "end")
             entry_widget.insert(0, filename)
     
-    def save_file(self, entry_widget):
+    def save_file(self, entry_widget, filetypes=None):
+        filetypes = filetypes or TEXT_FILETYPES
         filename = filedialog.asksaveasfilename(
             title="Save file",
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            defaultextension=filetypes[0][1].lstrip("*"),
+            filetypes=filetypes
         )
         if filename:
             entry_widget.delete(0, "end")
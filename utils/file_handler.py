@@ -4,6 +4,28 @@ Xử lý đọc/ghi file cho các thuật toán mã hóa
 """
 
 import base64
+import contextlib
+import os
+import struct
+
+from algorithms.metrics import METRICS
+from algorithms.cancellation import check_cancelled
+
+
+def _read_chunk(f, size=-1):
+    """f.read(size), counted in the file_read stage"""
+    if not METRICS.enabled:
+        return f.read(size)
+    with METRICS.timer('file_read') as timer:
+        data = f.read(size)
+        timer.nbytes = len(data)
+    return data
+
+
+def _write_chunk(f, data):
+    """f.write(data), counted in the file_write stage"""
+    with METRICS.timer('file_write', len(data)):
+        return f.write(data)
 
 
 def read_text_file(filepath, encoding='utf-8'):
@@ -13,7 +35,7 @@ def read_text_file(filepath, encoding='utf-8'):
     """
     try:
         with open(filepath, 'r', encoding=encoding) as f:
-            return f.read()
+            return _read_chunk(f)
     except Exception as e:
         raise Exception(f"Error reading file: {str(e)}")
 
@@ -22,7 +44,7 @@ def write_text_file(filepath, content, encoding='utf-8'):
     """Ghi file text"""
     try:
         with open(filepath, 'w', encoding=encoding) as f:
-            f.write(content)
+            _write_chunk(f, content)
     except Exception as e:
         raise Exception(f"Error writing file: {str(e)}")
 
@@ -34,7 +56,7 @@ def read_binary_file(filepath):
     """
     try:
         with open(filepath, 'rb') as f:
-            return f.read()
+            return _read_chunk(f)
     except Exception as e:
         raise Exception(f"Error reading binary file: {str(e)}")
 
@@ -43,7 +65,7 @@ def write_binary_file(filepath, data):
     """Ghi file binary"""
     try:
         with open(filepath, 'wb') as f:
-            f.write(data)
+            _write_chunk(f, data)
     except Exception as e:
         raise Exception(f"Error writing binary file: {str(e)}")
 
@@ -56,7 +78,8 @@ def hex_to_bytes(hex_string):
     try:
         # Remove spaces and make lowercase
         hex_string = hex_string.replace(' ', '').replace('\n', '').lower()
-        return bytes.fromhex(hex_string)
+        with METRICS.timer('hex_decode', len(hex_string)):
+            return bytes.fromhex(hex_string)
     except Exception as e:
         raise ValueError(f"Invalid hex string: {str(e)}")
 
@@ -66,7 +89,8 @@ def bytes_to_hex(data):
     Chuyển bytes thành hex string
     b'Hello' -> '48656c6c6f'
     """
-    return data.hex()
+    with METRICS.timer('hex_encode', len(data)):
+        return data.hex()
 
 
 def base64_to_bytes(b64_string):
@@ -145,7 +169,8 @@ def read_aes_iv_from_hex(hex_string):
 
 def save_encrypted_output(filepath, ciphertext_hex, iv_hex=None, mode='ECB'):
     """
-    Lưu output mã hóa theo format chuẩn
+    Lưu output mã hóa theo format hex text cũ
+    (file mới nên dùng save_encrypted_container - nhỏ hơn một nửa)
     Format:
     Mode: ECB/CBC
     IV: <hex> (nếu có)
@@ -204,6 +229,412 @@ def parse_encrypted_input(filepath):
     return result
 
 
+# Streaming handlers - constant memory for files of any size
+
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read per step
+
+
+class _HexLineWriter:
+    """Write bytes as hex text in fixed-width lines (same layout as format_hex_output)"""
+    
+    def __init__(self, f, line_length=64):
+        self.f = f
+        self.line_length = line_length
+        self._pending = ''
+        self._first_line = True
+    
+    def _write_line(self, line):
+        if not self._first_line:
+            self.f.write('\n')
+        self.f.write(line)
+        self._first_line = False
+    
+    def write(self, data):
+        self._pending += bytes_to_hex(data)
+        full = len(self._pending) - len(self._pending) % self.line_length
+        with METRICS.timer('file_write', full):
+            for i in range(0, full, self.line_length):
+                self._write_line(self._pending[i:i + self.line_length])
+        self._pending = self._pending[full:]
+    
+    def close(self):
+        if self._pending:
+            self._write_line(self._pending)
+            self._pending = ''
+
+
+def _read_encrypted_header(f):
+    """
+    Read the Mode:/IV:/Ciphertext: header of a hex text file
+    Leaves f positioned at the first ciphertext line
+    Returns: dict with 'mode', 'iv' (hex or None)
+    """
+    header = {'mode': 'ECB', 'iv': None}
+    
+    for line in f:
+        line = line.strip()
+        if line.startswith('Mode:'):
+            header['mode'] = line.split(':', 1)[1].strip()
+        elif line.startswith('IV:'):
+            header['iv'] = line.split(':', 1)[1].strip()
+        elif line.startswith('Ciphertext:'):
+            break
+    
+    return header
+
+
+def _iter_hex_chunks(f, chunk_size):
+    """Yield ciphertext bytes from hex text, chunk_size hex chars at a time"""
+    leftover = ''
+    while True:
+        text = _read_chunk(f, chunk_size)
+        if not text:
+            break
+        hex_chars = leftover + ''.join(text.split())
+        even = len(hex_chars) - len(hex_chars) % 2
+        leftover = hex_chars[even:]
+        if even:
+            yield hex_to_bytes(hex_chars[:even])
+    
+    if leftover:
+        raise ValueError("Invalid hex string: odd number of hex digits")
+
+
+# Binary container - raw ciphertext behind a fixed header (replaces hex text)
+#
+# Layout (big-endian):
+#   magic     4s  b'ENCB'
+#   version   B   CONTAINER_VERSION
+#   algorithm B   ALGORITHM_CODES
+#   mode      B   MODE_CODES
+#   iv_len    B   0 for ECB
+#   chunk     I   chunk size used when writing (0 = one shot)
+#   length    Q   original plaintext length
+#   iv        iv_len bytes
+#   ciphertext (rest of file)
+
+CONTAINER_MAGIC = b'ENCB'
+CONTAINER_VERSION = 1
+CONTAINER_HEADER = struct.Struct('>4sBBBBIQ')
+
+ALGORITHM_CODES = {'DES': 1, 'AES': 2, '3DES': 3}
+MODE_CODES = {'ECB': 1, 'CBC': 2, 'CTR': 3}
+_ALGORITHM_NAMES = {code: name for name, code in ALGORITHM_CODES.items()}
+_MODE_NAMES = {code: name for name, code in MODE_CODES.items()}
+
+
+def pack_container_header(algorithm, mode, iv=None, chunk_size=0, original_length=0):
+    """
+    Tạo header của binary container
+    algorithm: 'DES' / 'AES' / '3DES'
+    mode: 'ECB' / 'CBC' / 'CTR'
+    Returns: bytes (header + IV)
+    """
+    algorithm = algorithm.upper()
+    mode = mode.upper()
+    if algorithm not in ALGORITHM_CODES:
+        raise ValueError(f"Unsupported algorithm for container: {algorithm}")
+    if mode not in MODE_CODES:
+        raise ValueError(f"Unsupported mode for container: {mode}")
+    
+    iv = iv or b''
+    header = CONTAINER_HEADER.pack(CONTAINER_MAGIC, CONTAINER_VERSION,
+                                   ALGORITHM_CODES[algorithm], MODE_CODES[mode],
+                                   len(iv), chunk_size, original_length)
+    return header + iv
+
+
+def read_container_header(f):
+    """
+    Đọc header của binary container từ file mở ở chế độ 'rb'
+    Leaves f positioned at the first ciphertext byte
+    Returns: dict with 'version', 'algorithm', 'mode', 'iv' (bytes or None),
+             'chunk_size', 'original_length'
+    """
+    raw = f.read(CONTAINER_HEADER.size)
+    if len(raw) != CONTAINER_HEADER.size:
+        raise ValueError("Truncated container header")
+    
+    magic, version, algorithm, mode, iv_len, chunk_size, original_length = \
+        CONTAINER_HEADER.unpack(raw)
+    
+    if magic != CONTAINER_MAGIC:
+        raise ValueError("Not an encrypted container file")
+    if version != CONTAINER_VERSION:
+        raise ValueError(f"Unsupported container version: {version}")
+    if algorithm not in _ALGORITHM_NAMES or mode not in _MODE_NAMES:
+        raise ValueError("Corrupted container header")
+    
+    iv = f.read(iv_len)
+    if len(iv) != iv_len:
+        raise ValueError("Truncated container header")
+    
+    return {
+        'version': version,
+        'algorithm': _ALGORITHM_NAMES[algorithm],
+        'mode': _MODE_NAMES[mode],
+        'iv': iv or None,
+        'chunk_size': chunk_size,
+        'original_length': original_length
+    }
+
+
+def is_container_file(filepath):
+    """Kiểm tra file có phải binary container không (dựa vào magic)"""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read(len(CONTAINER_MAGIC)) == CONTAINER_MAGIC
+    except OSError as e:
+        raise Exception(f"Error reading file: {str(e)}")
+
+
+def save_encrypted_container(filepath, ciphertext, algorithm, mode='ECB', iv=None,
+                             original_length=0):
+    """
+    Lưu output mã hóa dạng binary container
+    ciphertext, iv: bytes (không cần hex encode)
+    """
+    header = pack_container_header(algorithm, mode, iv, 0, original_length)
+    write_binary_file(filepath, header + ciphertext)
+
+
+def load_encrypted_file(filepath):
+    """
+    Đọc file mã hóa, tự nhận diện binary container hoặc hex text cũ
+    Returns: dict with 'format' ('binary' / 'hex'), 'algorithm' (None for hex),
+             'mode', 'iv' (bytes or None), 'ciphertext' (bytes),
+             'original_length' (None for hex)
+    """
+    if is_container_file(filepath):
+        try:
+            with open(filepath, 'rb') as f:
+                header = read_container_header(f)
+                ciphertext = _read_chunk(f)
+        except OSError as e:
+            raise Exception(f"Error reading file: {str(e)}")
+        
+        return {
+            'format': 'binary',
+            'algorithm': header['algorithm'],
+            'mode': header['mode'],
+            'iv': header['iv'],
+            'ciphertext': ciphertext,
+            'original_length': header['original_length']
+        }
+    
+    data = parse_encrypted_input(filepath)
+    return {
+        'format': 'hex',
+        'algorithm': None,
+        'mode': data['mode'],
+        'iv': hex_to_bytes(data['iv']) if data['iv'] else None,
+        'ciphertext': hex_to_bytes(data['ciphertext']),
+        'original_length': None
+    }
+
+
+def _check_container_algorithm(cipher, header):
+    """Từ chối giải mã container bằng sai thuật toán (vd. file AES với DESModes)"""
+    algorithm = getattr(cipher, 'algorithm', None)
+    if algorithm and algorithm != header['algorithm']:
+        raise ValueError(f"File was encrypted with {header['algorithm']}, "
+                         f"cannot decrypt with {algorithm}")
+
+
+def _container_mode_iv(header, mode, iv):
+    """
+    Mode / IV của container luôn lấy từ header
+    mode/iv truyền vào (vd. radio button của GUI) chỉ được phép trùng với header
+    Returns: (mode, iv)
+    """
+    if mode is not None and mode.upper() != header['mode']:
+        raise ValueError(f"File was encrypted in {header['mode']} mode, "
+                         f"cannot decrypt it as {mode.upper()}")
+    if iv is not None and bytes(iv) != (header['iv'] or b''):
+        if header['iv'] is None:
+            raise ValueError(f"File was encrypted in {header['mode']} mode and has no IV")
+        raise ValueError("IV does not match the IV recorded in the file")
+    return header['mode'], header['iv']
+
+
+def _stream_step(progress, cancel, done, total):
+    """Checkpoint between chunks: cancellation, then progress(bytes_done, bytes_total)"""
+    check_cancelled(cancel)
+    if progress is not None:
+        progress(min(done, total), total)
+
+
+def _remove_partial(path):
+    """Delete the half-written output of a failed / cancelled stream"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@contextlib.contextmanager
+def _partial_output(path, mode, **kwargs):
+    """
+    open(path, mode) for a stream's output file
+    Any exception inside the block (wrong key / padding, cancel, I/O error) closes
+    and removes the file, so no half-written output is left next to real results
+    """
+    f = open(path, mode, **kwargs)
+    try:
+        yield f
+    except BaseException:
+        f.close()
+        _remove_partial(path)
+        raise
+    finally:
+        f.close()
+
+
+def encrypt_file_stream(cipher, input_path, output_path, key, mode='ECB', iv=None,
+                        chunk_size=STREAM_CHUNK_SIZE, file_format='binary',
+                        progress=None, cancel=None):
+    """
+    Mã hóa file theo từng chunk, không đọc cả file vào RAM
+    cipher: AESModes / DESModes (hoặc object có encryptor() và algorithm)
+    file_format: 'binary' = binary container, 'hex' = format cũ của save_encrypted_output
+    progress: callback(bytes_done, bytes_total) sau mỗi chunk
+    cancel: CancellationToken - kiểm tra trước mỗi chunk; bị hủy thì raise OperationCancelled
+            (chunk nhỏ hơn = dừng nhanh hơn)
+    Lỗi hoặc bị hủy giữa chừng: file output dở dang bị xóa
+    Returns: IV thực sự dùng (bytes) hoặc None cho ECB
+    """
+    if file_format not in ('binary', 'hex'):
+        raise ValueError(f"Unsupported file format: {file_format}")
+    
+    encryptor = cipher.encryptor(key, mode, iv)
+    
+    try:
+        if file_format == 'binary':
+            with open(input_path, 'rb') as fin, _partial_output(output_path, 'wb') as fout:
+                original_length = os.fstat(fin.fileno()).st_size
+                fout.write(pack_container_header(cipher.algorithm, mode, encryptor.iv,
+                                                 chunk_size, original_length))
+                done = 0
+                while True:
+                    _stream_step(progress, cancel, done, original_length)
+                    chunk = _read_chunk(fin, chunk_size)
+                    if not chunk:
+                        break
+                    done += len(chunk)
+                    _write_chunk(fout, encryptor.update(chunk))
+                _write_chunk(fout, encryptor.finalize())
+        else:
+            with open(input_path, 'rb') as fin, \
+                    _partial_output(output_path, 'w', encoding='utf-8') as fout:
+                total = os.fstat(fin.fileno()).st_size
+                fout.write(f"Mode: {mode}\n")
+                if encryptor.iv:
+                    fout.write(f"IV: {bytes_to_hex(encryptor.iv)}\n")
+                fout.write("Ciphertext:\n")
+                
+                writer = _HexLineWriter(fout)
+                done = 0
+                while True:
+                    _stream_step(progress, cancel, done, total)
+                    chunk = _read_chunk(fin, chunk_size)
+                    if not chunk:
+                        break
+                    done += len(chunk)
+                    writer.write(encryptor.update(chunk))
+                writer.write(encryptor.finalize())
+                writer.close()
+    except (OSError, UnicodeError) as e:
+        raise Exception(f"Error streaming file: {str(e)}")
+    
+    return encryptor.iv
+
+
+def decrypt_file_stream(cipher, input_path, output_path, key, mode=None, iv=None,
+                        chunk_size=STREAM_CHUNK_SIZE, progress=None, cancel=None):
+    """
+    Giải mã file theo từng chunk, không đọc cả file vào RAM
+    Tự nhận diện binary container hoặc hex text cũ
+    mode/iv: None = lấy từ header của file
+             binary container: header luôn được dùng, mode/iv khác header -> ValueError
+             hex text cũ: mode/iv truyền vào thay cho header
+    progress, cancel: như encrypt_file_stream (bytes tính trên file input)
+    Returns: dict with 'mode', 'iv' đã dùng và 'format' của file
+    """
+    file_format = 'binary' if is_container_file(input_path) else 'hex'
+    
+    try:
+        if file_format == 'binary':
+            with open(input_path, 'rb') as fin:
+                # Header checked before the output is created (a mismatch leaves it untouched)
+                header = read_container_header(fin)
+                _check_container_algorithm(cipher, header)
+                mode, iv = _container_mode_iv(header, mode, iv)
+                
+                decryptor = cipher.decryptor(key, mode, iv)
+                total = os.fstat(fin.fileno()).st_size
+                done = fin.tell()
+                written = 0
+                with _partial_output(output_path, 'wb') as fout:
+                    while True:
+                        _stream_step(progress, cancel, done, total)
+                        chunk = _read_chunk(fin, chunk_size)
+                        if not chunk:
+                            break
+                        done += len(chunk)
+                        written += _write_chunk(fout, decryptor.update(chunk))
+                    written += _write_chunk(fout, decryptor.finalize())
+                    
+                    if written != header['original_length']:
+                        raise ValueError(f"Decrypted length {written} does not match "
+                                         f"original length {header['original_length']}")
+        else:
+            with open(input_path, 'r', encoding='utf-8') as fin, \
+                    _partial_output(output_path, 'wb') as fout:
+                header = _read_encrypted_header(fin)
+                mode = mode or header['mode']
+                if iv is None and header['iv']:
+                    iv = hex_to_bytes(header['iv'])
+                
+                decryptor = cipher.decryptor(key, mode, iv)
+                total = os.fstat(fin.fileno()).st_size
+                done = 0
+                _stream_step(progress, cancel, done, total)
+                for chunk in _iter_hex_chunks(fin, chunk_size):
+                    # 2 hex chars / byte (line breaks ignored - progress is approximate)
+                    done += 2 * len(chunk)
+                    _write_chunk(fout, decryptor.update(chunk))
+                    _stream_step(progress, cancel, done, total)
+                _write_chunk(fout, decryptor.finalize())
+    except (OSError, UnicodeError) as e:
+        raise Exception(f"Error streaming file: {str(e)}")
+    
+    return {'mode': mode, 'iv': iv, 'format': file_format}
+
+
+def read_text_preview(filepath, max_chars=500, encoding='utf-8'):
+    """Đọc max_chars ký tự đầu của file (để hiển thị preview)"""
+    try:
+        with open(filepath, 'r', encoding=encoding, errors='replace') as f:
+            return f.read(max_chars)
+    except Exception as e:
+        raise Exception(f"Error reading file: {str(e)}")
+
+
+def read_ciphertext_preview(filepath, max_hex_chars=200):
+    """Đọc max_hex_chars ký tự hex đầu tiên của ciphertext trong file mã hóa"""
+    try:
+        if is_container_file(filepath):
+            with open(filepath, 'rb') as f:
+                read_container_header(f)
+                return bytes_to_hex(f.read((max_hex_chars + 1) // 2))[:max_hex_chars]
+        
+        with open(filepath, 'r', encoding='utf-8') as f:
+            _read_encrypted_header(f)
+            return ''.join(f.read(max_hex_chars * 2).split())[:max_hex_chars]
+    except Exception as e:
+        raise Exception(f"Error reading file: {str(e)}")
+
+
 if __name__ == "__main__":
     # Test
     print("Testing file_handler utilities...")